@@ -0,0 +1,257 @@
+"""
+JSON API for other tools, served by the Dash app's Flask server.
+
+    POST /api/rank   {"required": [...] or {feature: weight},
+                      "nice_to_have": [...] or {feature: weight},
+                      "k": 10}
+    GET  /api/rank?required=A&required=B&nice_to_have=C&k=10
+
+Answers come from the current data snapshot and are cached per data
+version and request, so a tool asking the same question again (the usual
+case at high request rates) costs a dict lookup and the JSON encoding.
+
+Read-only catalog endpoints (paginated with offset / limit):
+
+    GET /api/platforms?feature=A&feature=B&match=any|all
+                      &language=English&language_mode=main|any
+    GET /api/platforms/<name>     features, languages and URL of one platform
+    GET /api/features?group=Learning
+
+Their JSON is serialized once per data version (one piece per platform /
+feature, joined per page), and their strong ETag is the data version, so
+a client sending If-None-Match gets a 304 without any work.
+"""
+import functools
+import json
+
+import numpy as np
+from flask import Response, jsonify, request
+
+from bitindex import FEATURE_MATCHES, LANGUAGE_GROUP, LANGUAGE_MODES
+from figurecache import FigureCache
+from ranking import DEFAULT_K, NICE_TO_HAVE_WEIGHT, REQUIRED_WEIGHT, check_k, feature_weights, rank_platforms
+
+
+API_CACHE_SIZE = 1024
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def _error(message, status=400):
+    return jsonify(error=message), status
+
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _page_arguments():
+    """(offset, limit) from the query string."""
+    try:
+        offset = int(request.args.get("offset", 0))
+        limit = int(request.args.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("offset and limit must be integers") from None
+    if offset < 0 or not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"offset must be >= 0 and limit between 1 and {MAX_PAGE_SIZE}")
+    return offset, limit
+
+
+def _choice(name, choices, default):
+    value = request.args.get(name, default)
+    if value not in choices:
+        raise ValueError(f"{name} must be one of {', '.join(choices)}")
+    return value
+
+
+def _page(snap, key, items, ids, offset, limit):
+    """JSON page of the pre-serialized items[ids] (bytes)."""
+    page = ids[offset:offset + limit]
+    meta = {
+        "version": snap.version,
+        "total": len(ids),
+        "offset": offset,
+        "limit": limit,
+        "next_offset": offset + limit if offset + limit < len(ids) else None,
+    }
+    return _dumps(meta)[:-1] + f',"{key}":['.encode() + b",".join(items[i] for i in page) + b"]}"
+
+
+# PRECOMPUTED JSON
+
+
+class CatalogJSON:
+    """The catalog endpoints' JSON pieces for one data snapshot."""
+
+    def __init__(self, snap):
+        catalog = snap.catalog
+        index = snap.index
+        self.snap = snap
+        # Every platform, also those without features (not in the index), by name
+        names = sorted(index.platforms.tolist() + list(catalog.unindexed_platforms))
+        self.platform_items = [
+            _dumps({
+                "name": p,
+                "url": catalog.platform_links.get(p),
+                "main_language": catalog.platform_main_language.get(p),
+            })
+            for p in names
+        ]
+        # index row -> position in platform_items
+        self.platform_positions = np.searchsorted(np.asarray(names, dtype=object), index.platforms)
+        # Every (non-language) feature, those without platforms with a count of 0
+        counts = dict(zip(index.features.tolist(), index.feature_platform_counts.tolist()))
+        features = sorted((f, g) for f, g in catalog.feature_table.items() if g != LANGUAGE_GROUP)
+        self.feature_items = [
+            _dumps({"name": f, "group": g, "platforms": counts.get(f, 0)})
+            for f, g in features
+        ]
+        self.feature_group = np.asarray([g for _, g in features], dtype=object)
+        self._details = {}
+
+    def has_platform(self, name):
+        catalog = self.snap.catalog
+        return name in catalog.platform_ids or name in catalog.unindexed_platforms
+
+    def platform_detail(self, name):
+        """JSON of one platform (KeyError if unknown); built on first request."""
+        catalog = self.snap.catalog
+        body = self._details.get(name)
+        if body is None:
+            record = catalog.platform(name)
+            body = self._details[name] = _dumps({
+                "version": self.snap.version,
+                "name": record.name,
+                "url": record.url,
+                "main_language": record.main_language,
+                "languages": record.languages,
+                "features": record.features,
+            })
+        return body
+
+
+@functools.lru_cache(maxsize=2)
+def catalog_json(snap):
+    return CatalogJSON(snap)
+
+
+def _json_response(body, etag, status=200):
+    response = Response(body, status=status, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"   # revalidate: the data can change
+    return response
+
+
+def _platform_ids(snap):
+    """
+    Index rows of the platforms matching the feature / language filters
+    of the query string (None without filters: every platform).
+    """
+    index = snap.index
+    features = request.args.getlist("feature")
+    languages = request.args.getlist("language")
+    match = _choice("match", FEATURE_MATCHES, "any")
+    mode = _choice("language_mode", LANGUAGE_MODES, "main")
+
+    unknown = [f for f in features if f not in index.feature_ids] \
+        + [lang for lang in languages if lang not in index.language_ids]
+    if unknown:
+        raise ValueError(f"unknown features or languages: {', '.join(unknown)}")
+    if not features and not languages:
+        return None
+
+    mask = np.ones(len(index.platforms), dtype=bool)
+    if features:
+        mask &= index.feature_mask(features, match)
+    if languages:
+        mask &= index.language_mask(languages, mode)
+    return np.flatnonzero(mask)
+
+
+def _rank_arguments():
+    """(required, nice_to_have, k) from the JSON body or the query string."""
+    if request.method == "POST":
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            raise ValueError("expected a JSON object")
+        required = body.get("required", [])
+        nice_to_have = body.get("nice_to_have", [])
+        k = body.get("k", DEFAULT_K)
+    else:
+        required = request.args.getlist("required")
+        nice_to_have = request.args.getlist("nice_to_have")
+        try:
+            k = int(request.args.get("k", DEFAULT_K))
+        except ValueError:
+            raise ValueError("k must be an integer") from None
+    return (feature_weights(required, REQUIRED_WEIGHT),
+            feature_weights(nice_to_have, NICE_TO_HAVE_WEIGHT),
+            check_k(k))
+
+
+def register_api(server, data_store, prefix="/api"):
+    """Add the API routes to the Flask server; results follow data reloads."""
+    cache = FigureCache(maxsize=API_CACHE_SIZE)
+    data_store.add_listener(lambda snap: cache.clear())
+
+    def rank():
+        try:
+            required, nice_to_have, k = _rank_arguments()
+        except ValueError as e:
+            return _error(str(e))
+
+        snap = data_store.snapshot
+        key = (snap.version, json.dumps([required, nice_to_have, k], sort_keys=True))
+        result = cache.get_or_build(key, lambda: rank_platforms(snap.index, required, nice_to_have, k))
+        return jsonify(version=snap.version, **result)
+
+    server.add_url_rule(f"{prefix}/rank", "api_rank", rank, methods=["GET", "POST"])
+
+    def catalog_endpoint(build):
+        """
+        GET handler answering If-None-Match with 304 before building the
+        body (an unknown platform name is a 404 even with a current ETag).
+        """
+        @functools.wraps(build)
+        def handler(**kwargs):
+            snap = data_store.snapshot
+            pieces = catalog_json(snap)
+            if "name" in kwargs and not pieces.has_platform(kwargs["name"]):
+                return _error(f"unknown platform: {kwargs['name']}", status=404)
+            if request.if_none_match.contains(snap.version):
+                return _json_response(b"", snap.version, status=304)
+            try:
+                body = build(pieces, **kwargs)
+            except ValueError as e:
+                return _error(str(e))
+            return _json_response(body, snap.version)
+        return handler
+
+    @catalog_endpoint
+    def platforms(pieces):
+        offset, limit = _page_arguments()
+        rows = _platform_ids(pieces.snap)
+        ids = np.arange(len(pieces.platform_items)) if rows is None else pieces.platform_positions[rows]
+        return _page(pieces.snap, "platforms", pieces.platform_items, ids, offset, limit)
+
+    @catalog_endpoint
+    def platform(pieces, name):
+        return pieces.platform_detail(name)
+
+    @catalog_endpoint
+    def features(pieces):
+        offset, limit = _page_arguments()
+        group = request.args.get("group")
+        if group is None:
+            ids = np.arange(len(pieces.feature_items))
+        else:
+            ids = np.flatnonzero(pieces.feature_group == group)
+        return _page(pieces.snap, "features", pieces.feature_items, ids, offset, limit)
+
+    server.add_url_rule(f"{prefix}/platforms", "api_platforms", platforms)
+    server.add_url_rule(f"{prefix}/platforms/<path:name>", "api_platform", platform)
+    server.add_url_rule(f"{prefix}/features", "api_features", features)
+
+    # Serialize each new data version in the background thread that loaded it
+    data_store.add_listener(catalog_json)
+    return cache
@@ -0,0 +1,229 @@
+// Client-side versions of update_sunburst and update_facet_counts
+// (main.py, CLIENTSIDE_FILTERING). They work on the compact index shipped
+// once in "sunburst-index-store" and must return exactly what
+// build_sunburst_figure / facet_options return in Python (checked by
+// `python -m benchmarks.sunburst_parity`).
+// groupsFilters / networkFilters pass the filter state on to the server
+// only while their tab is shown (always registered).
+
+function filtersForTab(shownTab, tab, selectedKeywords, selectedLanguages, languageMode, featureMatch, version) {
+    if (tab !== shownTab) {
+        return window.dash_clientside.no_update;
+    }
+    return {
+        keywords: selectedKeywords || [],
+        languages: selectedLanguages || [],
+        language_mode: languageMode,
+        feature_match: featureMatch,
+        version: version
+    };
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    volunteer: {
+        groupsFilters: function (tab, selectedKeywords, selectedLanguages, languageMode, featureMatch, version) {
+            return filtersForTab("groups", tab, selectedKeywords, selectedLanguages, languageMode, featureMatch,
+                                 version);
+        },
+
+        networkFilters: function (tab, selectedKeywords, selectedLanguages, languageMode, featureMatch, version) {
+            return filtersForTab("network", tab, selectedKeywords, selectedLanguages, languageMode, featureMatch,
+                                 version);
+        },
+
+        facetCounts: function (selectedKeywords, selectedLanguages, languageMode, featureMatch, index) {
+            var noUpdate = window.dash_clientside.no_update;
+            if (!index) {
+                return [noUpdate, noUpdate, noUpdate];
+            }
+            selectedKeywords = selectedKeywords || [];
+            selectedLanguages = selectedLanguages || [];
+            var n = index.platforms.length;
+
+            // Platforms having any / all of the selected features
+            var fids = [];
+            selectedKeywords.forEach(function (keyword) {
+                var f = index.feature_ids[keyword];
+                if (f !== undefined) {
+                    fids.push(f);
+                }
+            });
+            var selected = new Array(n).fill(!fids.length && featureMatch === "all");
+            if (fids.length) {
+                var hits = new Array(n).fill(0);
+                fids.forEach(function (f) {
+                    index.members[f].forEach(function (pid) {
+                        hits[pid] += 1;
+                    });
+                });
+                for (var pid = 0; pid < n; pid++) {
+                    selected[pid] = featureMatch === "all" ? hits[pid] === fids.length : hits[pid] > 0;
+                }
+            }
+
+            // Platform pid has language code (by main or by any supported language)
+            function hasLanguage(pid, code) {
+                if (languageMode === "any") {
+                    return index.platform_langs[pid].indexOf(code) >= 0;
+                }
+                return index.main_lang[pid] === code;
+            }
+
+            // Language filter, only with language information
+            var langOk = new Array(n).fill(true);
+            if (index.has_languages) {
+                var codes = [];
+                selectedLanguages.forEach(function (lang) {
+                    var code = index.language_ids[lang];
+                    if (code !== undefined) {
+                        codes.push(code);
+                    }
+                });
+                for (var p = 0; p < n; p++) {
+                    langOk[p] = codes.some(function (code) {
+                        return hasLanguage(p, code);
+                    });
+                }
+            }
+
+            var total = 0;
+            for (var q = 0; q < n; q++) {
+                if (selected[q] && langOk[q]) {
+                    total += 1;
+                }
+            }
+
+            // Feature f: platforms with f passing the language filter (and in the selection, for "all")
+            function featureCount(f) {
+                return index.members[f].filter(function (pid) {
+                    return langOk[pid] && (featureMatch !== "all" || selected[pid]);
+                }).length;
+            }
+
+            // Language l: platforms of the feature selection having l
+            function languageCount(code) {
+                var count = 0;
+                for (var pid = 0; pid < n; pid++) {
+                    if (selected[pid] && hasLanguage(pid, code)) {
+                        count += 1;
+                    }
+                }
+                return count;
+            }
+
+            function options(values, ids, count, checked) {
+                var isChecked = {};
+                checked.forEach(function (value) {
+                    isChecked[value] = true;
+                });
+                return values.map(function (value) {
+                    var c = ids[value] !== undefined ? count(ids[value]) : 0;
+                    return {label: value + " (" + c + ")", value: value, disabled: c === 0 && !isChecked[value]};
+                });
+            }
+
+            return [
+                options(index.keywords, index.feature_ids, featureCount, selectedKeywords),
+                options(index.language_options, index.language_ids, languageCount, selectedLanguages),
+                total + " platforms match the selection"
+            ];
+        },
+
+        sunburst: function (selectedKeywords, selectedLanguages, languageMode, featureMatch, index) {
+            if (!index) {
+                return window.dash_clientside.no_update;
+            }
+            selectedKeywords = selectedKeywords || [];
+            selectedLanguages = selectedLanguages || [];
+
+            // If no feature selected OR (we have language info and none selected) -> empty
+            if (!selectedKeywords.length || (index.has_languages && !selectedLanguages.length)) {
+                return index.empty;
+            }
+
+            // Language filter: allowed language codes, or null for "no filter"
+            var allowed = null;
+            if (selectedLanguages.length && index.has_languages) {
+                allowed = {};
+                selectedLanguages.forEach(function (lang) {
+                    var code = index.language_ids[lang];
+                    if (code !== undefined) {
+                        allowed[code] = true;
+                    }
+                });
+            }
+
+            function languageFilter(members) {
+                if (allowed !== null && languageMode === "any") {
+                    // Any supported language of the platform counts
+                    members = members.filter(function (pid) {
+                        return index.platform_langs[pid].some(function (code) {
+                            return allowed[code] === true;
+                        });
+                    });
+                } else if (allowed !== null) {
+                    members = members.filter(function (pid) {
+                        return allowed[index.main_lang[pid]] === true;
+                    });
+                }
+                return members;
+            }
+
+            var known = selectedKeywords.filter(function (keyword) {
+                return index.feature_ids[keyword] !== undefined;
+            });
+
+            // AND: only platforms having every selected feature
+            var inAll = null;
+            if (featureMatch === "all") {
+                var hits = {};
+                known.forEach(function (keyword) {
+                    languageFilter(index.members[index.feature_ids[keyword]]).forEach(function (pid) {
+                        hits[pid] = (hits[pid] || 0) + 1;
+                    });
+                });
+                inAll = function (pid) {
+                    return hits[pid] === known.length;
+                };
+            }
+
+            var labels = [], parents = [], values = [];
+
+            known.forEach(function (keyword) {
+                var members = languageFilter(index.members[index.feature_ids[keyword]]);
+                if (inAll !== null) {
+                    members = members.filter(inAll);
+                }
+                if (!members.length) {
+                    return;
+                }
+
+                labels.push(keyword);
+                parents.push("");
+                values.push(members.length);
+
+                members.forEach(function (pid) {
+                    labels.push(index.platforms[pid]);
+                    parents.push(keyword);
+                    values.push(1);
+                });
+            });
+
+            if (!labels.length) {
+                return index.empty;
+            }
+
+            return {
+                data: [{
+                    type: "sunburst",
+                    labels: labels,
+                    parents: parents,
+                    values: values,
+                    branchvalues: "total",
+                    maxdepth: 2
+                }],
+                layout: index.layout
+            };
+        }
+    }
+});
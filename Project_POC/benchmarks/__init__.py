@@ -0,0 +1,19 @@
+"""
+Benchmarks for the volunteer platform app.
+
+Run from the Project_POC folder:
+
+    python -m benchmarks.synthetic out.xlsx ...   # write a synthetic workbook
+    python -m benchmarks.pipeline ...             # stage-by-stage timings + memory
+    python -m benchmarks.figure_bench             # sunburst figure building
+    python -m benchmarks.sunburst_parity          # clientside.js vs. Python sunburst (Node.js)
+    python -m benchmarks.workers_bench ...        # memory per worker, shared index
+    python -m benchmarks.memory_bench ...         # catalog vs. lookup dicts memory
+    python -m benchmarks.startup_bench ...        # cold start: imports, first response
+    python -m benchmarks.tagger_bench ...         # feature tagger documents per second
+    python -m benchmarks.ingest_bench ...         # frames vs. streaming ingest, peak memory
+    python -m benchmarks.delta_bench ...          # change sets vs. full rebuild
+    python -m benchmarks.delta_check ...          # chained change sets vs. rebuilds
+    python -m benchmarks.linkcheck_bench ...      # link checks per second
+    python -m benchmarks.linkcheck_check          # link checker behaviour, local servers
+"""
@@ -0,0 +1,65 @@
+"""
+Time of applying small change sets (delta.py) vs. a full rebuild.
+
+For synthetic frames (no workbook read: the rebuild is build_snapshot
+from the frames, the cheapest full path), applies change sets of
+increasing size to the snapshot - added and removed memberships, plus
+one new platform in the "new platform" rows - and checks every result
+against a full rebuild with check_consistency:
+
+    python -m benchmarks.delta_bench --platforms 20000 --features 300 --density 0.05
+"""
+import argparse
+import random
+import time
+
+from benchmarks.synthetic import add_size_arguments, make_frames, size_kwargs
+from datastore import build_snapshot
+from delta import ChangeSet, apply_changes, apply_to_frames, check_consistency
+
+
+def make_changes(snapshot, n, new_platform=False, seed=0):
+    """ChangeSet with n added and n removed memberships of existing platforms and features."""
+    rng = random.Random(seed)
+    platforms = list(snapshot.index.platforms)
+    features = list(snapshot.index.features)
+    memberships = [(rng.choice(platforms), rng.choice(features)) for _ in range(n)]
+    removed = []
+    for platform in rng.sample(platforms, n):
+        keywords = snapshot.platform_to_keywords.get(platform)
+        if keywords:
+            removed.append((platform, rng.choice(keywords)))
+    changes = ChangeSet(memberships=memberships, removed_memberships=removed)
+    if new_platform:
+        changes.platforms["Benchmark platform"] = "https://benchmark.example.org/"
+        changes.memberships += [("Benchmark platform", f) for f in rng.sample(features, 5)]
+    return changes
+
+
+def timed_ms(func):
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare delta application with a full rebuild.")
+    add_size_arguments(parser)
+    parser.add_argument("--changes", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+
+    frames = make_frames(**size_kwargs(args))
+    snapshot, rebuild_ms = timed_ms(lambda: build_snapshot(*frames, version="base"))
+    print(f"{snapshot.index.shape[0]} platforms x {snapshot.index.shape[1]} features, "
+          f"full rebuild {rebuild_ms:.0f} ms")
+    print(f"{'changes':<22} {'apply (ms)':>11} {'rebuild (ms)':>13} {'speed-up':>9}  consistent")
+    for n in args.changes:
+        for new_platform in (False, True):
+            changes = make_changes(snapshot, n, new_platform)
+            patched, apply_ms = timed_ms(lambda: apply_changes(snapshot, changes))
+            rebuilt, rebuild_ms = timed_ms(
+                lambda: build_snapshot(*apply_to_frames(frames, changes), version=patched.version))
+            problems = check_consistency(patched, rebuilt)
+            label = f"{len(changes)}" + (" (new platform)" if new_platform else "")
+            print(f"{label:<22} {apply_ms:>11.1f} {rebuild_ms:>13.1f} {rebuild_ms / apply_ms:>8.0f}x  "
+                  f"{'yes' if not problems else ', '.join(problems)}")
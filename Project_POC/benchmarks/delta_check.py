@@ -0,0 +1,152 @@
+"""
+Chained change sets (delta.py) checked against full rebuilds.
+
+Applies chains of ChangeSets one after the other to a snapshot and, after
+every step, compares it with build_snapshot of the changed sheets
+(check_consistency). The scripted chains cover what only shows up across
+steps:
+
+- add-then-link: a platform / feature / language added without
+  memberships, linked by a later ChangeSet
+- unlink-then-relink: a platform losing all its features, then one back
+- regroup: a language feature moved to another group and back, a domain
+  feature made a language
+
+Random chains follow. The check fails (exit status 1) on the first difference:
+
+    python -m benchmarks.delta_check --platforms 300 --features 40 --chains 10 --steps 25
+    python -m benchmarks.delta_check --workbook volunteer_data.xlsx
+"""
+import argparse
+import random
+import sys
+
+from bitindex import LANGUAGE_GROUP
+from benchmarks.synthetic import add_size_arguments, make_frames, size_kwargs
+from datastore import build_snapshot
+from delta import ChangeSet, apply_changes, apply_to_frames, check_consistency
+
+
+def _names(frames):
+    """(platforms, {feature: group}, [(platform, feature)]) of the current sheets."""
+    df_platforms, df_features, df_pf = frames
+    platform_name = dict(zip(df_platforms["platform_id"], df_platforms["name"]))
+    feature_name = dict(zip(df_features["feature_id"], df_features["name"]))
+    memberships = [(platform_name[p], feature_name[f]) for p, f in zip(df_pf["platform_id"], df_pf["feature_id"])
+                   if p in platform_name and f in feature_name]
+    return list(df_platforms["name"]), dict(zip(df_features["name"], df_features["group"])), memberships
+
+
+def scripted_chains(frames):
+    """{name: [ChangeSet, or function(frames) -> ChangeSet, ...]}"""
+    platforms, groups, _ = _names(frames)
+    domain = [f for f, g in groups.items() if g != LANGUAGE_GROUP]
+    languages = [f for f, g in groups.items() if g == LANGUAGE_GROUP]
+    platform, feature = platforms[0], domain[0]
+
+    def unlink_all(frames):
+        return ChangeSet(removed_memberships=[m for m in _names(frames)[2] if m[0] == platform])
+
+    return {
+        "add platform, then link": [
+            ChangeSet(platforms={"Check platform": "https://check.example.org/"}),
+            ChangeSet(memberships=[("Check platform", feature), ("Check platform", languages[0])]),
+        ],
+        "add feature and language, then link": [
+            ChangeSet(features={"Check feature": "Check group", "Language: Checkish": LANGUAGE_GROUP}),
+            ChangeSet(memberships=[(platform, "Check feature"), (platform, "Language: Checkish")]),
+        ],
+        "unlink a platform, then relink it": [
+            unlink_all,
+            ChangeSet(platforms={platform: "https://relinked.example.org/"}),
+            ChangeSet(memberships=[(platform, feature)]),
+        ],
+        "language feature to another group and back": [
+            ChangeSet(features={languages[0]: "Other"}),
+            ChangeSet(memberships=[(platform, languages[0])]),
+            ChangeSet(features={languages[0]: LANGUAGE_GROUP}),
+        ],
+        "domain feature to a language": [
+            ChangeSet(features={feature: LANGUAGE_GROUP}),
+            ChangeSet(removed_features=[feature]),
+        ],
+    }
+
+
+def random_changes(frames, rng, step):
+    """A random ChangeSet that only names what the sheets contain (or adds)."""
+    platforms, groups, memberships = _names(frames)
+    features = list(groups)
+    changes = ChangeSet(
+        memberships=[(rng.choice(platforms), rng.choice(features)) for _ in range(rng.randint(0, 4))],
+        removed_memberships=rng.sample(memberships, min(len(memberships), rng.randint(0, 4))),
+    )
+    r = rng.random()
+    if r < 0.15:
+        changes.platforms[f"Platform {step}"] = rng.choice([None, f"https://p{step}.example.org/"])
+    elif r < 0.25:
+        changes.features[f"Feature {step}"] = rng.choice(["Group 0", "New group", None])
+    elif r < 0.3:
+        changes.features[f"Language: L{step}"] = LANGUAGE_GROUP
+    elif r < 0.4:
+        feature = rng.choice(features)
+        changes.features[feature] = rng.choice([LANGUAGE_GROUP, "Group 1", "Other"])
+    elif r < 0.5:
+        changes.platforms[rng.choice(platforms)] = rng.choice([None, f"https://u{step}.example.org/"])
+    elif r < 0.55 and len(platforms) > 2:
+        changes.removed_platforms.append(rng.choice(platforms))
+    elif r < 0.6 and len(features) > 2:
+        changes.removed_features.append(rng.choice(features))
+    gone = set(changes.removed_platforms) | set(changes.removed_features)
+    changes.memberships = [m for m in changes.memberships if not gone & set(m)]
+    return changes
+
+
+def run_chain(frames, chain):
+    """(step, ChangeSet, problems) of the first step that differs from a rebuild, or None."""
+    snapshot = build_snapshot(*frames, version="base")
+    for step, changes in enumerate(chain):
+        if callable(changes):
+            changes = changes(frames)
+        try:
+            snapshot = apply_changes(snapshot, changes)
+        except (KeyError, ValueError) as e:
+            return step, changes, [f"apply_changes raised {e!r}"]
+        frames = apply_to_frames(frames, changes)
+        problems = check_consistency(snapshot, build_snapshot(*frames, version=snapshot.version))
+        if problems:
+            return step, changes, problems
+    return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check chained change sets against full rebuilds.")
+    parser.add_argument("--workbook", help="use this workbook instead of synthetic data")
+    add_size_arguments(parser)
+    parser.add_argument("--chains", type=int, default=5, help="random chains")
+    parser.add_argument("--steps", type=int, default=20, help="ChangeSets per random chain")
+    args = parser.parse_args()
+
+    if args.workbook:
+        from dataloader import load_sheets
+        frames = load_sheets(args.workbook)
+    else:
+        frames = make_frames(**size_kwargs(args))
+
+    chains = scripted_chains(frames)
+    for seed in range(args.chains):
+        rng = random.Random(seed)
+        chains[f"random chain {seed}"] = [
+            lambda frames, rng=rng, step=step: random_changes(frames, rng, step) for step in range(args.steps)
+        ]
+
+    failed = False
+    for name, chain in chains.items():
+        failure = run_chain(frames, chain)
+        if failure is None:
+            print(f"{name}: consistent")
+        else:
+            step, changes, problems = failure
+            failed = True
+            print(f"{name}: step {step} differs ({', '.join(problems)})\n  {changes.to_dict()}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,96 @@
+"""
+Sunburst figure building: plotly graph_objects vs. the plain-dict builder.
+
+Measures per-call latency (building alone, and building + the JSON
+serialization Dash does for every callback) and peak Python allocations
+(tracemalloc) at a few sunburst sizes, and checks that both builders
+return the same dict.
+
+    python -m benchmarks.figure_bench [--sizes 1000 10000 100000] [--repeat 5]
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+
+from plotly.io.json import to_json_plotly
+
+from figures import sunburst_figure, validated_sunburst_figure
+
+
+PLATFORMS_PER_FEATURE = 49
+
+
+def make_sunburst_lists(n_nodes):
+    """Feature ring + platform leaves with (about) n_nodes labels in total."""
+    n_features = max(1, n_nodes // (PLATFORMS_PER_FEATURE + 1))
+    labels, parents, values = [], [], []
+    for f in range(n_features):
+        feature = f"Feature {f}"
+        labels.append(feature)
+        parents.append("")
+        values.append(PLATFORMS_PER_FEATURE)
+        for p in range(PLATFORMS_PER_FEATURE):
+            labels.append(f"Platform {f}-{p}")
+            parents.append(feature)
+            values.append(1)
+    return labels, parents, values
+
+
+def measure(build, lists, repeat):
+    """Median wall time (s) and peak traced allocation (bytes) of build(*lists)."""
+    build(*lists)  # warm-up (e.g. the cached layout)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build(*lists)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    build(*lists)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak
+
+
+def serialized(build):
+    """build followed by the serialization Dash applies to callback output."""
+    return lambda *lists: to_json_plotly(build(*lists))
+
+
+def run(sizes, repeat):
+    rows = []
+    for n in sizes:
+        lists = make_sunburst_lists(n)
+        if sunburst_figure(*lists) != validated_sunburst_figure(*lists):
+            raise AssertionError(f"fast and validated figures differ at {n} nodes")
+
+        slow_t, slow_mem = measure(validated_sunburst_figure, lists, repeat)
+        fast_t, fast_mem = measure(sunburst_figure, lists, repeat)
+        slow_json_t, _ = measure(serialized(validated_sunburst_figure), lists, repeat)
+        fast_json_t, _ = measure(serialized(sunburst_figure), lists, repeat)
+        rows.append({
+            "nodes": len(lists[0]),
+            "validated_ms": slow_t * 1000,
+            "fast_ms": fast_t * 1000,
+            "validated_json_ms": slow_json_t * 1000,
+            "fast_json_ms": fast_json_t * 1000,
+            "validated_peak_kb": slow_mem / 1024,
+            "fast_peak_kb": fast_mem / 1024,
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'nodes':>8} {'validated ms':>13} {'fast ms':>9} "
+          f"{'+json validated':>16} {'+json fast':>11} "
+          f"{'validated KB':>13} {'fast KB':>9}")
+    for r in run(args.sizes, args.repeat):
+        print(f"{r['nodes']:>8} {r['validated_ms']:>13.2f} {r['fast_ms']:>9.3f} "
+              f"{r['validated_json_ms']:>16.2f} {r['fast_json_ms']:>11.2f} "
+              f"{r['validated_peak_kb']:>13.0f} {r['fast_peak_kb']:>9.1f}")
@@ -0,0 +1,131 @@
+"""
+Time and peak memory of loading a large data set, frames vs. streaming.
+
+Every mode runs in a fresh Python process, which builds one DataSnapshot:
+
+- frames-xlsx: pandas reads the workbook, join_frames + BitsetIndex.from_frame
+- frames-csv:  the same from the CSV export (pandas.read_csv)
+- stream-xlsx: streamingest, openpyxl read-only mode, chunks of PlatformFeatures
+- stream-csv:  streamingest from the CSV export
+
+Reported per mode: wall time, the peak RSS of the process (VmHWM),
+the peak RSS minus the RSS after the imports (what loading added), and
+the tracemalloc peak of a second, traced run (Python + numpy allocations).
+
+    python -m benchmarks.ingest_bench --platforms 20000 --features 500 --density 0.05
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHILD_SCRIPT = "import sys; from benchmarks.ingest_bench import child; child(*sys.argv[1:])"
+MODES = ("frames-xlsx", "frames-csv", "stream-xlsx", "stream-csv")
+
+
+def status_kb():
+    """{"VmRSS": current, "VmHWM": peak} RSS of this process in KB (Linux)."""
+    # Not ru_maxrss: on Linux it carries over the parent's peak across exec
+    values = {}
+    with open("/proc/self/status", encoding="ascii") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("VmRSS", "VmHWM"):
+                values[key] = int(rest.split()[0])
+    return values
+
+
+def child(mode, source, trace):
+    """Runs in the fresh process; prints the measurements as JSON."""
+    import time
+    import tracemalloc
+
+    if mode.startswith("frames"):
+        from dataloader import SHEET_COLUMNS, read_workbook
+        from datastore import build_snapshot
+        import pandas as pd
+
+        def load():
+            if mode == "frames-csv":
+                frames = [pd.read_csv(os.path.join(source, f"{sheet}.csv"), usecols=columns)
+                          for sheet, columns in SHEET_COLUMNS.items()]
+            else:
+                frames = read_workbook(source)
+            return build_snapshot(*frames, version="bench")
+    else:
+        from streamingest import stream_snapshot
+
+        def load():
+            return stream_snapshot(source)
+
+    baseline_kb = status_kb()["VmRSS"]
+    if trace == "1":
+        tracemalloc.start()
+    start = time.perf_counter()
+    snapshot = load()
+    seconds = time.perf_counter() - start
+    result = {
+        "seconds": seconds,
+        "peak_rss_kb": status_kb()["VmHWM"],
+        "baseline_rss_kb": baseline_kb,
+        "shape": list(snapshot.index.shape),
+        "pandas_imported": "pandas" in sys.modules,
+    }
+    if trace == "1":
+        result["traced_peak_kb"] = tracemalloc.get_traced_memory()[1] // 1024
+    print(json.dumps(result))
+
+
+def run_child(mode, source, trace=False):
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, mode, source, "1" if trace else "0"],
+        cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def write_sources(directory, size_kwargs):
+    """Write the synthetic data set as a workbook and as a CSV export; returns {mode: source}."""
+    from benchmarks.synthetic import make_frames, write_workbook
+    from dataloader import SHEET_COLUMNS
+
+    excel_path = os.path.join(directory, "synthetic.xlsx")
+    rows = write_workbook(excel_path, **size_kwargs)
+    csv_dir = os.path.join(directory, "csv")
+    os.makedirs(csv_dir)
+    frames = make_frames(**size_kwargs)
+    for (sheet, columns), df in zip(SHEET_COLUMNS.items(), frames):
+        df[columns].to_csv(os.path.join(csv_dir, f"{sheet}.csv"), index=False)
+    print(f"{rows} PlatformFeatures rows")
+    return {mode: csv_dir if mode.endswith("csv") else excel_path for mode in MODES}
+
+
+def print_results(results):
+    print(f"{'mode':<12} {'time (s)':>9} {'peak RSS (MB)':>14} {'added (MB)':>11} "
+          f"{'traced peak (MB)':>17} {'pandas':>7}")
+    for mode, r in results.items():
+        print(f"{mode:<12} {r['seconds']:>9.2f} {r['peak_rss_kb'] / 1024:>14.1f} "
+              f"{(r['peak_rss_kb'] - r['baseline_rss_kb']) / 1024:>11.1f} {r['traced_peak_kb'] / 1024:>17.1f} "
+              f"{str(r['pandas_imported']):>7}")
+
+
+if __name__ == "__main__":
+    # Imported here: it loads pandas, which the measured child processes must not inherit
+    from benchmarks.synthetic import add_size_arguments, size_kwargs
+
+    parser = argparse.ArgumentParser(description="Compare frames and streaming ingest (time, peak memory).")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    add_size_arguments(parser)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = write_sources(tmp, size_kwargs(args))
+        results = {}
+        for mode in args.modes:
+            results[mode] = run_child(mode, sources[mode])
+            results[mode]["traced_peak_kb"] = run_child(mode, sources[mode], trace=True)["traced_peak_kb"]
+        print_results(results)
@@ -0,0 +1,60 @@
+"""
+Links checked per second by linkcheck, one at a time vs. concurrently.
+
+Starts local stand-in web servers (one per "host", each answering after
+--latency seconds; every --broken-th link answers 404) and checks
+--links URLs spread over them, with increasing concurrency and no
+per-host interval:
+
+    python -m benchmarks.linkcheck_bench --links 400 --hosts 20 --latency 0.05
+"""
+import argparse
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from linkcheck import PER_HOST, check_links
+
+
+def start_servers(n_hosts, latency, broken_every):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_HEAD(self):
+            time.sleep(latency)
+            number = int(self.path.rsplit("/", 1)[-1])
+            self.send_response(404 if broken_every and number % broken_every == 0 else 200)
+            self.end_headers()
+
+    servers = [ThreadingHTTPServer(("127.0.0.1", 0), Handler) for _ in range(n_hosts)]
+    for server in servers:
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    return servers
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure linkcheck throughput against local servers.")
+    parser.add_argument("--links", type=int, default=200)
+    parser.add_argument("--hosts", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per response")
+    parser.add_argument("--broken", type=int, default=10, help="every n-th link answers 404")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--per-host", type=int, default=PER_HOST)
+    args = parser.parse_args()
+
+    servers = start_servers(args.hosts, args.latency, args.broken)
+    urls = [f"http://127.0.0.1:{servers[i % args.hosts].server_port}/p/{i}" for i in range(args.links)]
+    print(f"{args.links} links on {args.hosts} hosts, {args.latency * 1000:.0f} ms per response")
+    print(f"{'concurrency':>12} {'seconds':>9} {'links/s':>9} {'broken':>7}")
+    for concurrency in args.concurrency:
+        start = time.perf_counter()
+        results = asyncio.run(check_links(urls, concurrency=concurrency, per_host=args.per_host,
+                                          host_interval=0))
+        seconds = time.perf_counter() - start
+        broken = sum(not r["ok"] for r in results.values())
+        print(f"{concurrency:>12} {seconds:>9.2f} {len(results) / seconds:>9.0f} {broken:>7}")
+    for server in servers:
+        server.shutdown()
@@ -0,0 +1,170 @@
+"""
+Behaviour of linkcheck against local stand-in web servers.
+
+Checks, and exits with status 1 if any of them fails:
+
+- status codes: 200 is ok, 404 is broken
+- timeout: a server answering too late gives error "timeout"
+- redirects are followed (final_url), redirect loops end in an error
+- HEAD refused with 405: the link is checked again with GET
+- non-ASCII paths and queries are sent percent-encoded (UTF-8)
+- per host at most `per_host` requests in flight, started at least
+  `host_interval` seconds apart
+- fresh results in the TTL cache are reused (no request), stale ones
+  are checked again, and the cache survives a save / reload
+
+    python -m benchmarks.linkcheck_check
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from linkcheck import LinkCache, check_links
+
+
+SLOW = 1.0          # seconds the /slow page takes
+TIMEOUT = 0.3
+HOST_INTERVAL = 0.05
+ENCODED_PATH = "/stra%C3%9Fe?q=%C3%BC"      # /straße?q=ü
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.lock = threading.Lock()
+        self.requests = []          # (method, path, start time)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server_port}{path}"
+
+
+class Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def answer(self, method):
+        server = self.server
+        with server.lock:
+            server.requests.append((method, self.path, time.monotonic()))
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            path = self.path
+            if path == "/slow":
+                time.sleep(SLOW)
+            elif path.startswith("/busy/"):
+                time.sleep(0.1)
+            status, location = 200, None
+            if path == "/missing":
+                status = 404
+            elif path == "/redirect":
+                status, location = 301, "/target"
+            elif path == "/loop":
+                status, location = 302, "/loop"
+            elif path == "/nohead" and method == "HEAD":
+                status = 405
+            elif path.startswith("/stra"):
+                status = 200 if path == ENCODED_PATH else 400
+            self.send_response(status)
+            if location:
+                self.send_header("Location", location)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def do_HEAD(self):
+        self.answer("HEAD")
+
+    def do_GET(self):
+        self.answer("GET")
+
+
+def start_server():
+    server = Server()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(urls, cache=None, **options):
+    options = {"concurrency": 20, "per_host": 2, "host_interval": 0, "timeout": TIMEOUT, **options}
+    return asyncio.run(check_links(urls, cache, **options))
+
+
+def check_responses(failures):
+    server = start_server()
+    results = run([server.url(p) for p in ("/ok", "/missing", "/slow", "/redirect", "/loop", "/nohead",
+                                           "/straße?q=ü")])
+    r = {url.replace(server.url(""), ""): result for url, result in results.items()}
+
+    def expect(name, condition, result):
+        if not condition:
+            failures.append(f"{name}: {result}")
+
+    expect("200 is ok", r["/ok"]["ok"] and r["/ok"]["status"] == 200, r["/ok"])
+    expect("404 is broken", not r["/missing"]["ok"] and r["/missing"]["status"] == 404, r["/missing"])
+    expect("timeout", not r["/slow"]["ok"] and r["/slow"]["error"] == "timeout", r["/slow"])
+    expect("redirect followed", r["/redirect"]["ok"] and r["/redirect"]["final_url"] == server.url("/target"),
+           r["/redirect"])
+    expect("redirect loop", not r["/loop"]["ok"] and r["/loop"]["error"] == "too many redirects", r["/loop"])
+    nohead = [m for m, p, _ in server.requests if p == "/nohead"]
+    expect("GET after 405", r["/nohead"]["ok"] and nohead == ["HEAD", "GET"], (r["/nohead"], nohead))
+    expect("non-ASCII URL percent-encoded", r["/straße?q=ü"]["ok"], r["/straße?q=ü"])
+    server.shutdown()
+
+
+def check_limits(failures):
+    server = start_server()
+    run([server.url(f"/busy/{i}") for i in range(8)], per_host=2, host_interval=HOST_INTERVAL)
+    starts = sorted(t for _, _, t in server.requests)
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    if server.max_in_flight > 2:
+        failures.append(f"per-host limit: {server.max_in_flight} requests in flight (limit 2)")
+    # The server's clock starts a little after the client's; allow 20 % jitter
+    if min(gaps) < HOST_INTERVAL * 0.8:
+        failures.append(f"host interval: requests {min(gaps):.3f} s apart (interval {HOST_INTERVAL} s)")
+    server.shutdown()
+
+
+def check_cache(failures):
+    server = start_server()
+    urls = [server.url("/ok"), server.url("/missing")]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "links.json")
+        cache = LinkCache(path, ttl=3600)
+        run(urls, cache)
+        cache.save()
+        requests = len(server.requests)
+
+        reloaded = LinkCache(path, ttl=3600)
+        results = run(urls, reloaded)
+        if len(server.requests) != requests:
+            failures.append("fresh cached results were checked again")
+        if [r["ok"] for r in results.values()] != [True, False]:
+            failures.append(f"cached results changed: {results}")
+
+        stale = LinkCache(path, ttl=0)
+        run(urls, stale)
+        if len(server.requests) != requests + len(urls):
+            failures.append("stale cached results were not checked again")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    failures = []
+    for check in (check_responses, check_limits, check_cache):
+        before = len(failures)
+        check(failures)
+        print(f"{check.__name__}: {'ok' if len(failures) == before else 'FAILED'}")
+    for failure in failures:
+        print(f"  {failure}")
+    sys.exit(1 if failures else 0)
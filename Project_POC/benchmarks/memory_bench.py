@@ -0,0 +1,113 @@
+"""
+Memory footprint of the catalog vs. the plain lookup dicts it replaced.
+
+For a synthetic workbook (or --workbook) this measures the memory kept
+alive by:
+
+- dicts:   the five lookup dicts of Python lists (keyword_to_platforms,
+           platform_to_keywords, platform_languages_multi,
+           platform_main_language, platform_links), as the app used to build them
+- catalog: the compact Catalog (CSR arrays + read-only views)
+- df_pf_full with plain string columns vs. categorical columns
+
+Retained sizes are traced allocations (tracemalloc) still alive after the
+build, so names shared with the BitsetIndex are not counted for either.
+
+    python -m benchmarks.memory_bench --platforms 10000 --features 1000
+"""
+import argparse
+import datetime
+import gc
+import os
+import platform
+import tempfile
+import tracemalloc
+
+from benchmarks.pipeline import append_run, git_commit
+from benchmarks.synthetic import add_size_arguments, size_kwargs, write_workbook
+
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), "results", "memory.jsonl")
+
+LOOKUPS = ("keyword_to_platforms", "platform_to_keywords", "platform_languages_multi",
+           "platform_main_language", "platform_links")
+
+
+def retained_kb(build):
+    """KB of traced allocations kept alive by the result of build(), and the result."""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    result = build()
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (after - before) / 1024, result
+
+
+def plain_strings(df_pf_full):
+    """df_pf_full with its categorical columns turned back into plain string columns."""
+    return df_pf_full.astype({
+        c: df_pf_full[c].cat.categories.dtype
+        for c in df_pf_full.columns if df_pf_full[c].dtype == "category"
+    })
+
+
+def run_memory(excel_path):
+    """Return {structure: KB} for the workbook at excel_path."""
+    from bitindex import BitsetIndex
+    from catalog import Catalog
+    from dataloader import load_sheets
+    from datastore import join_frames, platform_links_from_frame
+
+    frames = load_sheets(excel_path)
+    df_pf_full = join_frames(*frames)
+    index = BitsetIndex.from_frame(df_pf_full)
+    links = platform_links_from_frame(frames[0])
+
+    catalog_kb, catalog = retained_kb(lambda: Catalog(index, links))
+    dicts_kb, _ = retained_kb(lambda: {name: dict(getattr(catalog, name)) for name in LOOKUPS})
+
+    return {
+        "lookup_dicts": dicts_kb,
+        "catalog": catalog_kb,
+        "catalog_arrays": catalog.nbytes() / 1024,
+        "df_pf_full_strings": plain_strings(df_pf_full).memory_usage(deep=True).sum() / 1024,
+        "df_pf_full_categorical": df_pf_full.memory_usage(deep=True).sum() / 1024,
+    }
+
+
+def print_sizes(sizes):
+    print(f"{'structure':<24} {'KB':>12}")
+    for name, kb in sizes.items():
+        print(f"{name:<24} {kb:>12.0f}")
+    print(f"{'dicts / catalog':<24} {sizes['lookup_dicts'] / max(sizes['catalog'], 1e-9):>12.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the catalog's memory with the lookup dicts.")
+    parser.add_argument("--workbook", help="use this workbook instead of a synthetic one")
+    add_size_arguments(parser)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.workbook:
+            excel_path = args.workbook
+            params = {"workbook": os.path.abspath(excel_path)}
+        else:
+            excel_path = os.path.join(tmp, "synthetic.xlsx")
+            params = size_kwargs(args)
+            params["rows"] = write_workbook(excel_path, **params)
+
+        sizes = run_memory(excel_path)
+
+    append_run(args.output, {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "params": params,
+        "sizes_kb": sizes,
+    })
+    print_sizes(sizes)
+    print(f"Recorded in {args.output}")
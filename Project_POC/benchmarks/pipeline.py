@@ -0,0 +1,178 @@
+"""
+Stage-by-stage timing and memory profile of the main.py data pipeline.
+
+Generates a synthetic workbook (or uses --workbook), then measures each
+stage on its own: Excel loading, cached loading, the df_pf_full merges,
+the bitset index, the catalog, the similarity index,
+update_sunburst, build_platform_card, compute_feature_diff and a
+20-platform comparison. Every run is appended as one JSON line to
+--output, so runs on different commits can be compared:
+
+    python -m benchmarks.pipeline --platforms 10000 --features 1000
+    python -m benchmarks.pipeline --compare
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import add_size_arguments, size_kwargs, write_workbook
+
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), "results", "pipeline.jsonl")
+
+SAMPLE_CALLS = 50      # platforms / pairs used for the per-call stages
+
+
+def measure(func, repeat):
+    """
+    Median wall time over `repeat` runs, peak traced allocation of one
+    extra run (tracemalloc slows code down, so it is not timed) and the
+    result of the last call.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": statistics.median(times), "peak_kb": peak / 1024}, result
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                             capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def run_pipeline(excel_path, repeat=3):
+    """Return {stage: {"seconds", "peak_kb"}} for the workbook at excel_path."""
+    import main
+    from bitindex import BitsetIndex
+    from dataloader import load_sheets, read_workbook
+    from catalog import Catalog
+    from datastore import join_frames, platform_links_from_frame
+    from similarity import SimilarityIndex
+
+    main.create_app({"excel_path": excel_path, "shared_index_dir": None, "watch": False})
+    stages = {}
+
+    stages["excel_load"], frames = measure(lambda: read_workbook(excel_path), repeat)
+    load_sheets(excel_path)  # make sure the cache exists
+    stages["cache_load"], frames = measure(lambda: load_sheets(excel_path), repeat)
+    stages["join_frames"], df_pf_full = measure(lambda: join_frames(*frames), repeat)
+    stages["bitset_index"], index = measure(lambda: BitsetIndex.from_frame(df_pf_full), repeat)
+    links = platform_links_from_frame(frames[0])
+    stages["catalog"], _ = measure(lambda: Catalog(index, links), repeat)
+    stages["similarity_index"], _ = measure(lambda: SimilarityIndex.build(index), repeat)
+
+    snap = main.data_store.snapshot
+    stages["update_sunburst"], _ = measure(
+        lambda: main.build_sunburst_figure(snap, snap.all_keywords, snap.language_options), repeat
+    )
+
+    # Per-call stages: averaged over a sample of platforms / pairs
+    sample = sorted(snap.platform_to_keywords)[:SAMPLE_CALLS]
+    pairs = list(zip(sample, reversed(sample)))
+    per_call = {
+        "build_platform_card": (lambda: [main.build_platform_card(p, snap=snap) for p in sample], len(sample)),
+        "compute_feature_diff": (lambda: [main.compute_feature_diff(a, b, snap=snap) for a, b in pairs], len(pairs)),
+        "compare_20_platforms": (lambda: snap.index.compare(sample[:20]), 1),
+    }
+    for name, (func, n) in per_call.items():
+        result, _ = measure(func, repeat)
+        stages[name] = {"seconds": result["seconds"] / max(n, 1), "peak_kb": result["peak_kb"]}
+
+    return stages
+
+
+def load_runs(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_run(path, record):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def print_stages(stages):
+    print(f"{'stage':<22} {'ms':>10} {'peak KB':>10}")
+    for name, r in stages.items():
+        print(f"{name:<22} {r['seconds'] * 1000:>10.3f} {r['peak_kb']:>10.0f}")
+
+
+def compare_last_two(path):
+    """Print the per-stage ratio of the latest run vs. the previous run with the same parameters."""
+    runs = load_runs(path)
+    if not runs:
+        print(f"No runs recorded in {path}")
+        return
+    new = runs[-1]
+    old = next((r for r in reversed(runs[:-1]) if r["params"] == new["params"]), None)
+    if old is None:
+        print("No earlier run with the same parameters")
+        return
+
+    print(f"{old['commit']} -> {new['commit']}  ({new['params']})")
+    print(f"{'stage':<22} {'old ms':>10} {'new ms':>10} {'ratio':>7}")
+    for name, r in new["stages"].items():
+        if name not in old["stages"]:
+            continue
+        before = old["stages"][name]["seconds"]
+        after = r["seconds"]
+        print(f"{name:<22} {before * 1000:>10.3f} {after * 1000:>10.3f} "
+              f"{after / before if before else float('nan'):>7.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the main.py pipeline stage by stage.")
+    parser.add_argument("--workbook", help="use this workbook instead of a synthetic one")
+    add_size_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--compare", action="store_true",
+                        help="only compare the last two recorded runs")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_last_two(args.output)
+        raise SystemExit
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.workbook:
+            excel_path = args.workbook
+            params = {"workbook": os.path.abspath(excel_path)}
+        else:
+            excel_path = os.path.join(tmp, "synthetic.xlsx")
+            params = size_kwargs(args)
+            params["rows"] = write_workbook(excel_path, **params)
+
+        stages = run_pipeline(excel_path, args.repeat)
+
+    record = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "params": params,
+        "stages": stages,
+    }
+    append_run(args.output, record)
+    print_stages(stages)
+    print(f"Recorded in {args.output}")
@@ -0,0 +1,110 @@
+"""
+Cold start of the app: import time and time to the first response.
+
+Every run is a fresh Python process that imports main, calls
+create_app and then requests the page layout and one sunburst update
+through the Flask test client, for each data source:
+
+- workbook: the workbook, read through the (warm) binary cache
+- shared:   the index published by sharedindex.py (no pandas at all)
+
+    python -m benchmarks.startup_bench --platforms 10000 --features 500 --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHILD_SCRIPT = "import sys; from benchmarks.startup_bench import child; child(*sys.argv[1:])"
+
+
+def child(mode, source):
+    """Runs in the fresh process; prints the timings as JSON."""
+    start = time.perf_counter()
+    import main
+    imported = time.perf_counter()
+
+    config = {"watch": False}
+    if mode == "shared":
+        config["shared_index_dir"] = source
+    else:
+        config.update(excel_path=source, shared_index_dir=None)
+    app = main.create_app(config)
+    created = time.perf_counter()
+
+    client = app.server.test_client()
+    assert client.get("/_dash-layout").status_code == 200
+    first_layout = time.perf_counter()
+
+    snap = main.data_store.snapshot
+    main.update_sunburst(snap.all_keywords[:1], snap.language_options)
+    first_update = time.perf_counter()
+
+    print(json.dumps({
+        "import_s": imported - start,
+        "create_app_s": created - imported,
+        "first_layout_s": first_layout - created,
+        "first_update_s": first_update - first_layout,
+        "time_to_first_response_s": first_layout - start,
+        "pandas_imported": "pandas" in sys.modules,
+    }))
+
+
+def run_child(mode, source):
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, mode, source],
+        cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def run_startup(excel_path, runs):
+    """{mode: median timings over `runs` fresh processes}"""
+    from dataloader import warm_cache
+    from datastore import load_snapshot
+    from sharedindex import publish
+
+    warm_cache(excel_path)
+    results = {}
+    with tempfile.TemporaryDirectory() as shared_dir:
+        publish(load_snapshot(excel_path), shared_dir)
+        for mode, source in (("workbook", excel_path), ("shared", shared_dir)):
+            samples = [run_child(mode, source) for _ in range(runs)]
+            results[mode] = {
+                key: statistics.median(s[key] for s in samples) if key.endswith("_s") else samples[0][key]
+                for key in samples[0]
+            }
+    return results
+
+
+def print_results(results):
+    keys = [k for k in next(iter(results.values())) if k.endswith("_s")]
+    print(f"{'':<26}" + "".join(f"{mode:>12}" for mode in results))
+    for key in keys:
+        print(f"{key[:-2] + ' (ms)':<26}" + "".join(f"{r[key] * 1000:>12.1f}" for r in results.values()))
+    print(f"{'pandas imported':<26}" + "".join(f"{str(r['pandas_imported']):>12}" for r in results.values()))
+
+
+if __name__ == "__main__":
+    # Imported here: it loads pandas, which the measured child processes must not inherit
+    from benchmarks.synthetic import add_size_arguments, size_kwargs, write_workbook
+
+    parser = argparse.ArgumentParser(description="Measure app import time and time to first response.")
+    parser.add_argument("--workbook", help="use this workbook instead of a synthetic one")
+    add_size_arguments(parser)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.workbook:
+            excel_path = args.workbook
+        else:
+            excel_path = os.path.join(tmp, "synthetic.xlsx")
+            write_workbook(excel_path, **size_kwargs(args))
+        print_results(run_startup(excel_path, args.runs))
@@ -0,0 +1,124 @@
+"""
+Parity of the client-side sunburst and facet counts (assets/clientside.js)
+with the server.
+
+Builds random filter states (features, languages, language mode, feature
+match; sometimes empty selections or unknown names), runs
+window.dash_clientside.volunteer.sunburst and .facetCounts under Node.js
+on the exported client_index, and compares every figure with
+build_sunburst_figure (labels, parents, values and ids, if present, then
+the whole figure) and every set of checklist options and summary with
+facet_options. Exits with status 1 on any difference:
+
+    python -m benchmarks.sunburst_parity --cases 500
+    python -m benchmarks.sunburst_parity --workbook volunteer_data.xlsx
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.synthetic import add_size_arguments, make_frames, size_kwargs
+from datastore import build_snapshot
+
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRACE_KEYS = ("ids", "labels", "parents", "values")
+
+NODE_SCRIPT = """
+global.window = {dash_clientside: {no_update: null}};
+require(process.argv[2]);
+const input = JSON.parse(require("fs").readFileSync(process.argv[3], "utf8"));
+const volunteer = window.dash_clientside.volunteer;
+process.stdout.write(JSON.stringify({
+    figures: input.cases.map(c => volunteer.sunburst(c[0], c[1], c[2], c[3], input.index)),
+    facets: input.cases.map(c => volunteer.facetCounts(c[0], c[1], c[2], c[3], input.index)),
+}));
+"""
+
+
+def random_cases(snap, n, seed=0):
+    """[[keywords, languages, language mode, feature match], ...]"""
+    rng = random.Random(seed)
+    keywords, languages = snap.all_keywords, snap.language_options
+    cases = []
+    for _ in range(n):
+        selected = rng.sample(keywords, rng.randint(0, len(keywords)))
+        selected_languages = rng.sample(languages, rng.randint(0, len(languages)))
+        if rng.random() < 0.1:
+            selected.append("Unknown feature")
+        rng.shuffle(selected)
+        cases.append([selected, selected_languages, rng.choice(["main", "any"]), rng.choice(["any", "all"])])
+    return cases
+
+
+def client_results(index, cases):
+    """{"figures": [...], "facets": [...]} of clientside.js for the cases, computed by Node.js."""
+    with tempfile.TemporaryDirectory() as tmp:
+        script, data = os.path.join(tmp, "parity.js"), os.path.join(tmp, "cases.json")
+        with open(script, "w", encoding="utf-8") as f:
+            f.write(NODE_SCRIPT)
+        with open(data, "w", encoding="utf-8") as f:
+            json.dump({"index": index, "cases": cases}, f)
+        out = subprocess.run(["node", script, os.path.join(PROJECT_DIR, "assets", "clientside.js"), data],
+                             capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def differences(expected, actual):
+    """Names of the parts of two figures that differ ([] if equal)."""
+    expected_traces, actual_traces = expected.get("data", []), actual.get("data", [])
+    if len(expected_traces) != len(actual_traces):
+        return ["data"]
+    found = sorted({key for e, a in zip(expected_traces, actual_traces)
+                    for key in TRACE_KEYS if e.get(key) != a.get(key)})
+    if not found and expected != actual:
+        found.append("figure")
+    return found
+
+
+def facet_differences(expected, actual):
+    """Which of feature options, language options, summary differ ([] if equal)."""
+    names = ("feature options", "language options", "summary")
+    return [name for name, e, a in zip(names, expected, actual) if e != a]
+
+
+if __name__ == "__main__":
+    import main
+
+    parser = argparse.ArgumentParser(description="Compare clientside.js sunbursts with the Python figures.")
+    parser.add_argument("--workbook", help="use this workbook instead of synthetic data")
+    add_size_arguments(parser)
+    parser.add_argument("--cases", type=int, default=300)
+    args = parser.parse_args()
+
+    if shutil.which("node") is None:
+        sys.exit("node (Node.js) is needed to run clientside.js")
+    if args.workbook:
+        from datastore import load_snapshot
+        snap = load_snapshot(args.workbook)
+    else:
+        snap = build_snapshot(*make_frames(**size_kwargs(args)), version="parity")
+
+    cases = random_cases(snap, args.cases, args.seed)
+    # Through JSON, as the browser gets them (tuples -> lists, numpy -> numbers)
+    index = json.loads(json.dumps(main.client_index(snap)))
+    expected = json.loads(json.dumps([main.build_sunburst_figure(snap, *case) for case in cases]))
+    expected_facets = json.loads(json.dumps([main.facet_options(snap, *case) for case in cases]))
+    actual = client_results(index, cases)
+
+    failed = 0
+    for case, e, a, ef, af in zip(cases, expected, actual["figures"], expected_facets, actual["facets"]):
+        found = differences(e, a) + facet_differences(ef, af)
+        if found:
+            failed += 1
+            if failed <= 5:
+                keywords, languages, mode, match = case
+                print(f"{', '.join(found)} differ for {len(keywords)} features, languages {languages}, "
+                      f"language_mode={mode}, feature_match={match}")
+    print(f"{len(cases) - failed} of {len(cases)} filter states match")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,93 @@
+"""
+Generator for synthetic workbooks shaped like volunteer_data.xlsx.
+
+    python -m benchmarks.synthetic out.xlsx --platforms 5000 --features 500 \\
+        --groups 20 --languages 8 --density 0.05
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+
+def make_frames(n_platforms, n_features, n_groups, n_languages, density, seed=0):
+    """
+    Return (df_platforms, df_features, df_pf) frames with the same columns
+    as the real sheets. Every platform supports 1-3 languages; each domain
+    feature is present on a platform with probability `density`.
+    """
+    rng = np.random.default_rng(seed)
+
+    platform_ids = [f"P{i:06d}" for i in range(n_platforms)]
+    df_platforms = pd.DataFrame({
+        "platform_id": platform_ids,
+        "name": [f"Platform {i}" for i in range(n_platforms)],
+        "url": [f"https://platform{i}.example.org/" for i in range(n_platforms)],
+    })
+
+    feature_ids = [f"F_{i:05d}" for i in range(n_features)]
+    language_ids = [f"F_LANG_{i:03d}" for i in range(n_languages)]
+    df_features = pd.DataFrame({
+        "feature_id": feature_ids + language_ids,
+        "group": [f"Group {i % max(n_groups, 1)}" for i in range(n_features)]
+                 + ["Language"] * n_languages,
+        "name": [f"Feature {i}" for i in range(n_features)]
+                + [f"Language: Language {i}" for i in range(n_languages)],
+        "description": [""] * (n_features + n_languages),
+    })
+
+    # Domain memberships: Bernoulli(density) per platform x feature
+    p_idx, f_idx = np.nonzero(rng.random((n_platforms, n_features)) < density)
+    pairs = [np.column_stack([p_idx, f_idx])]
+
+    # Languages: 1-3 per platform
+    if n_languages:
+        n_langs = rng.integers(1, min(3, n_languages) + 1, size=n_platforms)
+        lang_p = np.repeat(np.arange(n_platforms), n_langs)
+        lang_l = np.concatenate([rng.choice(n_languages, k, replace=False) for k in n_langs])
+        pairs.append(np.column_stack([lang_p, lang_l + n_features]))
+
+    pairs = np.concatenate(pairs)
+    df_pf = pd.DataFrame({
+        "platform_id": np.asarray(platform_ids, dtype=object)[pairs[:, 0]],
+        "feature_id": np.asarray(feature_ids + language_ids, dtype=object)[pairs[:, 1]],
+    })
+    return df_platforms, df_features, df_pf
+
+
+def write_workbook(path, n_platforms=1000, n_features=100, n_groups=10,
+                   n_languages=4, density=0.1, seed=0):
+    """Write a synthetic workbook to path and return the number of PlatformFeatures rows."""
+    df_platforms, df_features, df_pf = make_frames(
+        n_platforms, n_features, n_groups, n_languages, density, seed
+    )
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        df_platforms.to_excel(writer, sheet_name="Platforms", index=False)
+        df_features.to_excel(writer, sheet_name="Features", index=False)
+        df_pf.to_excel(writer, sheet_name="PlatformFeatures", index=False)
+    return len(df_pf)
+
+
+def add_size_arguments(parser):
+    parser.add_argument("--platforms", type=int, default=1000)
+    parser.add_argument("--features", type=int, default=100)
+    parser.add_argument("--groups", type=int, default=10)
+    parser.add_argument("--languages", type=int, default=4)
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def size_kwargs(args):
+    return dict(n_platforms=args.platforms, n_features=args.features, n_groups=args.groups,
+                n_languages=args.languages, density=args.density, seed=args.seed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic volunteer workbook.")
+    parser.add_argument("path")
+    add_size_arguments(parser)
+    args = parser.parse_args()
+
+    rows = write_workbook(args.path, **size_kwargs(args))
+    print(f"Wrote {args.path}: {args.platforms} platforms, {args.features} features, "
+          f"{rows} PlatformFeatures rows")
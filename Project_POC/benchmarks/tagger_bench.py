@@ -0,0 +1,57 @@
+"""
+Throughput of featuretagger in documents per second.
+
+Generates synthetic platform descriptions (filler words with synonyms
+from keyword_mapping mixed in) and tags them in this process and on
+process pools of increasing size:
+
+    python -m benchmarks.tagger_bench --documents 50000 --words 300 --workers 1 2 4
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from featuretagger import BATCH_SIZE, FeatureMatcher, tag_documents
+from keywordmapping import keyword_mapping
+
+
+FILLER = ("the", "volunteers", "organisation", "platform", "our", "with", "and", "for",
+          "teams", "people", "local", "helps", "nonprofit", "manage", "simple", "work")
+
+
+def make_documents(n_documents, n_words, synonym_rate=0.02, seed=0):
+    """[(platform_id, text), ...] with about synonym_rate * n_words synonyms per text."""
+    rng = np.random.default_rng(seed)
+    synonyms = [s for values in keyword_mapping.values() for s in values]
+    documents = []
+    for i in range(n_documents):
+        words = rng.choice(FILLER, size=n_words).tolist()
+        for pos in np.flatnonzero(rng.random(n_words) < synonym_rate):
+            words[pos] = synonyms[rng.integers(len(synonyms))]
+        documents.append((f"P{i:06d}", " ".join(words)))
+    return documents
+
+
+def measure(documents, workers, batch_size):
+    start = time.perf_counter()
+    n = sum(1 for _ in tag_documents(iter(documents), workers=workers, batch_size=batch_size))
+    return n / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure featuretagger documents per second.")
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--words", type=int, default=200, help="words per document")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, os.cpu_count() or 1])
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    documents = make_documents(args.documents, args.words)
+    tags = sum(len(FeatureMatcher().tag(text)) for _, text in documents[:1000])
+    print(f"{args.documents} documents x {args.words} words, "
+          f"{tags / min(len(documents), 1000):.1f} features per document")
+    print(f"{'workers':>8} {'docs/s':>12}")
+    for workers in dict.fromkeys(args.workers):
+        print(f"{workers:>8} {measure(documents, workers, args.batch_size):>12.0f}")
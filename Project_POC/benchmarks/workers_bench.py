@@ -0,0 +1,85 @@
+"""
+Memory per worker: every worker loading the workbook vs. attaching to the
+shared, memory-mapped index (sharedindex.py).
+
+Starts N worker processes for each mode, lets each build/attach its
+snapshot and touch the whole matrix, then reports RSS and PSS (the
+proportional share of shared pages; Linux only) per worker.
+
+    python -m benchmarks.workers_bench --workers 4 --platforms 20000 --features 500
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+
+from benchmarks.synthetic import add_size_arguments, size_kwargs, write_workbook
+
+
+def memory_kb():
+    """(RSS, PSS) of this process in KB; PSS is None where /proc is missing."""
+    values = {}
+    try:
+        with open("/proc/self/smaps_rollup", encoding="ascii") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss"):
+                    values[key] = int(rest.split()[0])
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, None
+    return values.get("Rss"), values.get("Pss")
+
+
+def _worker(mode, source, ready, done, results):
+    from datastore import load_snapshot
+    from sharedindex import attach_snapshot
+
+    base = memory_kb()
+    snap = attach_snapshot(source) if mode == "shared" else load_snapshot(source)
+    snap.index.matrix.sum()  # touch every page, as callbacks eventually do
+    ready.wait()             # measure while all workers are alive
+    rss, pss = memory_kb()
+    results.put((rss - base[0], pss - base[1] if pss is not None else None))
+    done.wait()
+
+
+def run_mode(mode, source, workers):
+    ctx = multiprocessing.get_context("spawn")
+    ready = ctx.Barrier(workers + 1)
+    done = ctx.Event()
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(mode, source, ready, done, results))
+             for _ in range(workers)]
+    for p in procs:
+        p.start()
+    ready.wait()
+    measured = [results.get() for _ in procs]
+    done.set()
+    for p in procs:
+        p.join()
+    return measured
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    add_size_arguments(parser)
+    args = parser.parse_args()
+
+    from datastore import load_snapshot
+    from sharedindex import publish
+
+    with tempfile.TemporaryDirectory() as tmp:
+        excel_path = os.path.join(tmp, "synthetic.xlsx")
+        write_workbook(excel_path, **size_kwargs(args))
+        shared_dir = os.path.join(tmp, "shared")
+        publish(load_snapshot(excel_path), shared_dir)  # also warms the Parquet cache
+
+        print(f"{'mode':<10} {'workers':>7} {'RSS MB/worker':>14} {'PSS MB/worker':>14}")
+        for mode, source in (("workbook", excel_path), ("shared", shared_dir)):
+            measured = run_mode(mode, source, args.workers)
+            rss = sum(m[0] for m in measured) / len(measured) / 1024
+            pss = (sum(m[1] for m in measured) / len(measured) / 1024
+                   if measured[0][1] is not None else float("nan"))
+            print(f"{mode:<10} {args.workers:>7} {rss:>14.1f} {pss:>14.1f}")
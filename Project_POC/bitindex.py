@@ -0,0 +1,388 @@
+"""
+Integer-ID platform x feature index built once per data version.
+
+Platform, feature and language names are interned to row/column numbers
+(sorted by name, so results come out in the same order as the sorted
+lists in the lookup dicts). Membership is a boolean NumPy matrix, which
+turns keyword filtering, language filtering and A/B diffs into
+vectorized mask operations instead of Python loops over lists.
+
+The language filter has two meanings (LANGUAGE_MODES): a platform matches
+by its main language, or by any language it supports. For both, a feature
+x language count cube is built once, so feature counts are table lookups.
+
+Selected features combine with OR (a ring per feature, the default) or
+AND (only platforms having all of them, FEATURE_MATCHES). Facet counts
+for every feature and language use the columns packed into 64-bit words,
+so they are a few AND + popcount passes over a few MB.
+"""
+import copy
+
+import numpy as np
+
+
+LANGUAGE_GROUP = "Language"
+OTHER_GROUP = "Other"       # features without a group
+LANGUAGE_MODES = ("main", "any")
+FEATURE_MATCHES = ("any", "all")
+
+# Set bits per byte, for NumPy versions without np.bitwise_count
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def pack_columns(matrix):
+    """Each column of a bool (platforms x n) matrix as a row of 64-bit words."""
+    n_rows = matrix.shape[0]
+    words = np.zeros((matrix.shape[1], -(-n_rows // 64) * 8), dtype=np.uint8)
+    if n_rows:
+        words[:, :-(-n_rows // 8)] = np.packbits(matrix.T, axis=1)
+    return words.view(np.uint64)
+
+
+def popcount(words):
+    """Set bits per row (last axis) of a uint64 array."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    return _POPCOUNT8[words.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+def language_name(feature_name):
+    """'Language: English' -> 'English'"""
+    return feature_name.replace("Language:", "").strip()
+
+
+class BitsetIndex:
+    """
+    - matrix[p, f]      platform p has (domain) feature f
+    - lang_matrix[p, l] platform p supports language l
+    - main_lang[p]      code of the main language of p (-1 if unknown)
+    - feature_groups[f] group of feature f (Features.group column)
+
+    Per language mode:
+    - lang_members[mode][p, l]  platform p matches language l
+    - lang_counts[mode][f, l]   number of platforms with feature f matching l
+    - feature_words / lang_words[mode]: the columns of matrix /
+      lang_members[mode] packed into 64-bit words (bit p = platform p)
+    """
+
+    def __init__(self, platforms, features, matrix, languages, lang_matrix, feature_groups=None):
+        self._set_names(platforms, features, languages, feature_groups)
+        self.matrix = matrix
+        self.lang_matrix = lang_matrix
+
+        # Number of (domain) features per platform
+        self.feature_totals = matrix.sum(axis=1)
+
+        # Main language = alphabetically first one (same rule as the dicts)
+        if self.languages:
+            has_lang = lang_matrix.any(axis=1)
+            self.main_lang = np.where(has_lang, lang_matrix.argmax(axis=1), -1).astype(np.int32)
+        else:
+            self.main_lang = np.full(len(self.platforms), -1, dtype=np.int32)
+
+        self.lang_members = {
+            "main": self.main_lang[:, None] == np.arange(len(self.languages)),
+            "any": lang_matrix,
+        }
+        self.lang_counts = {mode: self._count_cube(m) for mode, m in self.lang_members.items()}
+        self.feature_platform_counts = matrix.sum(axis=0)
+
+        self.feature_words = pack_columns(matrix)
+        self.lang_words = {mode: pack_columns(m) for mode, m in self.lang_members.items()}
+        self.all_words = pack_columns(np.ones((len(self.platforms), 1), dtype=bool))[0]
+
+    def _set_names(self, platforms, features, languages, feature_groups):
+        self.platforms = np.asarray(platforms, dtype=object)
+        self.features = np.asarray(features, dtype=object)
+        self.languages = list(languages)
+        if feature_groups is None:
+            feature_groups = [OTHER_GROUP] * len(self.features)
+        self.feature_groups = list(feature_groups)
+
+        self.platform_ids = {p: i for i, p in enumerate(self.platforms)}
+        self.feature_ids = {f: i for i, f in enumerate(self.features)}
+        self.language_ids = {lang: i for i, lang in enumerate(self.languages)}
+
+    def arrays(self):
+        """{name: array} of the memberships and everything derived from them (see from_arrays)."""
+        arrays = {
+            "matrix": self.matrix,
+            "lang_matrix": self.lang_matrix,
+            "feature_totals": self.feature_totals,
+            "main_lang": self.main_lang,
+            "main_members": self.lang_members["main"],
+            "feature_platform_counts": self.feature_platform_counts,
+            "feature_words": self.feature_words,
+            "all_words": self.all_words,
+        }
+        for mode in LANGUAGE_MODES:
+            arrays[f"lang_counts_{mode}"] = self.lang_counts[mode]
+            arrays[f"lang_words_{mode}"] = self.lang_words[mode]
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, platforms, features, languages, feature_groups, arrays):
+        """
+        Index from the arrays() of an index with these names, used as they
+        are (e.g. memory-mapped by sharedindex.py): nothing is recomputed.
+        """
+        index = cls.__new__(cls)
+        index._set_names(platforms, features, languages, feature_groups)
+        index.matrix = arrays["matrix"]
+        index.lang_matrix = arrays["lang_matrix"]
+        index.feature_totals = arrays["feature_totals"]
+        index.main_lang = arrays["main_lang"]
+        index.lang_members = {"main": arrays["main_members"], "any": arrays["lang_matrix"]}
+        index.lang_counts = {mode: arrays[f"lang_counts_{mode}"] for mode in LANGUAGE_MODES}
+        index.feature_platform_counts = arrays["feature_platform_counts"]
+        index.feature_words = arrays["feature_words"]
+        index.lang_words = {mode: arrays[f"lang_words_{mode}"] for mode in LANGUAGE_MODES}
+        index.all_words = arrays["all_words"]
+        return index
+
+    def _count_cube(self, members):
+        # features x languages: one pass over each language's platforms
+        cube = np.zeros((len(self.features), len(self.languages)), dtype=np.int32)
+        for lang in range(len(self.languages)):
+            cube[:, lang] = self.matrix[members[:, lang]].sum(axis=0)
+        return cube
+
+    @classmethod
+    def from_frame(cls, df_pf_full):
+        """Build the index from the joined platform-feature table."""
+        df = df_pf_full.dropna(subset=["name_platform", "name_feature"])
+        is_lang = (df["group"] == LANGUAGE_GROUP).to_numpy()
+        df_domain = df[~is_lang]
+        df_lang = df[is_lang]
+
+        platforms = sorted(df["name_platform"].unique())
+        features = sorted(df_domain["name_feature"].unique())
+        lang_names = df_lang["name_feature"].map(language_name)
+        languages = sorted(lang_names.unique())
+
+        p_ids = {p: i for i, p in enumerate(platforms)}
+        f_ids = {f: i for i, f in enumerate(features)}
+        l_ids = {lang: i for i, lang in enumerate(languages)}
+
+        matrix = np.zeros((len(platforms), len(features)), dtype=bool)
+        matrix[df_domain["name_platform"].map(p_ids).to_numpy(dtype=np.intp),
+               df_domain["name_feature"].map(f_ids).to_numpy(dtype=np.intp)] = True
+
+        lang_matrix = np.zeros((len(platforms), len(languages)), dtype=bool)
+        lang_matrix[df_lang["name_platform"].map(p_ids).to_numpy(dtype=np.intp),
+                    lang_names.map(l_ids).to_numpy(dtype=np.intp)] = True
+
+        # object dtype: "Other" is not one of the categories of the group column
+        groups = (
+            df_domain.groupby("name_feature", observed=True)["group"].first()
+            .astype(object).reindex(features).fillna(OTHER_GROUP)
+        )
+
+        return cls(platforms, features, matrix, languages, lang_matrix, groups.tolist())
+
+    def patched(self, matrix, lang_matrix, rows, feature_groups=None):
+        """
+        Index for new membership matrices of the same shape that differ
+        from this one only in the platforms `rows` (delta.py). The derived
+        arrays are copied (O(index) bytes, this index stays valid) and only
+        updated for those rows instead of recomputed; names and their id
+        dicts are shared.
+        """
+        rows = np.unique(np.asarray(rows, dtype=np.intp))
+        new = copy.copy(self)
+        new.matrix = matrix
+        new.lang_matrix = lang_matrix
+        if feature_groups is not None:
+            new.feature_groups = list(feature_groups)
+
+        new.feature_totals = self.feature_totals.copy()
+        new.feature_totals[rows] = matrix[rows].sum(axis=1)
+        new.feature_platform_counts = (self.feature_platform_counts
+                                       + matrix[rows].sum(axis=0) - self.matrix[rows].sum(axis=0))
+
+        new.main_lang = self.main_lang.copy()
+        if self.languages:
+            has_lang = lang_matrix[rows].any(axis=1)
+            new.main_lang[rows] = np.where(has_lang, lang_matrix[rows].argmax(axis=1), -1)
+        main_members = self.lang_members["main"].copy()
+        main_members[rows] = new.main_lang[rows, None] == np.arange(len(self.languages))
+        new.lang_members = {"main": main_members, "any": lang_matrix}
+
+        # Count cube: take the old rows out, put the new ones in
+        old_feats = self.matrix[rows].astype(np.int32)
+        new_feats = matrix[rows].astype(np.int32)
+        new.lang_counts = {
+            mode: (cube - old_feats.T @ self.lang_members[mode][rows].astype(np.int32)
+                   + new_feats.T @ new.lang_members[mode][rows].astype(np.int32)).astype(np.int32)
+            for mode, cube in self.lang_counts.items()
+        }
+
+        # Re-pack only the 64-platform words that contain a changed row
+        words = np.unique(rows // 64)
+        new.feature_words = self.feature_words.copy()
+        new.lang_words = {mode: w.copy() for mode, w in self.lang_words.items()}
+        for w in words:
+            block = slice(w * 64, (w + 1) * 64)
+            new.feature_words[:, w] = pack_columns(matrix[block])[:, 0]
+            for mode, members in new.lang_members.items():
+                new.lang_words[mode][:, w] = pack_columns(members[block])[:, 0]
+        return new
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    def packed(self):
+        """Bit-packed copy of the membership matrix (8 features per byte)."""
+        return np.packbits(self.matrix, axis=1)
+
+    # MASKS
+
+    def language_codes(self, languages):
+        return list(dict.fromkeys(self.language_ids[lang] for lang in languages if lang in self.language_ids))
+
+    def language_mask(self, languages, mode="main"):
+        """Platforms matching one of `languages` (by main or by any supported language)."""
+        return self.lang_members[mode][:, self.language_codes(languages)].any(axis=1)
+
+    def feature_mask(self, keywords, match="any"):
+        """Platforms having any / all (FEATURE_MATCHES) of `keywords` (unknown ones are skipped)."""
+        cols = self.matrix[:, [self.feature_ids[k] for k in keywords if k in self.feature_ids]]
+        if match == "all":
+            return cols.all(axis=1)
+        return cols.any(axis=1)
+
+    def platform_row(self, platform):
+        pid = self.platform_ids.get(platform)
+        if pid is None:
+            return np.zeros(len(self.features), dtype=bool)
+        return self.matrix[pid]
+
+    # QUERIES
+
+    def _selection(self, keywords, languages, mode="main", match="any"):
+        """
+        Known keywords and the platform x keyword sub-matrix after the
+        language filter (and, for match="all", only platforms having all keywords).
+        """
+        keywords = [k for k in keywords if k in self.feature_ids]
+        sub = self.matrix[:, [self.feature_ids[k] for k in keywords]]
+        if languages is not None:
+            sub &= self.language_mask(languages, mode)[:, None]
+        if match == "all":
+            sub &= sub.all(axis=1)[:, None]
+        return keywords, sub
+
+    def filter_platforms(self, keywords, languages=None, mode="main", match="any"):
+        """
+        For each keyword (in the given order) the sorted platforms that have
+        it, optionally restricted to platforms matching `languages` (see
+        LANGUAGE_MODES) and, for match="all", to platforms having every
+        keyword. Keywords without platforms are left out.
+        Returns a list of (keyword, [platforms]).
+        """
+        keywords, sub = self._selection(keywords, languages, mode, match)
+        counts = sub.sum(axis=0)
+        return [
+            (k, self.platforms[sub[:, j]].tolist())
+            for j, k in enumerate(keywords) if counts[j]
+        ]
+
+    def feature_counts(self, keywords, languages=None, mode="main", match="any"):
+        """
+        Like filter_platforms, but only (keyword, number of platforms).
+        Answered from the count cube where the counts add up: always for
+        main languages (one per platform), for "any" with a single language.
+        """
+        keywords = [k for k in keywords if k in self.feature_ids]
+        fids = [self.feature_ids[k] for k in keywords]
+        if match == "all":
+            counts = self._selection(keywords, languages, mode, match)[1].sum(axis=0)
+        elif languages is None:
+            counts = self.feature_platform_counts[fids]
+        else:
+            codes = self.language_codes(languages)
+            if mode == "main" or len(codes) <= 1:
+                counts = self.lang_counts[mode][fids][:, codes].sum(axis=1)
+            else:
+                # A platform may support several of the languages: count the union
+                counts = self.matrix[self.language_mask(languages, mode)][:, fids].sum(axis=0)
+        return [(k, int(c)) for k, c in zip(keywords, counts) if c]
+
+    def top_platforms(self, keyword, languages=None, n=None, mode="main", within=None):
+        """
+        Platforms having `keyword` (after the language filter and, if given,
+        among the platforms of the `within` mask), those with the most
+        features first, ties by name. Returns (first n, number left out).
+        """
+        _, sub = self._selection([keyword], languages, mode)
+        if within is not None:
+            sub &= within[:, None]
+        ids = np.flatnonzero(sub[:, 0]) if sub.shape[1] else np.array([], dtype=np.intp)
+        ids = ids[np.argsort(-self.feature_totals[ids], kind="stable")]
+        if n is None or len(ids) <= n:
+            return self.platforms[ids].tolist(), 0
+        return self.platforms[ids[:n]].tolist(), len(ids) - n
+
+    def facet_counts(self, keywords, languages=None, mode="main", match="any"):
+        """
+        Live counts for faceted navigation. The selection is the platforms
+        having any / all of `keywords` (match) and matching `languages`.
+        Returns (size of the selection, counts per feature, counts per language):
+        - feature f: platforms f's ring would show, i.e. those (after the
+          language filter) with f - for match="all" only within the
+          selection, which is also what checking f would leave
+        - language l: platforms of the feature selection matching l
+        Counts are arrays in index order (features / languages).
+        """
+        none = np.zeros_like(self.all_words)
+        fids = [self.feature_ids[k] for k in keywords if k in self.feature_ids]
+        if not fids:
+            selected = self.all_words if match == "all" else none
+        elif match == "all":
+            selected = np.bitwise_and.reduce(self.feature_words[fids], axis=0)
+        else:
+            selected = np.bitwise_or.reduce(self.feature_words[fids], axis=0)
+
+        if languages is None:
+            lang_words = self.all_words
+        else:
+            codes = self.language_codes(languages)
+            lang_words = np.bitwise_or.reduce(self.lang_words[mode][codes], axis=0) if codes else none
+
+        base = selected & lang_words if match == "all" else lang_words
+        return (
+            int(popcount(selected & lang_words)),
+            popcount(self.feature_words & base),
+            popcount(self.lang_words[mode] & selected),
+        )
+
+    def compare(self, platforms):
+        """
+        N-way comparison of the given platforms (unknown ones are skipped):
+        - features:   every feature at least one of them has
+        - membership: bool array (features x platforms), who has which
+        - shared:     features all of them have
+        - unique:     {platform: features only that platform has}
+        """
+        platforms = [p for p in dict.fromkeys(platforms) if p in self.platform_ids]
+        rows = self.matrix[[self.platform_ids[p] for p in platforms]]
+        any_mask = np.logical_or.reduce(rows, axis=0) if platforms else np.zeros(len(self.features), dtype=bool)
+        all_mask = np.logical_and.reduce(rows, axis=0) if platforms else any_mask
+        owners = rows.sum(axis=0)
+        unique = rows & (owners == 1)
+
+        return {
+            "platforms": platforms,
+            "features": self.features[any_mask].tolist(),
+            "membership": rows[:, any_mask].T,
+            "shared": self.features[all_mask].tolist(),
+            "unique": {p: self.features[unique[i]].tolist() for i, p in enumerate(platforms)},
+        }
+
+    def feature_diff(self, platform_a, platform_b):
+        """Return (only_in_A, only_in_B) feature lists."""
+        row_a = self.platform_row(platform_a)
+        row_b = self.platform_row(platform_b)
+        return (self.features[row_a & ~row_b].tolist(),
+                self.features[row_b & ~row_a].tolist())
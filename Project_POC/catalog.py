@@ -0,0 +1,290 @@
+"""
+Compact catalog: the lookup "dicts" of a data version as integer arrays.
+
+Platform, feature and language names are numbered once (the catalog
+shares the name arrays and name -> id dicts of the BitsetIndex).
+Memberships are stored CSR-style, as an int64 `indptr` plus an int32
+`indices` array per direction:
+
+    platform p -> features  indices[indptr[p]:indptr[p + 1]]
+
+so a catalog of N platforms x M memberships costs about 4 * M bytes per
+direction instead of one Python list per platform and feature.
+
+The callbacks keep their dict interface: keyword_to_platforms,
+platform_to_keywords, platform_languages_multi, platform_main_language
+and platform_links are read-only Mapping views that decode one entry
+(a fresh sorted list of names) when it is looked up.
+
+    python -m benchmarks.memory_bench --platforms 10000 --features 1000
+"""
+import copy
+import sys
+from collections.abc import Mapping
+
+import numpy as np
+
+from bitindex import LANGUAGE_GROUP, OTHER_GROUP
+
+
+def intern_names(names):
+    """Names as an object array of interned strings (one copy per distinct name)."""
+    return np.array([sys.intern(str(n)) for n in names], dtype=object)
+
+
+def csr_from_matrix(matrix):
+    """(indptr, indices) of the True cells of a bool matrix, row by row."""
+    rows, cols = np.nonzero(matrix)
+    indptr = np.zeros(matrix.shape[0] + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=matrix.shape[0]), out=indptr[1:])
+    return indptr, cols.astype(np.int32)
+
+
+def csr_replace_rows(csr, rows, matrix):
+    """
+    (indptr, indices) with the given rows replaced by the True cells of
+    the same rows of `matrix`. Other rows' entries are moved, not rebuilt.
+    """
+    indptr, indices = csr
+    rows = np.unique(np.asarray(rows, dtype=np.intp))
+    counts = np.diff(indptr)
+    new_rows = [np.flatnonzero(matrix[r]).astype(np.int32) for r in rows]
+    new_counts = counts.copy()
+    new_counts[rows] = [len(r) for r in new_rows]
+    new_indptr = np.zeros_like(indptr)
+    np.cumsum(new_counts, out=new_indptr[1:])
+
+    new_indices = np.empty(new_indptr[-1], dtype=np.int32)
+    kept = np.ones(len(counts), dtype=bool)
+    kept[rows] = False
+    shift = np.repeat((new_indptr[:-1] - indptr[:-1])[kept], counts[kept])
+    old_positions = np.flatnonzero(np.repeat(kept, counts))
+    new_indices[old_positions + shift] = indices[old_positions]
+    for r, values in zip(rows, new_rows):
+        new_indices[new_indptr[r]:new_indptr[r + 1]] = values
+    return new_indptr, new_indices
+
+
+class ListView(Mapping):
+    """name -> sorted list of names, decoded from a CSR adjacency. Rows without entries are absent."""
+
+    __slots__ = ("_ids", "_keys", "_values", "_indptr", "_indices", "_rows")
+
+    def __init__(self, ids, keys, values, indptr, indices):
+        self._ids = ids
+        self._keys = keys
+        self._values = values
+        self._indptr = indptr
+        self._indices = indices
+        self._rows = np.flatnonzero(np.diff(indptr))
+
+    def __getitem__(self, name):
+        row = self._ids[name]
+        start, end = self._indptr[row], self._indptr[row + 1]
+        if start == end:
+            raise KeyError(name)
+        return self._values[self._indices[start:end]].tolist()
+
+    def __iter__(self):
+        return iter(self._keys[self._rows].tolist())
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, name):
+        row = self._ids.get(name)
+        return row is not None and self._indptr[row] != self._indptr[row + 1]
+
+
+class ValueView(Mapping):
+    """
+    name -> one name, from an int32 code per row (-1: absent), plus the
+    entries of `extra` for names that have no row.
+    """
+
+    __slots__ = ("_ids", "_keys", "_values", "_codes", "_rows", "_extra")
+
+    def __init__(self, ids, keys, values, codes, extra=None):
+        self._ids = ids
+        self._keys = keys
+        self._values = values
+        self._codes = codes
+        self._rows = np.flatnonzero(codes >= 0)
+        self._extra = extra or {}
+
+    def __getitem__(self, name):
+        row = self._ids.get(name)
+        if row is None:
+            return self._extra[name]
+        code = self._codes[row]
+        if code < 0:
+            raise KeyError(name)
+        return self._values[code]
+
+    def __iter__(self):
+        yield from self._keys[self._rows].tolist()
+        yield from self._extra
+
+    def __len__(self):
+        return len(self._rows) + len(self._extra)
+
+    def __contains__(self, name):
+        row = self._ids.get(name)
+        if row is None:
+            return name in self._extra
+        return self._codes[row] >= 0
+
+
+class PlatformRecord:
+    """Everything the catalog knows about one platform."""
+
+    __slots__ = ("name", "url", "features", "languages", "main_language")
+
+    def __init__(self, name, url, features, languages, main_language):
+        self.name = name
+        self.url = url
+        self.features = features
+        self.languages = languages
+        self.main_language = main_language
+
+
+class Catalog:
+    """
+    Read-only catalog built from a BitsetIndex (shares its name -> id dicts),
+    {platform name: url or None} for every row of the Platforms sheet and
+    {feature name: group} for every row of the Features sheet.
+    Platforms and features without any membership are not in the index:
+    platforms are kept in `unindexed_platforms` (name -> url or None), so
+    their links are still listed and checked, and `feature_table` holds
+    every feature with its group (delta.py links them later).
+    """
+
+    def __init__(self, index, platform_links, feature_table=None):
+        self.platforms = index.platforms
+        self.features = index.features
+        self.languages = np.asarray(index.languages, dtype=object)
+        self.platform_ids = platform_ids = index.platform_ids
+
+        self.platform_features = csr_from_matrix(index.matrix)
+        self.feature_platforms = csr_from_matrix(np.asarray(index.matrix).T)
+        self.platform_languages = csr_from_matrix(index.lang_matrix)
+        self.main_language = np.asarray(index.main_lang, dtype=np.int32)
+
+        # URLs: one interned string per distinct URL, an int32 code per platform
+        urls = {p: u for p, u in platform_links.items() if p in platform_ids and isinstance(u, str)}
+        self.urls = intern_names(sorted(set(urls.values())))
+        url_ids = {u: i for i, u in enumerate(self.urls)}
+        self.url_codes = np.full(len(self.platforms), -1, dtype=np.int32)
+        for p, u in urls.items():
+            self.url_codes[platform_ids[p]] = url_ids[u]
+        self.unindexed_platforms = {p: u for p, u in platform_links.items() if p not in platform_ids}
+        if feature_table is None:
+            # Only what the index knows: language features by their usual name
+            feature_table = dict(zip(index.features.tolist(), index.feature_groups))
+            feature_table.update((f"Language: {lang}", LANGUAGE_GROUP) for lang in index.languages)
+        self.feature_table = {f: OTHER_GROUP if g is None else g for f, g in feature_table.items()}
+        self._make_views(index)
+
+    def arrays(self):
+        """{name: array} of the CSR and code arrays (see from_arrays)."""
+        arrays = {"main_language": self.main_language, "url_codes": self.url_codes}
+        for name in ("platform_features", "feature_platforms", "platform_languages"):
+            arrays[f"{name}_indptr"], arrays[f"{name}_indices"] = getattr(self, name)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, index, arrays, urls, unindexed_platforms, feature_table):
+        """
+        Catalog of `index` from the arrays() and urls of a catalog of the
+        same index, used as they are (e.g. memory-mapped by sharedindex.py).
+        """
+        catalog = cls.__new__(cls)
+        catalog.platforms = index.platforms
+        catalog.features = index.features
+        catalog.languages = np.asarray(index.languages, dtype=object)
+        catalog.platform_ids = index.platform_ids
+        for name in ("platform_features", "feature_platforms", "platform_languages"):
+            setattr(catalog, name, (arrays[f"{name}_indptr"], arrays[f"{name}_indices"]))
+        catalog.main_language = arrays["main_language"]
+        catalog.urls = intern_names(urls)
+        catalog.url_codes = arrays["url_codes"]
+        catalog.unindexed_platforms = unindexed_platforms
+        catalog.feature_table = feature_table
+        catalog._make_views(index)
+        return catalog
+
+    def _make_views(self, index):
+        platform_ids, feature_ids = index.platform_ids, index.feature_ids
+        self.keyword_to_platforms = ListView(feature_ids, self.features, self.platforms,
+                                             *self.feature_platforms)
+        self.platform_to_keywords = ListView(platform_ids, self.platforms, self.features,
+                                             *self.platform_features)
+        self.platform_languages_multi = ListView(platform_ids, self.platforms, self.languages,
+                                                 *self.platform_languages)
+        self.platform_main_language = ValueView(platform_ids, self.platforms, self.languages,
+                                                self.main_language)
+        self.platform_links = ValueView(platform_ids, self.platforms, self.urls, self.url_codes,
+                                        {p: u for p, u in self.unindexed_platforms.items() if isinstance(u, str)})
+
+    def patched(self, index, rows, columns, platform_links=None, unindexed_platforms=None, feature_table=None):
+        """
+        Catalog of `index` (BitsetIndex.patched of this catalog's index:
+        same names) where only the platforms `rows`, the features
+        `columns` and the links in `platform_links` ({platform: url or
+        None}) changed. Only those CSR rows are rebuilt; the tables of
+        platforms and features without memberships are replaced if given.
+        """
+        new = copy.copy(self)
+        if unindexed_platforms is not None:
+            new.unindexed_platforms = unindexed_platforms
+        if feature_table is not None:
+            new.feature_table = feature_table
+        matrix = np.asarray(index.matrix)
+        new.platform_features = csr_replace_rows(self.platform_features, rows, matrix)
+        new.feature_platforms = csr_replace_rows(self.feature_platforms, columns, matrix.T)
+        new.platform_languages = csr_replace_rows(self.platform_languages, rows, index.lang_matrix)
+        new.main_language = np.asarray(index.main_lang, dtype=np.int32)
+
+        if platform_links:
+            # New URLs are appended (self.urls is no longer sorted after that)
+            url_ids = {u: i for i, u in enumerate(self.urls)}
+            added = [u for u in dict.fromkeys(platform_links.values()) if isinstance(u, str) and u not in url_ids]
+            url_ids.update((u, len(url_ids)) for u in added)
+            new.urls = np.concatenate([self.urls, intern_names(added)]) if added else self.urls
+            new.url_codes = self.url_codes.copy()
+            for p, u in platform_links.items():
+                if p in self.platform_ids:
+                    new.url_codes[self.platform_ids[p]] = url_ids[u] if isinstance(u, str) else -1
+        new._make_views(index)
+        return new
+
+    def platform_urls(self):
+        """{platform: url or None} for every platform, as the Catalog was given them."""
+        urls = {p: self.platform_links.get(p) for p in self.platforms.tolist()}
+        urls.update(self.unindexed_platforms)
+        return urls
+
+    def platform(self, name):
+        """PlatformRecord of `name` (KeyError if unknown)."""
+        if name in self.unindexed_platforms:
+            return PlatformRecord(name, self.unindexed_platforms[name], [], [], None)
+        if name not in self.platform_ids:
+            raise KeyError(name)
+        return PlatformRecord(
+            name,
+            self.platform_links.get(name),
+            self.platform_to_keywords.get(name, []),
+            self.platform_languages_multi.get(name, []),
+            self.platform_main_language.get(name),
+        )
+
+    def used_languages(self):
+        """Languages at least one platform supports, sorted."""
+        counts = np.bincount(self.platform_languages[1], minlength=len(self.languages))
+        return self.languages[counts > 0].tolist()
+
+    def nbytes(self):
+        """Bytes held by the CSR / code arrays (the names are shared with the index)."""
+        arrays = [*self.platform_features, *self.feature_platforms, *self.platform_languages,
+                  self.main_language, self.url_codes]
+        return sum(a.nbytes for a in arrays)
@@ -0,0 +1,219 @@
+"""
+Loading of volunteer_data.xlsx with a binary on-disk cache.
+
+Parsing the workbook with openpyxl is by far the slowest part of starting
+the app, so the three sheets we use are stored as Parquet files (pickle if
+pyarrow is not installed) in a cache folder next to the workbook.
+The cache is reused as long as the workbook has the same mtime and size,
+or - if those changed - the same content hash. Otherwise it is rebuilt.
+
+pandas is imported by the functions that read frames, so processes that
+only check fingerprints and versions (or attach to the shared index) do
+not pay for importing it.
+
+Pre-warm the cache during a deploy with:
+
+    python dataloader.py volunteer_data.xlsx
+"""
+import argparse
+import hashlib
+import json
+import os
+
+
+# Sheets and the columns we keep from each of them
+SHEET_COLUMNS = {
+    "Platforms": ["platform_id", "name", "url"],
+    "Features": ["feature_id", "group", "name"],
+    "PlatformFeatures": ["platform_id", "feature_id"],
+}
+
+CACHE_DIR_NAME = ".volunteer_cache"
+
+
+# SMALL HELPERS
+
+
+def cache_format():
+    """Parquet when pyarrow is available, pickle otherwise."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return "pickle"
+    return "parquet"
+
+
+def cache_dir_for(excel_path):
+    return os.path.join(os.path.dirname(os.path.abspath(excel_path)), CACHE_DIR_NAME)
+
+
+def file_fingerprint(excel_path):
+    """Cheap check: modification time and size of the workbook."""
+    st = os.stat(excel_path)
+    return {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+def content_hash(excel_path, chunk_size=1 << 20):
+    """Expensive check: sha256 of the workbook bytes."""
+    h = hashlib.sha256()
+    with open(excel_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _stem(excel_path):
+    return os.path.splitext(os.path.basename(excel_path))[0]
+
+
+def _meta_path(excel_path):
+    return os.path.join(cache_dir_for(excel_path), f"{_stem(excel_path)}.json")
+
+
+def _sheet_path(excel_path, sheet, fmt):
+    ext = "parquet" if fmt == "parquet" else "pkl"
+    return os.path.join(cache_dir_for(excel_path), f"{_stem(excel_path)}.{sheet}.{ext}")
+
+
+def _write_atomic(path, write):
+    """Write through a temp file so other workers never see half a file."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _read_meta(excel_path):
+    try:
+        with open(_meta_path(excel_path), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(excel_path, meta):
+    def write(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+    _write_atomic(_meta_path(excel_path), write)
+
+
+# EXCEL <-> CACHE
+
+
+def read_workbook(excel_path):
+    """Read the three sheets straight from Excel (no cache)."""
+    import pandas as pd
+    frames = pd.read_excel(excel_path, sheet_name=list(SHEET_COLUMNS))
+    return tuple(frames[sheet][cols] for sheet, cols in SHEET_COLUMNS.items())
+
+
+def _read_cache(excel_path, fmt):
+    import pandas as pd
+    frames = []
+    for sheet in SHEET_COLUMNS:
+        path = _sheet_path(excel_path, sheet, fmt)
+        if fmt == "parquet":
+            frames.append(pd.read_parquet(path))
+        else:
+            frames.append(pd.read_pickle(path))
+    return tuple(frames)
+
+
+def _write_cache(excel_path, frames, fmt, fingerprint, digest):
+    os.makedirs(cache_dir_for(excel_path), exist_ok=True)
+    for sheet, df in zip(SHEET_COLUMNS, frames):
+        path = _sheet_path(excel_path, sheet, fmt)
+        if fmt == "parquet":
+            _write_atomic(path, lambda tmp: df.to_parquet(tmp, index=False))
+        else:
+            _write_atomic(path, lambda tmp: df.to_pickle(tmp))
+    # Meta goes last: it is what marks the cache as valid
+    _write_meta(excel_path, fingerprint | {"sha256": digest, "format": fmt})
+
+
+def cache_status(excel_path):
+    """
+    Return "fresh", "touched" (mtime/size changed but same content)
+    or "stale" for the cache of this workbook.
+    """
+    meta = _read_meta(excel_path)
+    fmt = cache_format()
+    if not meta or meta.get("format") != fmt:
+        return "stale"
+    if not all(os.path.exists(_sheet_path(excel_path, s, fmt)) for s in SHEET_COLUMNS):
+        return "stale"
+
+    fingerprint = file_fingerprint(excel_path)
+    if all(meta.get(k) == v for k, v in fingerprint.items()):
+        return "fresh"
+    if meta.get("sha256") == content_hash(excel_path):
+        return "touched"
+    return "stale"
+
+
+def load_sheets(excel_path, use_cache=True):
+    """
+    Return (df_platforms, df_features, df_pf) with only the columns we use.
+    Reads the binary cache when it is valid, otherwise parses the workbook
+    and (re)builds the cache.
+    """
+    if not use_cache:
+        return read_workbook(excel_path)
+
+    fmt = cache_format()
+    status = cache_status(excel_path)
+
+    if status != "stale":
+        try:
+            frames = _read_cache(excel_path, fmt)
+        except (OSError, ValueError):
+            status = "stale"
+        else:
+            if status == "touched":
+                # Same content, just remember the new mtime/size
+                meta = _read_meta(excel_path) | file_fingerprint(excel_path)
+                _write_meta(excel_path, meta)
+            return frames
+
+    fingerprint = file_fingerprint(excel_path)
+    digest = content_hash(excel_path)
+    frames = read_workbook(excel_path)
+    try:
+        _write_cache(excel_path, frames, fmt, fingerprint, digest)
+    except OSError:
+        # Read-only deployments still work, just without the cache
+        pass
+    return frames
+
+
+def workbook_version(excel_path):
+    """
+    Short content hash identifying the data. Identical across processes,
+    so every worker agrees on which version a client has seen.
+    """
+    meta = _read_meta(excel_path)
+    if meta and all(meta.get(k) == v for k, v in file_fingerprint(excel_path).items()):
+        digest = meta["sha256"]
+    else:
+        digest = content_hash(excel_path)
+    return digest[:12]
+
+
+def warm_cache(excel_path):
+    """Make sure the cache is valid. Returns the status it had before."""
+    status = cache_status(excel_path)
+    load_sheets(excel_path)
+    return status
+
+
+#   MAIN
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-warm the workbook cache.")
+    parser.add_argument("excel_path", nargs="?", default="volunteer_data.xlsx")
+    args = parser.parse_args()
+
+    before = warm_cache(args.excel_path)
+    action = "rebuilt" if before == "stale" else "already valid"
+    print(f"Cache for {args.excel_path} {action} ({cache_format()}) in {cache_dir_for(args.excel_path)}")
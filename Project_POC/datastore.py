@@ -0,0 +1,203 @@
+"""
+Everything main.py derives from volunteer_data.xlsx, kept in one place.
+
+A DataSnapshot holds one consistent version of the data (joined frame,
+the integer BitsetIndex, the compact catalog behind the lookup "dicts"
+and the similar-platform index).
+The DataStore owns the current snapshot, watches the workbook in a
+background thread and swaps in a freshly built snapshot when the file
+changes. Callbacks read `store.snapshot` once and work on that object
+only, so they never mix two versions of the data.
+"""
+import functools
+import logging
+import threading
+
+from bitindex import BitsetIndex
+from catalog import Catalog
+from dataloader import load_sheets, file_fingerprint, workbook_version
+from hierarchy import FeatureHierarchy
+from metrics import timed
+from network import NetworkLayout
+from similarity import SimilarityIndex
+
+
+log = logging.getLogger(__name__)
+
+
+# BUILDING THE SNAPSHOT
+
+
+# Repeated string columns of the joined table, stored as pandas categoricals
+# (one copy of each name plus an integer code per row)
+CATEGORY_COLUMNS = ("platform_id", "feature_id", "name_platform", "url", "group", "name_feature")
+
+
+def join_frames(df_platforms, df_features, df_pf):
+    """Join everything into one big table: platform-feature with full info."""
+    df_pf_full = (
+        df_pf
+        .merge(df_platforms, on="platform_id", how="left")       # name_platform, url
+        .merge(df_features, on="feature_id", how="left",
+               suffixes=("_platform", "_feature"))               # group, name_feature
+    )
+    columns = [c for c in CATEGORY_COLUMNS if c in df_pf_full.columns]
+    return df_pf_full.astype({c: "category" for c in columns})
+
+
+def platform_links_from_frame(df_platforms):
+    """Platform name -> URL (None if it has none), for every platform"""
+    df = df_platforms.dropna(subset=["name"])
+    return dict(zip(df["name"], df["url"].astype(object).where(df["url"].notna(), None)))
+
+
+def feature_table_from_frame(df_features):
+    """Feature name -> group (None if it has none), for every feature"""
+    df = df_features.dropna(subset=["name"]).drop_duplicates("name")
+    return dict(zip(df["name"], df["group"].astype(object).where(df["group"].notna(), None)))
+
+
+class DataSnapshot:
+    """One read-only version of the data. Never modified after creation."""
+
+    def __init__(self, version, df_pf_full, index, similarity, catalog):
+        self.version = version
+        self.df_pf_full = df_pf_full
+        self.index = index
+        self.similarity = similarity
+        self.catalog = catalog
+
+        # Read-only dict-like views of the catalog
+        self.keyword_to_platforms = catalog.keyword_to_platforms
+        self.platform_to_keywords = catalog.platform_to_keywords
+        self.platform_links = catalog.platform_links
+        self.platform_languages_multi = catalog.platform_languages_multi
+        self.platform_main_language = catalog.platform_main_language
+
+        # Language filter options: every supported language (the "any
+        # language" filter mode can match languages nobody has as main one)
+        self.language_options = catalog.used_languages()
+
+        # Feature checklist options
+        self.all_keywords = sorted(self.keyword_to_platforms)
+
+        # Group -> feature -> platform tree (treemap / icicle / grouped sunburst)
+        self.hierarchy = FeatureHierarchy(index)
+
+    @functools.cached_property
+    def network(self):
+        """Network view layout, computed the first time the view is opened."""
+        with timed("network_layout"):
+            return NetworkLayout(self.index, self.similarity)
+
+
+def build_snapshot(df_platforms, df_features, df_pf, version):
+    with timed("join_frames"):
+        df_pf_full = join_frames(df_platforms, df_features, df_pf)
+    with timed("bitset_index"):
+        index = BitsetIndex.from_frame(df_pf_full)
+    with timed("catalog"):
+        catalog = Catalog(index, platform_links_from_frame(df_platforms), feature_table_from_frame(df_features))
+    with timed("similarity_index"):
+        similarity = SimilarityIndex.build(index)
+    return DataSnapshot(version, df_pf_full, index, similarity, catalog)
+
+
+def load_snapshot(excel_path):
+    with timed("load_sheets"):
+        frames = load_sheets(excel_path)
+    return build_snapshot(*frames, version=workbook_version(excel_path))
+
+
+# DATA STORE
+
+
+class DataStore:
+    """
+    Holds the current DataSnapshot of a workbook and reloads it in the
+    background when the file changes on disk.
+
+    `loader(source)` builds a snapshot and `fingerprint(source)` cheaply
+    tells whether the source changed; by default the source is the workbook.
+    """
+
+    def __init__(self, source, poll_interval=5.0, loader=load_snapshot, fingerprint=file_fingerprint):
+        self.source = source
+        self.poll_interval = poll_interval
+        self._loader = loader
+        self._fingerprint_of = fingerprint
+        self._fingerprint = fingerprint(source)
+        self._snapshot = loader(source)
+        self._listeners = []
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def snapshot(self):
+        # A single attribute read: callbacks always get one whole snapshot
+        return self._snapshot
+
+    def add_listener(self, func):
+        """Call func(new_snapshot) after every successful reload."""
+        self._listeners.append(func)
+
+    def reload(self, force=False):
+        """
+        Rebuild the snapshot if the workbook changed (or always with force).
+        Returns True when a new snapshot was swapped in.
+        """
+        with self._reload_lock:
+            fingerprint = self._fingerprint_of(self.source)
+            if not force and fingerprint == self._fingerprint:
+                return False
+
+            snapshot = self._loader(self.source)
+            self._fingerprint = fingerprint
+            if not force and snapshot.version == self._snapshot.version:
+                # Touched, but same content
+                return False
+
+            self._snapshot = snapshot
+
+        for func in self._listeners:
+            func(snapshot)
+        return True
+
+    def apply_changes(self, changes):
+        """
+        Swap in the current snapshot with a delta.ChangeSet applied and
+        notify the listeners. Returns the new snapshot.
+        """
+        from delta import apply_changes
+
+        with self._reload_lock:
+            snapshot = apply_changes(self._snapshot, changes)
+            self._snapshot = snapshot
+
+        for func in self._listeners:
+            func(snapshot)
+        return snapshot
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                if self.reload():
+                    log.info("Reloaded %s (version %s)", self.source, self._snapshot.version)
+            except Exception:
+                # Typically a workbook that is still being saved: keep the
+                # old snapshot and try again on the next poll
+                log.exception("Reloading %s failed, keeping version %s",
+                              self.source, self._snapshot.version)
+
+    def start_watching(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="datastore-watch", daemon=True)
+            self._thread.start()
+
+    def stop_watching(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._stop.clear()
@@ -0,0 +1,466 @@
+"""
+Small changes to the live data without re-reading the workbook.
+
+A ChangeSet adds, updates or removes platforms, features and
+platform-feature memberships by name (the names the admin tooling sees
+in the sheets). apply_changes(snapshot, changes) returns a new
+DataSnapshot, in time that depends on the size of the change:
+
+- memberships, links and feature groups only (the usual case): the
+  BitsetIndex, the catalog and the similar-platform index are patched for
+  the changed platforms and features
+- platforms, features or languages appearing or disappearing: rows and
+  columns are renumbered, so the index and catalog are rebuilt from the
+  patched matrices (NumPy only: no workbook, no pandas); the similar
+  platforms are still only rescored where they can have changed
+
+Platforms and features left without memberships drop out of the index
+(as in a full rebuild) but stay in the catalog's platform and feature
+tables, so a later ChangeSet can link them again. A feature moved into
+or out of the "Language" group moves between the feature and language
+columns with its memberships.
+
+Cost: the old snapshot is never modified, so the membership matrices and
+the index's derived arrays (language members, packed words) are copied
+once per call. That copy is O(index): a memcpy of platforms x features
+bytes, about 0.5 ms per matrix at 20,000 x 300. Everything computed -
+counts, packed words, CSR rows, similar platforms - is limited to the
+changed platforms and features. DataStore.apply_changes swaps the
+result in and notifies the listeners (figure cache, API, ...) like a
+reload. Changes live in memory only: the next change of the workbook
+replaces them, so the tooling writes them to the workbook as well
+(apply_to_frames gives the new sheets). With several app workers,
+apply the changes to the DataStore that publishes the shared index
+(sharedindex.py), whose listener republishes them to every worker.
+
+check_consistency compares an incrementally maintained snapshot with a
+full rebuild of the same data:
+
+    python delta.py volunteer_data.xlsx changes.json
+"""
+import argparse
+import hashlib
+import json
+import time
+
+import numpy as np
+
+from bitindex import LANGUAGE_GROUP, LANGUAGE_MODES, OTHER_GROUP, BitsetIndex, language_name
+from catalog import Catalog
+from datastore import DataSnapshot
+from similarity import EXACT_MAX_PLATFORMS
+
+
+LOOKUPS = ("keyword_to_platforms", "platform_to_keywords", "platform_languages_multi",
+           "platform_main_language", "platform_links")
+
+
+class ChangeSet:
+    """
+    - platforms:           {name: url or None} to add or update
+    - features:            {name: group} to add or update (group "Language": a language)
+    - memberships:         [(platform, feature), ...] to add
+    - removed_platforms, removed_features: names, with all their memberships
+    - removed_memberships: [(platform, feature), ...]
+
+    Removals are applied first. New memberships may only name platforms and
+    features that are in the data (with or without memberships) or added
+    by the same ChangeSet.
+    """
+
+    def __init__(self, platforms=None, features=None, memberships=(),
+                 removed_platforms=(), removed_features=(), removed_memberships=()):
+        self.platforms = dict(platforms or {})
+        self.features = dict(features or {})
+        self.memberships = [tuple(m) for m in memberships]
+        self.removed_platforms = list(removed_platforms)
+        self.removed_features = list(removed_features)
+        self.removed_memberships = [tuple(m) for m in removed_memberships]
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def to_dict(self):
+        return {
+            "platforms": self.platforms,
+            "features": self.features,
+            "memberships": [list(m) for m in self.memberships],
+            "removed_platforms": self.removed_platforms,
+            "removed_features": self.removed_features,
+            "removed_memberships": [list(m) for m in self.removed_memberships],
+        }
+
+    def __len__(self):
+        return sum(len(v) for v in self.to_dict().values())
+
+
+def delta_version(version, changes):
+    """Version of a snapshot with `changes` applied on top of `version`."""
+    payload = json.dumps([version, changes.to_dict()], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:12]
+
+
+# APPLYING A CHANGESET
+
+
+class _Names:
+    """Row / column numbers: the index's names, then added names after them."""
+
+    def __init__(self, names, ids):
+        self.names = names
+        self.ids = ids
+        self.added = {}
+        self.added_names = []
+        self.removed = set()
+
+    def __len__(self):
+        return len(self.names) + len(self.added)
+
+    def name(self, i):
+        return self.names[i] if i < len(self.names) else self.added_names[i - len(self.names)]
+
+    def get(self, name):
+        i = self.ids.get(name)
+        if i is None:
+            i = self.added.get(name)
+        return None if i in self.removed else i
+
+    def add(self, name):
+        i = self.ids.get(name, self.added.get(name))
+        if i is None:
+            i = self.added[name] = len(self)
+            self.added_names.append(name)
+        self.removed.discard(i)
+        return i
+
+    def remove(self, name):
+        i = self.get(name)
+        if i is not None:
+            self.removed.add(i)
+        return i
+
+
+def _grown(array, shape):
+    """Copy of a 2-D bool array (a memcpy of all of it), padded with False to `shape`."""
+    if array.shape == shape:
+        return np.array(array)
+    grown = np.zeros(shape, dtype=bool)
+    grown[:array.shape[0], :array.shape[1]] = array
+    return grown
+
+
+def apply_changes(snapshot, changes, version=None):
+    """New DataSnapshot: `snapshot` with the ChangeSet applied (see the module docstring)."""
+    index, catalog = snapshot.index, snapshot.catalog
+    platforms = _Names(index.platforms, index.platform_ids)
+    features = _Names(index.features, index.feature_ids)
+    languages = _Names(index.languages, index.language_ids)
+    feature_table = dict(catalog.feature_table)
+    unindexed = dict(catalog.unindexed_platforms)
+    groups = {}
+    moves = []      # (from the language axis, source column, target column)
+
+    # Names first, so the matrices can be sized once
+    removed_platforms = []
+    for name in changes.removed_platforms:
+        unindexed.pop(name, None)
+        row = platforms.remove(name)
+        if row is not None:
+            removed_platforms.append(row)
+    removed_features, removed_languages = [], []
+    for name in changes.removed_features:
+        if feature_table.pop(name, None) == LANGUAGE_GROUP:
+            col = languages.remove(language_name(name))
+            if col is not None:
+                removed_languages.append(col)
+        else:
+            col = features.remove(name)
+            if col is not None:
+                removed_features.append(col)
+
+    for name, url in changes.platforms.items():
+        if platforms.get(name) is None:
+            unindexed[name] = url
+    for name, group in changes.features.items():
+        group = OTHER_GROUP if group is None else group
+        old_group = feature_table.get(name)
+        feature_table[name] = group
+        if old_group is None or (old_group == LANGUAGE_GROUP) == (group == LANGUAGE_GROUP):
+            col = features.get(name)
+            if col is not None:
+                groups[col] = group
+        elif group == LANGUAGE_GROUP:
+            # The feature's column moves to the language axis, and back
+            col = features.remove(name)
+            if col is not None:
+                moves.append((False, col, languages.add(language_name(name))))
+        else:
+            col = languages.remove(language_name(name))
+            if col is not None:
+                target = features.add(name)
+                groups[target] = group
+                moves.append((True, col, target))
+
+    def column(feature):
+        """(is language, column or None if it has none yet) of a feature name"""
+        group = feature_table.get(feature)
+        if group is None:
+            raise KeyError(f"Unknown feature {feature!r}: add it to ChangeSet.features with its group")
+        if group == LANGUAGE_GROUP:
+            return True, languages.get(language_name(feature))
+        return False, features.get(feature)
+
+    # Platforms and features without memberships get their row / column
+    for platform, feature in changes.memberships:
+        if platforms.get(platform) is None and platform in unindexed:
+            platforms.add(platform)
+        is_lang, col = column(feature)
+        if col is None and is_lang:
+            languages.add(language_name(feature))
+        elif col is None:
+            groups[features.add(feature)] = feature_table[feature]
+
+    matrix = _grown(index.matrix, (len(platforms), len(features)))
+    lang_matrix = _grown(index.lang_matrix, (len(platforms), len(languages)))
+    domain_rows, lang_rows, changed_cols, changed_langs = set(), set(), set(), set()
+
+    # Removals
+    for row in removed_platforms:
+        changed_cols.update(np.flatnonzero(matrix[row]).tolist())
+        changed_langs.update(np.flatnonzero(lang_matrix[row]).tolist())
+        if matrix[row].any():
+            domain_rows.add(row)
+        lang_rows.add(row)
+        matrix[row] = False
+        lang_matrix[row] = False
+    for col in removed_features:
+        domain_rows.update(np.flatnonzero(matrix[:, col]).tolist())
+        changed_cols.add(col)
+        matrix[:, col] = False
+    for col in removed_languages:
+        lang_rows.update(np.flatnonzero(lang_matrix[:, col]).tolist())
+        changed_langs.add(col)
+        lang_matrix[:, col] = False
+
+    # Features that became languages and languages that became features
+    for from_language, source_col, target_col in moves:
+        source, target = (lang_matrix, matrix) if from_language else (matrix, lang_matrix)
+        rows = np.flatnonzero(source[:, source_col]).tolist()
+        target[rows, target_col] = True
+        source[:, source_col] = False
+        domain_rows.update(rows)
+        lang_rows.update(rows)
+        changed_langs.add(source_col if from_language else target_col)
+        changed_cols.add(target_col if from_language else source_col)
+
+    def set_membership(platform, feature, value, strict):
+        row = platforms.get(platform)
+        if row is None:
+            if strict:
+                raise KeyError(f"Unknown platform {platform!r}: add it to ChangeSet.platforms")
+            return
+        try:
+            is_lang, col = column(feature)
+        except KeyError:
+            if strict:
+                raise
+            return
+        if col is None:
+            return      # no column: no membership to remove
+        target, rows, cols = (lang_matrix, lang_rows, changed_langs) if is_lang else (matrix, domain_rows, changed_cols)
+        if target[row, col] != value:
+            target[row, col] = value
+            rows.add(row)
+            cols.add(col)
+
+    for platform, feature in changes.removed_memberships:
+        set_membership(platform, feature, False, strict=False)
+    for platform, feature in changes.memberships:
+        set_membership(platform, feature, True, strict=True)
+
+    # What the index contains: rows / columns that are new or changed
+    # may have become empty (unchanged ones were not empty before)
+    def kept(names, check, is_used):
+        keep = np.ones(len(names), dtype=bool)
+        keep[len(names.names):] = False
+        for i in check | set(range(len(names.names), len(names))):
+            keep[i] = is_used(i)
+        return keep
+
+    changed_rows = domain_rows | lang_rows
+    keep_platforms = kept(platforms, changed_rows | set(platforms.removed),
+                          lambda r: matrix[r].any() or lang_matrix[r].any())
+    keep_features = kept(features, changed_cols | set(features.removed), lambda c: matrix[:, c].any())
+    keep_languages = kept(languages, changed_langs | set(languages.removed), lambda c: lang_matrix[:, c].any())
+
+    def url(name):
+        if name in changes.platforms:
+            return changes.platforms[name]
+        if name in catalog.unindexed_platforms:
+            return catalog.unindexed_platforms[name]
+        return catalog.platform_links.get(name)
+
+    # Platforms left without memberships stay in the catalog, outside the index
+    # (features stay in feature_table)
+    for row in changed_rows | set(range(len(platforms.names), len(platforms))):
+        name = platforms.name(row)
+        if keep_platforms[row]:
+            unindexed.pop(name, None)
+        elif row not in platforms.removed:
+            unindexed[name] = url(name)
+
+    feature_groups = list(index.feature_groups)
+    feature_groups.extend(OTHER_GROUP for _ in features.added)
+    for col, group in groups.items():
+        feature_groups[col] = group
+
+    same_names = all(
+        keep[:len(names.names)].all() and not keep[len(names.names):].any()
+        for keep, names in ((keep_platforms, platforms), (keep_features, features), (keep_languages, languages))
+    )
+    if same_names:
+        P, F, L = len(platforms.names), len(features.names), len(languages.names)
+        new_index = index.patched(np.ascontiguousarray(matrix[:P, :F]), np.ascontiguousarray(lang_matrix[:P, :L]),
+                                  sorted(changed_rows), feature_groups[:F] if groups else None)
+        catalog = catalog.patched(new_index, sorted(changed_rows), sorted(changed_cols), changes.platforms,
+                                  unindexed, feature_table)
+        similarity = snapshot.similarity.updated(new_index, sorted(domain_rows))
+    else:
+        def order(names, keep):
+            return np.array(sorted(np.flatnonzero(keep), key=names.name), dtype=np.intp)
+
+        rows = order(platforms, keep_platforms)
+        cols = order(features, keep_features)
+        langs = order(languages, keep_languages)
+        new_index = BitsetIndex(
+            [platforms.name(r) for r in rows],
+            [features.name(c) for c in cols],
+            matrix[np.ix_(rows, cols)],
+            [languages.name(c) for c in langs],
+            lang_matrix[np.ix_(rows, langs)],
+            [feature_groups[c] for c in cols],
+        )
+        platform_links = {name: url(name) for name in new_index.platforms.tolist()}
+        platform_links.update(unindexed)
+        catalog = Catalog(new_index, platform_links, feature_table)
+
+        new_row = np.full(len(platforms), -1, dtype=np.intp)
+        new_row[rows] = np.arange(len(rows))
+        moved = new_row[sorted(domain_rows | set(range(len(platforms.names), len(platforms))))]
+        similarity = snapshot.similarity.updated(new_index, moved[moved >= 0], new_row[:len(platforms.names)])
+
+    return DataSnapshot(version or delta_version(snapshot.version, changes), None, new_index, similarity, catalog)
+
+
+# FULL REBUILD AND CONSISTENCY CHECK
+
+
+def apply_to_frames(frames, changes):
+    """
+    (df_platforms, df_features, df_pf) with the ChangeSet applied, as the
+    workbook's sheets would look after it. New rows get "delta:<name>" ids.
+    """
+    import pandas as pd
+
+    df_platforms, df_features, df_pf = frames
+
+    gone = df_platforms["name"].isin(changes.removed_platforms)
+    df_pf = df_pf[~df_pf["platform_id"].isin(df_platforms.loc[gone, "platform_id"])]
+    df_platforms = df_platforms[~gone]
+    gone = df_features["name"].isin(changes.removed_features)
+    df_pf = df_pf[~df_pf["feature_id"].isin(df_features.loc[gone, "feature_id"])]
+    df_features = df_features[~gone]
+
+    platform_id = dict(zip(df_platforms["name"], df_platforms["platform_id"]))
+    feature_id = dict(zip(df_features["name"], df_features["feature_id"]))
+    removed = {(platform_id.get(p), feature_id.get(f)) for p, f in changes.removed_memberships}
+    df_pf = df_pf[[pair not in removed for pair in zip(df_pf["platform_id"], df_pf["feature_id"])]]
+
+    df_platforms, df_features = df_platforms.copy(), df_features.copy()
+    new_platforms, new_features = [], []
+    for name, url in changes.platforms.items():
+        if name in platform_id:
+            df_platforms.loc[df_platforms["name"] == name, "url"] = url
+        else:
+            platform_id[name] = f"delta:{name}"
+            new_platforms.append({"platform_id": platform_id[name], "name": name, "url": url})
+    for name, group in changes.features.items():
+        if name in feature_id:
+            df_features.loc[df_features["name"] == name, "group"] = group
+        else:
+            feature_id[name] = f"delta:{name}"
+            new_features.append({"feature_id": feature_id[name], "group": group, "name": name})
+
+    new_rows = [{"platform_id": platform_id[p], "feature_id": feature_id[f]} for p, f in changes.memberships]
+    return (
+        pd.concat([df_platforms, pd.DataFrame(new_platforms, columns=df_platforms.columns)], ignore_index=True),
+        pd.concat([df_features, pd.DataFrame(new_features, columns=df_features.columns)], ignore_index=True),
+        pd.concat([df_pf, pd.DataFrame(new_rows, columns=df_pf.columns)], ignore_index=True).drop_duplicates(),
+    )
+
+
+def check_consistency(snapshot, rebuilt):
+    """
+    Differences between a snapshot maintained with apply_changes and a
+    full rebuild of the same data ([] if none). The similar platforms are
+    compared only when both were computed exactly (no LSH).
+    """
+    a, b = snapshot.index, rebuilt.index
+    problems = [
+        f"index.{name} differ" for name in ("platforms", "features", "languages", "feature_groups")
+        if list(getattr(a, name)) != list(getattr(b, name))
+    ]
+    if problems:
+        return problems
+
+    arrays = ["matrix", "lang_matrix", "main_lang", "feature_totals", "feature_platform_counts",
+              "feature_words", "all_words"]
+    problems += [f"index.{name} differs" for name in arrays
+                 if not np.array_equal(getattr(a, name), getattr(b, name))]
+    for mode in LANGUAGE_MODES:
+        problems += [f"index.{name}[{mode}] differs" for name in ("lang_members", "lang_counts", "lang_words")
+                     if not np.array_equal(getattr(a, name)[mode], getattr(b, name)[mode])]
+
+    problems += [f"{name} differs" for name in LOOKUPS
+                 if dict(getattr(snapshot, name)) != dict(getattr(rebuilt, name))]
+    problems += [f"catalog.{name} differs" for name in ("unindexed_platforms", "feature_table")
+                 if getattr(snapshot.catalog, name) != getattr(rebuilt.catalog, name)]
+    problems += [f"{name} differ" for name in ("language_options", "all_keywords")
+                 if getattr(snapshot, name) != getattr(rebuilt, name)]
+    if snapshot.hierarchy.groups != rebuilt.hierarchy.groups:
+        problems.append("hierarchy groups differ")
+
+    if len(a.platforms) <= EXACT_MAX_PLATFORMS:
+        problems += [f"similarity.{name} differs" for name in ("neighbor_ids", "neighbor_scores")
+                     if not np.array_equal(getattr(snapshot.similarity, name), getattr(rebuilt.similarity, name))]
+    return problems
+
+
+#   MAIN
+
+
+if __name__ == "__main__":
+    from dataloader import load_sheets, workbook_version
+    from datastore import build_snapshot
+
+    parser = argparse.ArgumentParser(description="Apply a change set and check it against a full rebuild.")
+    parser.add_argument("excel_path")
+    parser.add_argument("changes", help="JSON file with the ChangeSet fields")
+    args = parser.parse_args()
+
+    with open(args.changes, encoding="utf-8") as f:
+        changes = ChangeSet.from_dict(json.load(f))
+    frames = load_sheets(args.excel_path)
+    snapshot = build_snapshot(*frames, version=workbook_version(args.excel_path))
+
+    start = time.perf_counter()
+    patched = apply_changes(snapshot, changes)
+    applied = time.perf_counter()
+    rebuilt = build_snapshot(*apply_to_frames(frames, changes), version=patched.version)
+    done = time.perf_counter()
+
+    print(f"{len(changes)} changes applied in {(applied - start) * 1000:.1f} ms "
+          f"(full rebuild: {(done - applied) * 1000:.1f} ms)")
+    problems = check_consistency(patched, rebuilt)
+    print("\n".join(problems) if problems else "Consistent with a full rebuild")
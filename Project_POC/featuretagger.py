@@ -0,0 +1,273 @@
+"""
+Tag platforms with canonical features from their description texts.
+
+Every synonym in keywordmapping.keyword_mapping goes into one compiled
+regex shaped like the synonyms' prefix trie, so a document is scanned
+once however many synonyms there are. Matches are whole words,
+case-insensitive, and may overlap ("event management tool" counts
+"event management" and "management tool").
+
+Documents are streamed from a .jsonl file ({"platform_id", "text"} per
+line), a .csv file (platform_id + text/description columns) or a folder
+of <platform_id>.txt files. Large corpora are tagged in batches on a
+process pool. The result replaces the tagged platforms' rows in the
+PlatformFeatures sheet, which the running app then reloads:
+
+    python featuretagger.py descriptions.jsonl volunteer_data.xlsx --workers 4
+"""
+import argparse
+import collections
+import csv
+import json
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from keywordmapping import keyword_mapping
+
+
+BATCH_SIZE = 256            # documents per task sent to a worker process
+TASKS_PER_WORKER = 2        # batches in flight per worker (bounds memory)
+TEXT_COLUMNS = ("text", "description")
+
+
+class FeatureMatcher:
+    """{feature: [synonym, ...]} compiled into a single-pass matcher."""
+
+    def __init__(self, mapping=keyword_mapping):
+        features_of = collections.defaultdict(set)
+        for feature, synonyms in mapping.items():
+            for synonym in synonyms:
+                features_of[synonym.lower()].add(feature)
+
+        # At each position the regex reports the longest synonym only; it also
+        # counts the shorter ones it starts with ("admin panel" -> "admin")
+        self.features_of = {}
+        for synonym, features in features_of.items():
+            self.features_of[synonym] = set(features)
+            for other, other_features in features_of.items():
+                if other != synonym and re.match(rf"{re.escape(other)}\b", synonym):
+                    self.features_of[synonym] |= other_features
+
+        # Zero-width lookahead at every word start, so matches may overlap
+        self.pattern = re.compile(rf"\b(?=({trie_pattern(features_of)})\b)", re.IGNORECASE)
+
+    def tag(self, text):
+        """Set of features mentioned in text."""
+        features = set()
+        for match in self.pattern.finditer(text):
+            features |= self.features_of[match.group(1).lower()]
+        return features
+
+
+def trie_pattern(words):
+    """
+    Regex matching any of `words`, longest first, shaped like their prefix
+    trie ("app(?:lication)?"): the regex engine follows one branch per
+    character instead of trying every word at every position.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def pattern(node):
+        branches = [re.escape(char) + pattern(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if "" in node:
+            return f"(?:{'|'.join(branches)})?"
+        return branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+
+    return pattern(trie)
+
+
+# READING DOCUMENTS
+
+
+def _text_of(record):
+    return next((record[c] for c in TEXT_COLUMNS if record.get(c)), "")
+
+
+def read_documents(path):
+    """Stream (platform_id, text) pairs from a .jsonl / .csv file or a folder of .txt files."""
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            stem, ext = os.path.splitext(name)
+            if ext == ".txt":
+                with open(os.path.join(path, name), encoding="utf-8") as f:
+                    yield stem, f.read()
+    elif path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            for record in csv.DictReader(f):
+                yield record["platform_id"], _text_of(record)
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield record["platform_id"], _text_of(record)
+
+
+def batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# TAGGING
+
+
+_worker_matcher = None
+
+
+def _init_worker(mapping):
+    global _worker_matcher
+    _worker_matcher = FeatureMatcher(mapping)
+
+
+def _tag_batch(batch):
+    return [(platform_id, sorted(_worker_matcher.tag(text))) for platform_id, text in batch]
+
+
+def tag_documents(documents, mapping=keyword_mapping, workers=None, batch_size=BATCH_SIZE):
+    """
+    Yield (platform_id, sorted features) for each (platform_id, text), in
+    input order. workers=1 tags in this process; otherwise batches go to a
+    pool of `workers` processes (default: one per CPU), with a bounded
+    number in flight so the documents are never all in memory.
+    """
+    if workers == 1:
+        matcher = FeatureMatcher(mapping)
+        for platform_id, text in documents:
+            yield platform_id, sorted(matcher.tag(text))
+        return
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(mapping,)) as pool:
+        pending = collections.deque()
+        for batch in batches(documents, batch_size):
+            pending.append(pool.submit(_tag_batch, batch))
+            if len(pending) >= workers * TASKS_PER_WORKER:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+# PLATFORMFEATURES OUTPUT
+
+
+def platform_feature_rows(tagged, feature_ids, platform_ids):
+    """
+    (rows, unknown platforms): PlatformFeatures rows (platform_id, feature_id)
+    for the tags. `feature_ids` maps feature names to ids; platforms not
+    in `platform_ids` are skipped.
+    """
+    rows, unknown = [], []
+    for platform_id, features in tagged:
+        if platform_id not in platform_ids:
+            unknown.append(platform_id)
+            continue
+        rows.extend((platform_id, feature_ids[f]) for f in features if f in feature_ids)
+    return rows, unknown
+
+
+def merge_platform_features(df_pf, rows, tagged_platforms, tagger_feature_ids):
+    """
+    New PlatformFeatures frame: for the tagged platforms, the rows of
+    features the tagger knows are replaced by `rows`. Everything else
+    (languages, features without synonyms, other platforms) is kept.
+    """
+    import pandas as pd
+
+    replaced = df_pf["platform_id"].isin(tagged_platforms) & df_pf["feature_id"].isin(tagger_feature_ids)
+    new_rows = pd.DataFrame(rows, columns=["platform_id", "feature_id"])
+    return (
+        pd.concat([df_pf[~replaced], new_rows], ignore_index=True)
+        .drop_duplicates()
+        .sort_values(["platform_id", "feature_id"], ignore_index=True)
+    )
+
+
+def write_platform_features(excel_path, df_pf):
+    """
+    Replace the PlatformFeatures sheet. The workbook is written to a copy
+    and swapped in, so the app's watcher never reads a half-written file.
+    """
+    import pandas as pd
+
+    tmp = f"{excel_path}.{os.getpid()}.tmp.xlsx"
+    shutil.copy2(excel_path, tmp)
+    try:
+        with pd.ExcelWriter(tmp, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
+            df_pf.to_excel(writer, sheet_name="PlatformFeatures", index=False)
+        os.replace(tmp, excel_path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def tag_workbook(documents_path, excel_path, workers=None, batch_size=BATCH_SIZE, csv_path=None):
+    """
+    Tag the documents and write the result into the workbook's
+    PlatformFeatures sheet (or only the tagged rows to csv_path).
+    Returns a summary dict including documents per second.
+    """
+    from dataloader import load_sheets
+
+    df_platforms, df_features, df_pf = load_sheets(excel_path)
+    feature_ids = dict(zip(df_features["name"], df_features["feature_id"]))
+    known = {f: feature_ids[f] for f in keyword_mapping if f in feature_ids}
+
+    start = time.perf_counter()
+    tagged = list(tag_documents(read_documents(documents_path), workers=workers, batch_size=batch_size))
+    seconds = time.perf_counter() - start
+
+    rows, unknown_platforms = platform_feature_rows(tagged, known, set(df_platforms["platform_id"]))
+    if csv_path:
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["platform_id", "feature_id"])
+            writer.writerows(rows)
+    else:
+        tagged_platforms = {p for p, _ in tagged} - set(unknown_platforms)
+        write_platform_features(excel_path, merge_platform_features(df_pf, rows, tagged_platforms, known.values()))
+
+    return {
+        "documents": len(tagged),
+        "seconds": seconds,
+        "docs_per_second": len(tagged) / seconds if seconds else float("inf"),
+        "rows": len(rows),
+        "unknown_platforms": unknown_platforms,
+        "unknown_features": [f for f in keyword_mapping if f not in feature_ids],
+    }
+
+
+#   MAIN
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tag platforms with features from their descriptions.")
+    parser.add_argument("documents", help=".jsonl, .csv or a folder of <platform_id>.txt files")
+    parser.add_argument("excel_path")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per CPU)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--csv", help="write the tagged rows here instead of into the workbook")
+    args = parser.parse_args()
+
+    summary = tag_workbook(args.documents, args.excel_path, args.workers, args.batch_size, args.csv)
+    print(f"Tagged {summary['documents']} documents in {summary['seconds']:.2f} s "
+          f"({summary['docs_per_second']:.0f} docs/s), {summary['rows']} platform-feature rows")
+    if summary["unknown_platforms"]:
+        print(f"Skipped unknown platforms: {', '.join(summary['unknown_platforms'][:10])}")
+    if summary["unknown_features"]:
+        print(f"Features missing from the Features sheet: {', '.join(summary['unknown_features'])}")
@@ -0,0 +1,72 @@
+"""
+Small thread-safe LRU cache for built figures.
+
+Keys are normalized filter states: the data version plus frozensets of the
+selected keywords and languages (the order of the checklist values does
+not change what the chart shows). Values are plain figure dicts, ready to
+be returned from a callback.
+"""
+import threading
+from collections import OrderedDict
+
+
+def filter_key(version, selected_keywords, selected_languages, *extra):
+    """Normalized cache key for one filter state."""
+    return (version, frozenset(selected_keywords or ()), frozenset(selected_languages or ())) + extra
+
+
+class FigureCache:
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        """Cached figure or None. Counts a hit or a miss."""
+        with self._lock:
+            fig = self._items.get(key)
+            if fig is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return fig
+
+    def put(self, key, fig):
+        with self._lock:
+            self._items[key] = fig
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_build(self, key, build):
+        """Return the cached figure for key, building (and storing) it on a miss."""
+        fig = self.get(key)
+        if fig is None:
+            # Built outside the lock: two threads may build the same figure,
+            # which is cheaper than serializing every callback
+            fig = build()
+            self.put(key, fig)
+        return fig
+
+    def clear(self):
+        """Drop every entry, e.g. after the data was reloaded."""
+        with self._lock:
+            self._items.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._items),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
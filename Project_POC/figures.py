@@ -0,0 +1,210 @@
+"""
+Fast figure builders.
+
+plotly.graph_objects validates and copies every array it is given, which
+for a sunburst with thousands of labels costs far more than computing the
+labels themselves. The layout (with the default template) only depends on
+a few constant settings, so it is validated once with plotly and reused;
+the trace is written as a plain dict. The result is the same figure dict
+that go.Figure(...).to_plotly_json() produces.
+
+sunburst_patch() turns a change of the (feature, platforms) blocks into a
+dash.Patch, so toggling one filter only sends the nodes that changed.
+"""
+import functools
+import json
+
+import plotly.graph_objects as go
+from dash import Patch, no_update
+
+
+# Approximate JSON size of patch operations, in nodes of a full sunburst
+# (one node there is a label, a parent and a value: ~30 bytes). Per-node
+# deletes/inserts carry their location for each of the three arrays.
+DELETE_COST = 8
+INSERT_COST = 10
+
+
+SUNBURST_LAYOUT = dict(
+    margin=dict(t=40, l=0, r=0, b=0),
+    width=800,
+    height=800,
+    title="Volunteer Platforms by Feature and Language"
+)
+
+
+HIERARCHY_LAYOUT = dict(
+    margin=dict(t=40, l=0, r=0, b=0),
+    width=800,
+    height=800,
+    title="Volunteer Platforms by Group, Feature and Platform"
+)
+
+HIERARCHY_CHARTS = ("sunburst", "treemap", "icicle")
+
+
+def _freeze(layout_args):
+    # Hashable form of a layout dict, for the lru_cache below
+    return json.dumps(layout_args, sort_keys=True)
+
+
+@functools.lru_cache(maxsize=16)
+def _base_layout(frozen_args):
+    return go.Figure(layout=json.loads(frozen_args)).to_plotly_json()["layout"]
+
+
+def base_layout(layout_args=SUNBURST_LAYOUT):
+    """
+    Validated layout dict (incl. template), computed once per settings.
+    Shared between figures, so it must not be modified.
+    """
+    return _base_layout(_freeze(layout_args))
+
+
+@functools.lru_cache(maxsize=1)
+def empty_figure():
+    """Same as go.Figure().to_plotly_json()."""
+    return go.Figure().to_plotly_json()
+
+
+def sunburst_figure(labels, parents, values, layout_args=SUNBURST_LAYOUT, maxdepth=2):
+    """Sunburst figure dict straight from the label/parent/value lists."""
+    trace = {
+        "branchvalues": "total",
+        "labels": labels,
+        "maxdepth": maxdepth,
+        "parents": parents,
+        "values": values,
+        "type": "sunburst",
+    }
+    return {"data": [trace], "layout": base_layout(layout_args)}
+
+
+def hierarchy_figure(tree, chart="sunburst", layout_args=HIERARCHY_LAYOUT, maxdepth=2):
+    """
+    Sunburst / treemap / icicle figure dict for a hierarchy.FeatureHierarchy
+    tree (the lists are shared, not copied, so one tree serves all three).
+    """
+    if not tree["ids"]:
+        return empty_figure()
+    trace = {
+        "branchvalues": "total",
+        "ids": tree["ids"],
+        "labels": tree["labels"],
+        "maxdepth": maxdepth,
+        "parents": tree["parents"],
+        "values": tree["values"],
+        "type": chart,
+    }
+    return {"data": [trace], "layout": base_layout(layout_args)}
+
+
+def sunburst_arrays(blocks):
+    """labels/parents/values for [(feature, [platforms])]: each feature followed by its platforms."""
+    labels, parents, values = [], [], []
+    for feature, platforms in blocks:
+        labels.append(feature)
+        parents.append("")
+        values.append(len(platforms))
+        labels.extend(platforms)
+        parents.extend([feature] * len(platforms))
+        values.extend([1] * len(platforms))
+    return labels, parents, values
+
+
+class _TracePatch:
+    """Patch operations on the label/parent/value arrays of trace 0."""
+
+    def __init__(self):
+        self.patch = Patch()
+        self.trace = self.patch["data"][0]
+        self.cost = 0       # size, in full-figure nodes
+
+    def delete(self, pos):
+        for key in ("labels", "parents", "values"):
+            del self.trace[key][pos]
+        self.cost += DELETE_COST
+
+    def insert(self, pos, label, parent, value):
+        for key, item in (("labels", label), ("parents", parent), ("values", value)):
+            self.trace[key].insert(pos, item)
+        self.cost += INSERT_COST
+
+    def set_value(self, pos, value):
+        self.trace["values"][pos] = value
+        self.cost += 1
+
+    def extend(self, blocks):
+        labels, parents, values = sunburst_arrays(blocks)
+        if labels:
+            self.trace["labels"].extend(labels)
+            self.trace["parents"].extend(parents)
+            self.trace["values"].extend(values)
+        self.cost += len(labels)
+
+
+def sunburst_patch(old_blocks, new_blocks, max_cost):
+    """
+    dash.Patch turning the sunburst_figure() of old_blocks into the one of
+    new_blocks; dash.no_update if they are the same, None when the patch
+    would be bigger than max_cost full-figure nodes (then send the figure).
+
+    Both are [(feature, [platforms])] as returned by BitsetIndex.filter_platforms.
+    Features in both keep their old order, new features come last, and
+    platforms within a feature must be in the same (index) order.
+    """
+    new = dict(new_blocks)
+    old_features = {feature for feature, _ in old_blocks}
+    ops = _TracePatch()
+    pos = 0
+
+    for feature, old_platforms in old_blocks:
+        if feature not in new:
+            for _ in range(len(old_platforms) + 1):
+                ops.delete(pos)
+        else:
+            new_platforms = new[feature]
+            if len(new_platforms) != len(old_platforms):
+                ops.set_value(pos, len(new_platforms))
+            pos = _patch_leaves(ops, pos + 1, feature, old_platforms, new_platforms)
+        if ops.cost > max_cost:
+            return None
+
+    ops.extend([(f, platforms) for f, platforms in new_blocks if f not in old_features])
+    if ops.cost > max_cost:
+        return None
+    return ops.patch if ops.cost else no_update
+
+
+def _patch_leaves(ops, pos, feature, old_platforms, new_platforms):
+    # Walk both lists (same relative order): delete what went away, insert what is new
+    old_set, new_set = set(old_platforms), set(new_platforms)
+    i = j = 0
+    while i < len(old_platforms) or j < len(new_platforms):
+        if i < len(old_platforms) and old_platforms[i] not in new_set:
+            ops.delete(pos)
+            i += 1
+        elif j < len(new_platforms) and new_platforms[j] not in old_set:
+            ops.insert(pos, new_platforms[j], feature, 1)
+            pos += 1
+            j += 1
+        else:
+            pos += 1
+            i += 1
+            j += 1
+    return pos
+
+
+def validated_sunburst_figure(labels, parents, values, layout_args=SUNBURST_LAYOUT, maxdepth=2):
+    """Reference implementation through plotly.graph_objects (slow)."""
+    fig = go.Figure(
+        go.Sunburst(
+            labels=labels,
+            parents=parents,
+            values=values,
+            branchvalues="total",
+            maxdepth=maxdepth
+        )
+    )
+    fig.update_layout(**layout_args)
+    return fig.to_plotly_json()
@@ -0,0 +1,38 @@
+"""gunicorn settings for wsgi.py: load the app once, then fork the workers.
+
+With METRICS_DIR set, the hooks below keep the per-worker metric files
+there (metrics.py): emptied at start, the preloading master's counts
+(data load times) archived once, a worker's file folded into the
+archive when the worker exits.
+"""
+import os
+
+preload_app = True
+
+
+def on_starting(server):
+    import metrics
+    if metrics.MULTIPROCESS_DIR:
+        metrics.clear_metrics_dir()
+
+
+def when_ready(server):
+    import metrics
+    if metrics.MULTIPROCESS_DIR:
+        metrics.write_process_metrics()
+        metrics.mark_process_dead(os.getpid())
+
+
+def post_fork(server, worker):
+    import metrics
+    import wsgi
+    if metrics.MULTIPROCESS_DIR:
+        # The master's counts are archived already (when_ready)
+        metrics.registry.reset()
+    wsgi.start_worker()
+
+
+def child_exit(server, worker):
+    import metrics
+    if metrics.MULTIPROCESS_DIR:
+        metrics.mark_process_dead(worker.pid)
@@ -0,0 +1,56 @@
+"""
+Group -> feature -> platform tree for the sunburst, treemap and icicle.
+
+The group of every feature (Features.group) is interned once per data
+version. A tree for one filter state is then the filtered (feature,
+platforms) blocks of the BitsetIndex plus one vectorized roll-up of the
+feature counts into their groups, so every parent's value is exactly the
+sum of its children (what branchvalues="total" requires).
+
+Node ids are paths ("group", "group/feature", "group/feature/platform"),
+because one platform appears under many features.
+"""
+import numpy as np
+
+
+class FeatureHierarchy:
+    def __init__(self, index):
+        self.index = index
+        self.groups = sorted(set(index.feature_groups))
+        group_ids = {g: i for i, g in enumerate(self.groups)}
+        self.feature_group = np.array([group_ids[g] for g in index.feature_groups], dtype=np.intp)
+
+    def tree(self, keywords, languages=None, mode="main", match="any"):
+        """
+        {"ids", "labels", "parents", "values"} for the selected features
+        (filters as in BitsetIndex.filter_platforms): groups first, then
+        each feature (grouped, in selection order) followed by its platforms.
+        Groups and features without platforms are left out.
+        """
+        blocks = self.index.filter_platforms(keywords, languages, mode, match)
+        fids = np.array([self.index.feature_ids[f] for f, _ in blocks], dtype=np.intp)
+        counts = np.array([len(platforms) for _, platforms in blocks], dtype=np.int64)
+        block_groups = self.feature_group[fids]
+        group_totals = np.bincount(block_groups, weights=counts, minlength=len(self.groups)).astype(np.int64)
+
+        ids, labels, parents, values = [], [], [], []
+        for g in np.flatnonzero(group_totals):
+            ids.append(self.groups[g])
+            labels.append(self.groups[g])
+            parents.append("")
+            values.append(int(group_totals[g]))
+
+        for j in np.argsort(block_groups, kind="stable"):
+            feature, platforms = blocks[j]
+            group = self.groups[block_groups[j]]
+            feature_id = f"{group}/{feature}"
+            ids.append(feature_id)
+            labels.append(feature)
+            parents.append(group)
+            values.append(len(platforms))
+            ids.extend(f"{feature_id}/{p}" for p in platforms)
+            labels.extend(platforms)
+            parents.extend([feature_id] * len(platforms))
+            values.extend([1] * len(platforms))
+
+        return {"ids": ids, "labels": labels, "parents": parents, "values": values}
@@ -0,0 +1,316 @@
+"""
+Health check of the platform websites (Platforms.url).
+
+All links are checked concurrently on one asyncio event loop, with plain
+asyncio streams (no extra dependency):
+
+- at most `concurrency` requests in flight overall, and at most
+  `per_host` at a time per host, started `host_interval` seconds apart
+- a HEAD request (GET when the server refuses HEAD), redirects followed,
+  every request bounded by `timeout` seconds
+- results go into a JSON cache next to the workbook cache; a result is
+  fresh for `ttl` seconds, so links are not re-checked on every start
+
+The app never waits for a check: LinkChecker runs the checks in a
+background thread and the platform card shows whatever the cache knows.
+The cache can also be filled from cron or before a deployment:
+
+    python linkcheck.py volunteer_data.xlsx --concurrency 50 --timeout 10
+"""
+import argparse
+import asyncio
+import collections
+import contextlib
+import json
+import logging
+import os
+import queue
+import ssl
+import threading
+import time
+import urllib.parse
+
+from dataloader import cache_dir_for
+
+
+log = logging.getLogger(__name__)
+
+CONCURRENCY = 20            # requests in flight
+PER_HOST = 2                # requests in flight per host
+HOST_INTERVAL = 0.5         # seconds between two requests to the same host
+TIMEOUT = 10.0              # seconds per request
+TTL = 24 * 3600             # seconds a result stays fresh
+MAX_REDIRECTS = 5
+USER_AGENT = "volunteer-platforms-linkcheck/1.0"
+
+REDIRECTS = (301, 302, 303, 307, 308)
+NO_HEAD = (405, 501)        # servers that do not support HEAD
+
+
+def cache_path_for(excel_path):
+    stem = os.path.splitext(os.path.basename(os.path.abspath(excel_path)))[0]
+    return os.path.join(cache_dir_for(excel_path), f"{stem}.links.json")
+
+
+# RESULT CACHE
+
+
+class LinkCache:
+    """
+    url -> last check result ({"url", "ok", "status", "final_url",
+    "error", "checked_at"}), persisted as JSON. Thread-safe; picks up
+    results other processes wrote to the same file.
+    """
+
+    def __init__(self, path, ttl=TTL):
+        self.path = path
+        self.ttl = ttl
+        self._entries = {}
+        self._mtime_ns = None
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def _read(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f), os.stat(self.path).st_mtime_ns
+        except (OSError, ValueError):
+            return {}, None
+
+    def refresh(self):
+        """Reload the file if another process changed it."""
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime_ns != self._mtime_ns:
+            entries, mtime_ns = self._read()
+            with self._lock:
+                self._merge(entries)
+                self._mtime_ns = mtime_ns
+
+    def _merge(self, entries):
+        for url, entry in entries.items():
+            if entry["checked_at"] > self._entries.get(url, {}).get("checked_at", 0):
+                self._entries[url] = entry
+
+    def get(self, url):
+        """Last result for url (possibly stale), or None."""
+        return self._entries.get(url)
+
+    def is_fresh(self, url, now=None):
+        entry = self._entries.get(url)
+        return entry is not None and (now or time.time()) - entry["checked_at"] < self.ttl
+
+    def put(self, entry):
+        with self._lock:
+            self._entries[entry["url"]] = entry
+
+    def save(self):
+        """Write the results (merged with the file's newer ones) through a temp file."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._lock:
+            self._merge(self._read()[0])
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp, self.path)
+            self._mtime_ns = os.stat(self.path).st_mtime_ns
+
+
+# CHECKING
+
+
+class Limiter:
+    """
+    At most `concurrency` requests in flight, and per host at most
+    `per_host`, started at least `interval` seconds apart.
+    """
+
+    def __init__(self, concurrency=CONCURRENCY, per_host=PER_HOST, interval=HOST_INTERVAL):
+        self.interval = interval
+        self._in_flight = asyncio.Semaphore(concurrency)
+        self._hosts = collections.defaultdict(lambda: asyncio.Semaphore(per_host))
+        self._next_start = collections.defaultdict(float)
+
+    @contextlib.asynccontextmanager
+    async def slot(self, host):
+        # Host first: requests waiting for a busy host hold no global slot
+        async with self._hosts[host]:
+            now = asyncio.get_running_loop().time()
+            start = max(now, self._next_start[host])
+            self._next_start[host] = start + self.interval
+            if start > now:
+                await asyncio.sleep(start - now)
+            async with self._in_flight:
+                yield
+
+
+async def _request(method, url):
+    """(status, Location header) of one HTTP/1.1 request."""
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError(f"not an http(s) URL: {url}")
+    https = parts.scheme == "https"
+    hostname = parts.hostname.encode("idna").decode("ascii")     # UnicodeError is a ValueError
+    reader, writer = await asyncio.open_connection(
+        hostname, parts.port or (443 if https else 80),
+        ssl=ssl.create_default_context() if https else None,
+    )
+    try:
+        # Non-ASCII paths / queries are percent-encoded (UTF-8); existing escapes are kept
+        target = parts.path or "/"
+        if parts.query:
+            target += f"?{parts.query}"
+        target = urllib.parse.quote(target, safe="/?&=%:@!$'()*+,;~-._")
+        host = hostname if parts.port is None else f"{hostname}:{parts.port}"
+        writer.write(
+            f"{method} {target} HTTP/1.1\r\nHost: {host}\r\nUser-Agent: {USER_AGENT}\r\n"
+            f"Accept: */*\r\nConnection: close\r\n\r\n".encode("latin-1")
+        )
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        location = None
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "location":
+                location = value.strip()
+        return status, location
+    finally:
+        writer.close()
+        with contextlib.suppress(Exception):
+            await writer.wait_closed()
+
+
+async def _follow(url, limiter, timeout):
+    """(final status, final url), following redirects. `timeout` is per request."""
+    for _ in range(MAX_REDIRECTS + 1):
+        async with limiter.slot(urllib.parse.urlsplit(url).netloc.lower()):
+            status, location = await asyncio.wait_for(_request("HEAD", url), timeout)
+            if status in NO_HEAD:
+                status, location = await asyncio.wait_for(_request("GET", url), timeout)
+        if status not in REDIRECTS or not location:
+            return status, url
+        url = urllib.parse.urljoin(url, location)
+    raise ValueError("too many redirects")
+
+
+async def check_link(url, limiter, timeout=TIMEOUT):
+    """Result dict for one URL; never raises."""
+    entry = {"url": url, "ok": False, "status": None, "final_url": None, "error": None}
+    try:
+        entry["status"], entry["final_url"] = await _follow(url, limiter, timeout)
+        entry["ok"] = entry["status"] < 400
+    except asyncio.TimeoutError:
+        entry["error"] = "timeout"
+    except (OSError, ValueError, IndexError) as e:
+        entry["error"] = str(e) or type(e).__name__
+    entry["checked_at"] = time.time()
+    return entry
+
+
+async def check_links(urls, cache=None, concurrency=CONCURRENCY, per_host=PER_HOST,
+                      host_interval=HOST_INTERVAL, timeout=TIMEOUT):
+    """
+    {url: result} for the distinct URLs. With a cache, fresh results are
+    reused and new ones are put into it (cache.save() is up to the caller).
+    """
+    limiter = Limiter(concurrency, per_host, host_interval)
+    now = time.time()
+
+    async def one(url):
+        if cache is not None and cache.is_fresh(url, now):
+            return cache.get(url)
+        entry = await check_link(url, limiter, timeout)
+        if cache is not None:
+            cache.put(entry)
+        return entry
+
+    urls = list(dict.fromkeys(u for u in urls if u))
+    return dict(zip(urls, await asyncio.gather(*(one(u) for u in urls))))
+
+
+# BACKGROUND CHECKER FOR THE APP
+
+
+class LinkChecker:
+    """
+    Checks the links returned by `urls()` in a background thread: right
+    after start(), when check_now() is called (e.g. after a data reload)
+    and every `recheck_seconds`. Callbacks only read status(), which never
+    waits for the network.
+    """
+
+    def __init__(self, cache, urls, recheck_seconds=3600, **options):
+        self.cache = cache
+        self._urls = urls
+        self.recheck_seconds = recheck_seconds
+        self._options = options
+        self._requests = queue.Queue()
+        self._thread = None
+
+    def status(self, url):
+        """Last result for url (possibly stale), or None while it was never checked."""
+        return self.cache.get(url)
+
+    def check_now(self):
+        self._requests.put(True)
+
+    def _run(self):
+        while True:
+            try:
+                if not self._requests.get(timeout=self.recheck_seconds):
+                    return
+            except queue.Empty:
+                pass
+            try:
+                self.cache.refresh()
+                results = asyncio.run(check_links(self._urls(), self.cache, **self._options))
+                self.cache.save()
+                broken = sum(not r["ok"] for r in results.values())
+                log.info("Checked %d links, %d broken", len(results), broken)
+            except Exception:
+                log.exception("Link check failed")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="linkcheck", daemon=True)
+            self._thread.start()
+            self.check_now()
+
+    def stop(self):
+        if self._thread is not None:
+            self._requests.put(False)
+            self._thread.join()
+            self._thread = None
+
+
+#   MAIN
+
+
+if __name__ == "__main__":
+    from streamingest import iter_rows
+
+    parser = argparse.ArgumentParser(description="Check the platform links of a workbook.")
+    parser.add_argument("excel_path", help="workbook or CSV export folder")
+    parser.add_argument("--cache", help="result cache (default: next to the workbook cache)")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--per-host", type=int, default=PER_HOST)
+    parser.add_argument("--host-interval", type=float, default=HOST_INTERVAL)
+    parser.add_argument("--timeout", type=float, default=TIMEOUT)
+    parser.add_argument("--ttl", type=float, default=TTL, help="seconds before a result is re-checked")
+    args = parser.parse_args()
+
+    cache = LinkCache(args.cache or cache_path_for(args.excel_path), ttl=args.ttl)
+    urls = {url: name for _, name, url in iter_rows(args.excel_path, "Platforms") if url}
+    start = time.perf_counter()
+    results = asyncio.run(check_links(urls, cache, args.concurrency, args.per_host,
+                                      args.host_interval, args.timeout))
+    cache.save()
+    broken = [r for r in results.values() if not r["ok"]]
+    print(f"Checked {len(results)} links in {time.perf_counter() - start:.1f} s, {len(broken)} broken")
+    for r in broken:
+        print(f"  {urls[r['url']]}: {r['url']} ({r['error'] or r['status']})")
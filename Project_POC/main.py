@@ -1,113 +1,122 @@
-import pandas as pd
-import dash
-from dash import html, dcc, Output, Input, State
-import plotly.graph_objects as go
-
-
-# EXCEL DATA LOADING
-
-
-EXCEL_PATH = "volunteer_data.xlsx"
-
-# Read sheets
-df_platforms = pd.read_excel(EXCEL_PATH, sheet_name="Platforms")
-df_features = pd.read_excel(EXCEL_PATH, sheet_name="Features")
-df_pf = pd.read_excel(EXCEL_PATH, sheet_name="PlatformFeatures")
-
-# Keep only columns we need
-df_platforms = df_platforms[["platform_id", "name", "url"]]
-df_features = df_features[["feature_id", "group", "name"]]
-df_pf = df_pf[["platform_id", "feature_id"]]
-
-# Join everything into one big table: platform-feature with full info
-df_pf_full = (
-    df_pf
-    .merge(df_platforms, on="platform_id", how="left")       # name_platform, url
-    .merge(df_features, on="feature_id", how="left",
-           suffixes=("_platform", "_feature"))               # group, name_feature
-)
+import argparse
+import functools
+import os
 
+import dash
+from dash import html, dcc, Output, Input, State, ClientsideFunction
 
-#   Dictionaries for domain features (everything except Language)
+from api import register_api
+from figurecache import FigureCache, filter_key
+from figures import (SUNBURST_LAYOUT, base_layout, empty_figure, hierarchy_figure, sunburst_arrays,
+                     sunburst_figure, sunburst_patch)
+from metrics import Gauge, instrument, register_metrics_route, registry
+from network import NETWORK_STYLESHEET
+from ranking import MAX_K, rank_platforms
 
+try:
+    import dash_cytoscape as cyto
+except ImportError:     # optional: without it there is no network tab
+    cyto = None
 
-df_domain = df_pf_full[df_pf_full["group"] != "Language"].copy()
 
-# Feature name -> list of platforms
-keyword_to_platforms = (
-    df_domain
-    .groupby("name_feature")["name_platform"]
-    .apply(lambda s: sorted(s.dropna().unique()))
-    .to_dict()
-)
+# EXCEL DATA LOADING
 
-# Platform name -> list of feature names
-platform_to_keywords = (
-    df_domain
-    .groupby("name_platform")["name_feature"]
-    .apply(lambda s: sorted(s.dropna().unique()))
-    .to_dict()
-)
 
-# Platform name -> URL
-platform_links = (
-    df_platforms
-    .set_index("name")["url"]
-    .dropna()
-    .to_dict()
-)
+FIGURE_CACHE_SIZE = 256        # distinct filter states kept as built figures
+DATA_POLL_SECONDS = 5          # how often the server checks the workbook
+CLIENT_POLL_MS = 30_000        # how often browsers ask for a new data version
+
+# Drill-down sunburst (config "sunburst_drilldown"): at most this many
+# platforms per opened feature, the rest collapsed into one "Other" segment
+DRILLDOWN_TOP_N = 40
+
+# Server-side sunburst: a filter change is sent as a dash.Patch (only the
+# nodes that changed) when that is at most this fraction of the full figure
+PATCH_MAX_FRACTION = 0.5
+
+# create_app(config) settings; missing keys fall back to these
+DEFAULT_CONFIG = {
+    "excel_path": os.environ.get("VOLUNTEER_DATA", "volunteer_data.xlsx"),
+    # Multi-worker deployments: attach to the index published by sharedindex.py
+    # (memory-mapped, shared by all workers) instead of reading the workbook
+    "shared_index_dir": os.environ.get("SHARED_INDEX_DIR"),
+    # Filter the sunburst and count the facets in the browser (assets/clientside.js) instead of on
+    # the server. The compact index is sent once per page load / data version.
+    "clientside_filtering": os.environ.get("CLIENTSIDE_FILTERING", "0") == "1",
+    # Drill-down sunburst: first only the feature ring with counts, a click on
+    # a feature loads just that feature's platforms. Keeps the payload bounded.
+    "sunburst_drilldown": os.environ.get("SUNBURST_DRILLDOWN", "0") == "1",
+    # Very large workbooks / CSV exports (excel_path may be a folder with
+    # Platforms.csv, Features.csv, PlatformFeatures.csv): stream the
+    # PlatformFeatures rows in chunks instead of loading pandas frames
+    "streaming_ingest": os.environ.get("STREAMING_INGEST", "0") == "1",
+    # Website status on the platform cards (linkcheck.py): "cache" only shows
+    # the results linkcheck.py wrote (e.g. from cron), "background" also
+    # checks the links in a thread of this process; empty: off
+    "link_check": os.environ.get("LINK_CHECK", ""),
+    "link_cache": os.environ.get("LINK_CACHE"),     # default: next to the workbook cache
+    "data_poll_seconds": DATA_POLL_SECONDS,
+    # Start watching the data right away. Preforking servers pass False and
+    # start the watcher in each worker (a thread does not survive fork).
+    "watch": True,
+}
 
-# Language info
+# Settings of the running app and its data; both are set by create_app.
+# Nothing is loaded when this module is imported.
+settings = dict(DEFAULT_CONFIG)
+data_store = None
+link_cache = None           # linkcheck.LinkCache when link_check is on
+link_checker = None         # linkcheck.LinkChecker in "background" mode
 
+# Built sunburst figures per filter state; emptied (and the default figure
+# rebuilt) whenever a new data version is swapped in
+figure_cache = FigureCache(maxsize=FIGURE_CACHE_SIZE)
 
-df_lang = df_pf_full[df_pf_full["group"] == "Language"].copy()
+# Prometheus text metrics (callback latency/size/calls, data load times,
+# figure cache counters), served by create_app on the Flask server
+registry.add(Gauge("figure_cache_events", "Sunburst figure cache counters.",
+                   lambda: {k: v for k, v in figure_cache.stats().items() if k != "maxsize"},
+                   labelname="event"))
 
-if not df_lang.empty:
-    # Extract clean language name from e.g. "Language: English"
-    df_lang["language"] = (
-        df_lang["name_feature"]
-        .str.replace("Language:", "", regex=False)
-        .str.strip()
-    )
+# Callbacks are collected at import time and registered by create_app
+CALLBACKS = []
 
-    # Platform -> list of languages
-    platform_languages_multi = (
-        df_lang
-        .groupby("name_platform")["language"]
-        .apply(lambda s: sorted(s.dropna().unique()))
-        .to_dict()
-    )
 
-    # Main language (first) – used for filtering & labels
-    platform_main_language = {
-        p: langs[0] for p, langs in platform_languages_multi.items() if len(langs) > 0
-    }
-else:
-    platform_languages_multi = {}
-    platform_main_language = {}
+def callback(*args, **kwargs):
+    """app.callback for the app create_app builds later."""
+    def collect(func):
+        CALLBACKS.append((args, kwargs, func))
+        return func
+    return collect
 
-# Language filter options
-if platform_main_language:
-    language_options = sorted(set(platform_main_language.values()))
-else:
-    language_options = []
 
-# Feature checklist options
-all_keywords = sorted(keyword_to_platforms.keys())
+# SMALL HELPERS
 
 
-# SMALL HELPERS
+def link_status_label(url):
+    """Last link check result of url from the cache (never checks it here)."""
+    if link_cache is None or url == "#":
+        return None
+    link_cache.refresh()
+    entry = link_cache.get(url)
+    if entry is None:
+        return html.Span(" (link not checked yet)", style={"color": "gray"})
+    if entry["ok"]:
+        return html.Span(" ✓ reachable", style={"color": "green"})
+    return html.Span(f" ✗ unreachable ({entry['error'] or entry['status']})", style={"color": "red"})
 
 
-def build_platform_card(platform_name, title_suffix=""):
+def build_platform_card(platform_name, title_suffix="", snap=None):
     """Create a nice card for a single platform (all features)."""
     if platform_name is None:
         return html.Div()
 
-    features = platform_to_keywords.get(platform_name, [])
-    langs = platform_languages_multi.get(platform_name, [])
-    lang_label = ", ".join(langs) if langs else platform_main_language.get(platform_name, "Unknown")
-    url = platform_links.get(platform_name, "#")
+    snap = snap or data_store.snapshot
+    features = snap.platform_to_keywords.get(platform_name, [])
+    langs = snap.platform_languages_multi.get(platform_name, [])
+    lang_label = ", ".join(langs) if langs else snap.platform_main_language.get(platform_name, "Unknown")
+    url = snap.platform_links.get(platform_name, "#")
+    similar = snap.similarity.neighbors(platform_name)
 
     title = platform_name
     if title_suffix:
@@ -119,7 +128,11 @@ def build_platform_card(platform_name, title_suffix=""):
             html.P(f"Language(s): {lang_label}"),
             html.P("Features:"),
             html.Ul([html.Li(f) for f in features]) if features else html.P("No features recorded."),
-            html.A("Visit Website", href=url, target="_blank", style={"color": "blue"})
+            html.P("Most similar platforms:"),
+            html.Ul([html.Li(f"{name} ({score:.0%} feature overlap)") for name, score in similar])
+            if similar else html.P("No similar platforms found."),
+            html.A("Visit Website", href=url, target="_blank", style={"color": "blue"}),
+            link_status_label(url),
         ],
         style={
             "border": "1px solid #aaa",
@@ -132,14 +145,137 @@ def build_platform_card(platform_name, title_suffix=""):
     )
 
 
-def compute_feature_diff(platform_a, platform_b):
+def compute_feature_diff(platform_a, platform_b, snap=None):
     """Return (only_in_A, only_in_B) feature lists."""
-    set_a = set(platform_to_keywords.get(platform_a, []))
-    set_b = set(platform_to_keywords.get(platform_b, []))
-    only_a = sorted(list(set_a - set_b))
-    only_b = sorted(list(set_b - set_a))
-    return only_a, only_b
+    snap = snap or data_store.snapshot
+    return snap.index.feature_diff(platform_a, platform_b)
+
+
+@functools.lru_cache(maxsize=2)
+def client_index(snap):
+    """
+    Compact index for the client-side sunburst and facet counts: names,
+    feature -> platform ids, platform -> main language code and all
+    language codes, the checklist options, plus the ready-made layout and
+    empty figure so the browser builds exactly the same figure dict.
+    """
+    index = snap.index
+    return {
+        "platforms": index.platforms.tolist(),
+        "keywords": snap.all_keywords,
+        "language_options": snap.language_options,
+        "feature_ids": index.feature_ids,
+        "members": [index.matrix[:, f].nonzero()[0].tolist() for f in range(len(index.features))],
+        "language_ids": index.language_ids,
+        "main_lang": index.main_lang.tolist(),
+        "platform_langs": [row.nonzero()[0].tolist() for row in index.lang_matrix],
+        "has_languages": bool(snap.platform_main_language),
+        "layout": base_layout(SUNBURST_LAYOUT),
+        "empty": empty_figure(),
+    }
+
+
+def client_index_data(snap):
+    return client_index(snap) if settings["clientside_filtering"] else None
+
+
+def build_comparison(platforms, snap=None):
+    """Cards, feature matrix, shared and unique features for N platforms."""
+    snap = snap or data_store.snapshot
+    result = snap.index.compare(platforms)
+    platforms = result["platforms"]
+
+    cards = html.Div(
+        style={"display": "flex", "flexWrap": "wrap", "gap": "20px", "marginTop": "20px"},
+        children=[
+            html.Div(style={"flex": "1 1 280px"}, children=[build_platform_card(p, snap=snap)])
+            for p in platforms
+        ]
+    )
+
+    # Feature x platform table: who has which feature
+    cell = {"border": "1px solid #ddd", "padding": "4px 8px", "textAlign": "center"}
+    table = html.Table(
+        style={"borderCollapse": "collapse", "marginTop": "10px"},
+        children=[
+            html.Thead(html.Tr([html.Th("Feature", style=cell)] + [html.Th(p, style=cell) for p in platforms])),
+            html.Tbody([
+                html.Tr(
+                    [html.Td(feature, style=cell | {"textAlign": "left"})]
+                    + [html.Td("✓" if has else "—", style=cell) for has in row]
+                )
+                for feature, row in zip(result["features"], result["membership"])
+            ])
+        ]
+    )
+
+    shared = result["shared"]
+    unique_block = html.Div(
+        style={"display": "flex", "flexWrap": "wrap", "width": "100%"},
+        children=[
+            html.Div(
+                style={"flex": "1 1 200px", "paddingRight": "20px"},
+                children=[
+                    html.H4(f"Only in {p}"),
+                    html.Ul([html.Li(f) for f in result["unique"][p]]) if result["unique"][p] else html.P("—")
+                ]
+            )
+            for p in platforms
+        ]
+    )
+
+    return html.Div(
+        style={"width": "100%"},
+        children=[
+            html.H2(f"Platform Comparison ({len(platforms)} platforms)"),
+            cards,
+            html.Div(
+                [
+                    html.H3("Feature overview"),
+                    table,
+                    html.H3(f"Shared by all ({len(shared)})"),
+                    html.Ul([html.Li(f) for f in shared]) if shared else html.P("—"),
+                    html.H3("DIF – Features unique to one platform"),
+                    unique_block
+                ],
+                style={"marginTop": "30px", "width": "100%"}
+            )
+        ]
+    )
+
+
+# How selected features combine (see bitindex.FEATURE_MATCHES)
+FEATURE_MATCH_OPTIONS = [
+    {"label": "Any selected feature (OR)", "value": "any"},
+    {"label": "All selected features (AND)", "value": "all"},
+]
 
+# Chart types for the group -> feature -> platform view (figures.HIERARCHY_CHARTS)
+HIERARCHY_CHART_OPTIONS = [
+    {"label": "Sunburst", "value": "sunburst"},
+    {"label": "Treemap", "value": "treemap"},
+    {"label": "Icicle", "value": "icicle"},
+]
+
+# Network tab (see network.NETWORK_MODES); the slider sets the minimum edge
+# weight of the platform network (disabled in the bipartite one)
+NETWORK_MODE_OPTIONS = [
+    {"label": "Platforms ↔ features", "value": "bipartite"},
+    {"label": "Platforms by shared features", "value": "platforms"},
+]
+NETWORK_MAX_WEIGHT = 10
+
+# Language filter semantics (see bitindex.LANGUAGE_MODES)
+LANGUAGE_MODE_OPTIONS = [
+    {"label": "Main language", "value": "main"},
+    {"label": "Any supported language", "value": "any"},
+]
+
+# Ranking section: cards shown by default (the JSON API takes k per request)
+RANK_DEFAULT_K = 5
+
+# Comparison state: selected platforms + whether the comparison view is open
+EMPTY_COMPARISON = {"platforms": [], "show": False}
 
 # Base styles for showing/hiding browse vs comparison
 BROWSE_STYLE = {"display": "flex"}
@@ -162,308 +298,885 @@ COMPARE_VISIBLE_STYLE = {
 # DASH APP LAYOUT
 
 
-app = dash.Dash(__name__)
-
-app.layout = html.Div(
-    [
-        # Stores for comparison logic
-        dcc.Store(id="platform-a-store"),
-        dcc.Store(id="platform-b-store"),
-        dcc.Store(id="current-platform-store"),
-
-        html.Div(
-            style={"display": "flex"},
-            children=[
-                #  LEFT: FILTERS
-                html.Div(
-                    style={"width": "25%", "padding": "20px"},
-                    children=[
-                        html.H3("Filter by Feature"),
-                        dcc.Checklist(
-                            id="keyword-filter",
-                            options=[{"label": k, "value": k} for k in all_keywords],
-                            value=all_keywords,  # all selected by default
-                            inputStyle={"margin-right": "10px", "margin-left": "5px"}
-                        ),
-                        html.H3("Filter by Language"),
-                        dcc.Checklist(
-                            id="language-filter",
-                            options=[{"label": lang, "value": lang} for lang in language_options],
-                            value=language_options,  # all languages selected by default
-                            inputStyle={"margin-right": "10px", "margin-left": "5px"}
-                        )
-                    ]
-                ),
-
-                # RIGHT: MAIN AREA
-                html.Div(
-                    style={"width": "75%", "padding": "20px"},
-                    children=[
-                        html.H1("Volunteer Platform Comparison"),
-
-                        #BROWSE SECTION: Sunburst + single card + Set A/B
-                        html.Div(
-                            id="browse-section",
-                            style=BROWSE_STYLE.copy(),
-                            children=[
-                                dcc.Graph(
-                                    id="sunburst-graph",
-                                    style={"width": "70%", "height": "800px"}
-                                ),
-                                html.Div(
-                                    style={
-                                        "width": "30%",
-                                        "marginLeft": "20px",
-                                        "alignSelf": "flex-start"
-                                    },
-                                    children=[
-                                        html.Div(id="platform-card"),
-                                        html.Div(
-                                            style={"marginTop": "10px"},
-                                            children=[
-                                                html.Button("Set as A", id="set-a-button", n_clicks=0),
-                                                html.Button("Set as B", id="set-b-button", n_clicks=0,
-                                                            style={"marginLeft": "10px"})
-                                            ]
-                                        )
-                                    ]
-                                )
-                            ]
-                        ),
-
-                        #  COMPARISON SECTION: initially hidden
-                        html.Div(
-                            id="comparison-section",
-                            style=COMPARE_HIDDEN_STYLE.copy(),
-                            children=[
-                                html.Div(id="comparison-content", style={"width": "100%"}),
-                                html.Button(
-                                    "Clear comparison (back to browsing)",
-                                    id="clear-compare-button",
-                                    n_clicks=0,
-                                    style={"marginTop": "20px"}
-                                )
-                            ]
-                        ),
-                    ]
-                )
-            ]
-        )
+def facet_options(snap, selected_keywords, selected_languages, language_mode="main", feature_match="any"):
+    """
+    Feature and language checklist options labelled with live match counts,
+    plus the number of platforms matching the whole selection. Unchecked
+    options without matches are disabled.
+    """
+    index = snap.index
+    selected_keywords = selected_keywords or []
+    selected_languages = selected_languages or []
+    languages = selected_languages if snap.platform_main_language else None
+    total, feature_counts, lang_counts = index.facet_counts(selected_keywords, languages,
+                                                            language_mode, feature_match)
+
+    def options(values, ids, counts, selected):
+        selected = set(selected)
+        result = []
+        for value in values:
+            count = int(counts[ids[value]]) if value in ids else 0
+            result.append({"label": f"{value} ({count})", "value": value,
+                           "disabled": count == 0 and value not in selected})
+        return result
+
+    return (
+        options(snap.all_keywords, index.feature_ids, feature_counts, selected_keywords),
+        options(snap.language_options, index.language_ids, lang_counts, selected_languages),
+        f"{total} platforms match the selection",
+    )
+
+
+def build_ranking(required, nice_to_have, k, snap=None):
+    """Cards of the k platforms covering the requested features best."""
+    snap = snap or data_store.snapshot
+    ranking = rank_platforms(snap.index, required or [], nice_to_have or [], k)
+    if not ranking["results"]:
+        return html.P("No platform has any of these features.")
+
+    required_set = set(required or [])
+    cards = []
+    for match in ranking["results"]:
+        notes = []
+        if not match["required_met"]:
+            required_missing = [f for f in match["missing"] if f in required_set]
+            notes.append(html.P(f"Missing required: {', '.join(required_missing)}", style={"color": "red"}))
+        cards.append(html.Div(
+            style={"flex": "1 1 280px"},
+            children=[build_platform_card(match["platform"], f"{match['score']:.0%} coverage", snap=snap)] + notes
+        ))
+    return html.Div(style={"display": "flex", "flexWrap": "wrap", "gap": "20px", "marginTop": "20px"},
+                    children=cards)
+
+
+def merge_selection(selected, old_options, new_options):
+    """
+    Keep the user's selection after a data reload: drop values that no
+    longer exist and select options that are new.
+    """
+    new_set = set(new_options)
+    old_set = {o["value"] for o in old_options or []}
+    kept = [v for v in selected or [] if v in new_set]
+    return kept + [v for v in new_options if v not in old_set]
+
+
+def network_tabs():
+    """The network tab, if dash_cytoscape is installed."""
+    if cyto is None:
+        return []
+    return [
+        dcc.Tab(label="Network", value="network", children=[
+            dcc.RadioItems(
+                id="network-mode",
+                options=NETWORK_MODE_OPTIONS,
+                value="bipartite",
+                inline=True,
+                inputStyle={"margin-right": "5px", "margin-left": "15px"},
+                style={"marginTop": "10px"}
+            ),
+            html.Div(
+                style={"marginTop": "10px"},
+                children=[
+                    html.Label("Minimum shared features per edge (platform network):"),
+                    dcc.Slider(id="network-min-weight", min=1, max=NETWORK_MAX_WEIGHT, step=1, value=1,
+                               disabled=True),
+                ]
+            ),
+            # Positions come from the server ("preset"): no layout runs in the browser
+            cyto.Cytoscape(
+                id="network-graph",
+                layout={"name": "preset"},
+                elements=[],
+                stylesheet=NETWORK_STYLESHEET,
+                style={"width": "100%", "height": "750px"},
+            ),
+        ])
     ]
+
+
+def serve_layout():
+    """Called per page load, so new sessions always get the current data."""
+    return build_layout(data_store.snapshot)
+
+
+@functools.lru_cache(maxsize=2)
+def build_layout(snap):
+    """The page for one data version, built once (the first page load is as cheap as the next)."""
+    all_keywords = snap.all_keywords
+    language_options = snap.language_options
+    keyword_options, lang_options, facet_summary = facet_options(snap, all_keywords, language_options)
+
+    return html.Div(
+        [
+            # Stores for comparison logic
+            dcc.Store(id="comparison-store", data=EMPTY_COMPARISON),
+            dcc.Store(id="current-platform-store"),
+
+            # Data version this page was built from + periodic check for a newer one
+            dcc.Store(id="data-version-store", data=snap.version),
+            dcc.Store(id="sunburst-index-store", data=client_index_data(snap)),
+            dcc.Store(id="drill-feature-store"),
+            dcc.Store(id="sunburst-shown-store"),
+            dcc.Store(id="hierarchy-filter-store"),
+            dcc.Store(id="network-filter-store"),
+            dcc.Interval(id="data-version-poll", interval=CLIENT_POLL_MS),
+
+            html.Div(
+                style={"display": "flex"},
+                children=[
+                    #  LEFT: FILTERS
+                    html.Div(
+                        style={"width": "25%", "padding": "20px"},
+                        children=[
+                            html.H3("Filter by Feature"),
+                            dcc.RadioItems(
+                                id="feature-match",
+                                options=FEATURE_MATCH_OPTIONS,
+                                value="any",
+                                inputStyle={"margin-right": "10px", "margin-left": "5px"},
+                                style={"marginBottom": "10px"}
+                            ),
+                            html.P(facet_summary, id="facet-summary", style={"fontWeight": "bold"}),
+                            dcc.Checklist(
+                                id="keyword-filter",
+                                options=keyword_options,
+                                value=all_keywords,  # all selected by default
+                                inputStyle={"margin-right": "10px", "margin-left": "5px"}
+                            ),
+                            html.H3("Filter by Language"),
+                            dcc.RadioItems(
+                                id="language-mode",
+                                options=LANGUAGE_MODE_OPTIONS,
+                                value="main",
+                                inputStyle={"margin-right": "10px", "margin-left": "5px"},
+                                style={"marginBottom": "10px"}
+                            ),
+                            dcc.Checklist(
+                                id="language-filter",
+                                options=lang_options,
+                                value=language_options,  # all languages selected by default
+                                inputStyle={"margin-right": "10px", "margin-left": "5px"}
+                            )
+                        ]
+                    ),
+
+                    # RIGHT: MAIN AREA
+                    html.Div(
+                        style={"width": "75%", "padding": "20px"},
+                        children=[
+                            html.H1("Volunteer Platform Comparison"),
+
+                            #BROWSE SECTION: Sunburst + single card + Set A/B
+                            html.Div(
+                                id="browse-section",
+                                style=BROWSE_STYLE.copy(),
+                                children=[
+                                    dcc.Tabs(
+                                        id="view-tabs",
+                                        value="features",
+                                        parent_style={"width": "70%"},
+                                        children=[
+                                            dcc.Tab(label="Feature → platform", value="features", children=[
+                                                dcc.Graph(id="sunburst-graph", style={"height": "800px"})
+                                            ]),
+                                            dcc.Tab(label="Group → feature → platform", value="groups", children=[
+                                                dcc.RadioItems(
+                                                    id="hierarchy-chart",
+                                                    options=HIERARCHY_CHART_OPTIONS,
+                                                    value="sunburst",
+                                                    inline=True,
+                                                    inputStyle={"margin-right": "5px", "margin-left": "15px"},
+                                                    style={"marginTop": "10px"}
+                                                ),
+                                                dcc.Graph(id="hierarchy-graph", style={"height": "800px"})
+                                            ]),
+                                            *network_tabs(),
+                                        ]
+                                    ),
+                                    html.Div(
+                                        style={
+                                            "width": "30%",
+                                            "marginLeft": "20px",
+                                            "alignSelf": "flex-start"
+                                        },
+                                        children=[
+                                            html.Div(id="platform-card"),
+                                            html.Div(
+                                                style={"marginTop": "10px"},
+                                                children=[
+                                                    html.Button("Add to comparison", id="add-compare-button",
+                                                                n_clicks=0),
+                                                    html.Button("Compare", id="show-compare-button", n_clicks=0,
+                                                                style={"marginLeft": "10px"})
+                                                ]
+                                            ),
+                                            html.Div(id="comparison-selection", style={"marginTop": "10px"})
+                                        ]
+                                    )
+                                ]
+                            ),
+
+                            #  COMPARISON SECTION: initially hidden
+                            html.Div(
+                                id="comparison-section",
+                                style=COMPARE_HIDDEN_STYLE.copy(),
+                                children=[
+                                    html.Div(id="comparison-content", style={"width": "100%"}),
+                                    html.Button(
+                                        "Clear comparison (back to browsing)",
+                                        id="clear-compare-button",
+                                        n_clicks=0,
+                                        style={"marginTop": "20px"}
+                                    )
+                                ]
+                            ),
+
+                            #  RANKING SECTION: best platforms for a set of needed features
+                            html.Div(
+                                style={"marginTop": "40px"},
+                                children=[
+                                    html.H2("Which platforms fit my requirements best?"),
+                                    html.P("Required features:"),
+                                    dcc.Dropdown(id="rank-required", options=all_keywords, multi=True),
+                                    html.P("Nice to have:"),
+                                    dcc.Dropdown(id="rank-nice", options=all_keywords, multi=True),
+                                    html.P("Number of platforms:"),
+                                    dcc.Input(id="rank-k", type="number", value=RANK_DEFAULT_K,
+                                              min=1, max=MAX_K, step=1),
+                                    html.Div(id="rank-results")
+                                ]
+                            ),
+                        ]
+                    )
+                ]
+            )
+        ]
+    )
+
+
+#               CALLBACK 0 – PUSH RELOADED DATA TO THE CHECKLISTS
+
+
+@callback(
+    [Output("keyword-filter", "value"),
+     Output("language-filter", "value"),
+     Output("data-version-store", "data"),
+     Output("sunburst-index-store", "data")],
+    Input("data-version-poll", "n_intervals"),
+    [State("data-version-store", "data"),
+     State("keyword-filter", "options"),
+     State("keyword-filter", "value"),
+     State("language-filter", "options"),
+     State("language-filter", "value")],
+    prevent_initial_call=True
 )
+@instrument("refresh_filter_options")
+def refresh_filter_options(n_intervals, known_version,
+                           keyword_options, selected_keywords,
+                           lang_options, selected_languages):
+    """
+    When the workbook was reloaded, update this client's selection and
+    data version (the new options follow from callback 0b).
+    """
+    snap = data_store.snapshot
+    if snap.version == known_version:
+        raise dash.exceptions.PreventUpdate
+
+    return (
+        merge_selection(selected_keywords, keyword_options, snap.all_keywords),
+        merge_selection(selected_languages, lang_options, snap.language_options),
+        snap.version,
+        client_index_data(snap)
+    )
+
+
+#               CALLBACK 0b – FACET COUNTS ON THE CHECKLISTS
+
+
+def update_facet_counts(selected_keywords, selected_languages, language_mode, feature_match, data_version):
+    """Live match counts for every feature and language option."""
+    return facet_options(data_store.snapshot, selected_keywords, selected_languages,
+                         language_mode, feature_match)
+
+
+def register_facet_callbacks(app):
+    """Counts in the browser with CLIENTSIDE_FILTERING (like the sunburst), otherwise on the server."""
+    outputs = [Output("keyword-filter", "options"),
+               Output("language-filter", "options"),
+               Output("facet-summary", "children")]
+    filters = [Input("keyword-filter", "value"),
+               Input("language-filter", "value"),
+               Input("language-mode", "value"),
+               Input("feature-match", "value")]
+    if settings["clientside_filtering"]:
+        app.clientside_callback(
+            ClientsideFunction(namespace="volunteer", function_name="facetCounts"),
+            outputs,
+            filters + [Input("sunburst-index-store", "data")],
+            prevent_initial_call=True
+        )
+    else:
+        app.callback(
+            outputs,
+            filters + [Input("data-version-store", "data")],
+            prevent_initial_call=True
+        )(instrument("update_facet_counts")(update_facet_counts))
+
 
 #               CALLBACK 1 – SUNBURST FIGURE
 
 
-@app.callback(
-    Output("sunburst-graph", "figure"),
-    [Input("keyword-filter", "value"),
-     Input("language-filter", "value")]
-)
-def update_sunburst(selected_keywords, selected_languages):
+def sunburst_blocks(snap, selected_keywords, selected_languages, language_mode="main", feature_match="any"):
+    """[(feature, [platforms])] shown in the sunburst; [] means an empty figure."""
     # If no feature selected OR (we have language info and none selected) -> empty
-    if not selected_keywords or (language_options and not selected_languages):
-        return go.Figure()
-
-    labels = []
-    parents = []
-    values = []
-
-    for keyword in selected_keywords:
-        platforms = keyword_to_platforms.get(keyword, [])
-
-        # Apply language filter if available
-        if selected_languages and platform_main_language:
-            platforms = [
-                p for p in platforms
-                if platform_main_language.get(p) in selected_languages
-            ]
-
-        if not platforms:
-            continue
-
-        labels.append(keyword)
-        parents.append("")
-        values.append(len(platforms))
-
-        for p in platforms:
-            labels.append(p)
-            parents.append(keyword)
-            values.append(1)
-
-    if not labels:
-        return go.Figure()
-
-    fig = go.Figure(
-        go.Sunburst(
-            labels=labels,
-            parents=parents,
-            values=values,
-            branchvalues="total",
-            maxdepth=2
+    if not selected_keywords or (snap.language_options and not selected_languages):
+        return []
+
+    # Apply language filter if available (vectorized over the bitset index)
+    languages = selected_languages if selected_languages and snap.platform_main_language else None
+    return snap.index.filter_platforms(selected_keywords, languages, language_mode, feature_match)
+
+
+def build_sunburst_figure(snap, selected_keywords, selected_languages, language_mode="main",
+                          feature_match="any"):
+    """Build the feature -> platform sunburst as a plain figure dict."""
+    blocks = sunburst_blocks(snap, selected_keywords, selected_languages, language_mode, feature_match)
+    if not blocks:
+        return empty_figure()
+
+    # Plain dict, no plotly validation (same result as go.Figure(go.Sunburst(...)))
+    return sunburst_figure(*sunburst_arrays(blocks), SUNBURST_LAYOUT)
+
+
+def cached_sunburst_figure(snap, selected_keywords, selected_languages, language_mode="main",
+                           feature_match="any"):
+    key = filter_key(snap.version, selected_keywords, selected_languages, language_mode, feature_match)
+    return figure_cache.get_or_build(
+        key, lambda: build_sunburst_figure(snap, selected_keywords, selected_languages,
+                                           language_mode, feature_match)
+    )
+
+
+def build_drilldown_figure(snap, selected_keywords, selected_languages, drill_feature=None,
+                           language_mode="main", feature_match="any"):
+    """
+    Without drill_feature: only the feature ring (feature -> platform count).
+    With it: that feature in the centre and its top platforms around it.
+    """
+    if not selected_keywords or (snap.language_options and not selected_languages):
+        return empty_figure()
+
+    languages = selected_languages if selected_languages and snap.platform_main_language else None
+
+    if drill_feature not in selected_keywords:
+        counts = snap.index.feature_counts(selected_keywords, languages, language_mode, feature_match)
+        if not counts:
+            return empty_figure()
+        labels = [k for k, _ in counts]
+        return sunburst_figure(labels, [""] * len(labels), [c for _, c in counts], SUNBURST_LAYOUT)
+
+    # AND: only platforms that also have every other selected feature
+    within = snap.index.feature_mask(selected_keywords, "all") if feature_match == "all" else None
+    platforms, n_other = snap.index.top_platforms(drill_feature, languages, DRILLDOWN_TOP_N,
+                                                  language_mode, within)
+    if not platforms:
+        return empty_figure()
+
+    labels = [drill_feature] + platforms
+    parents = [""] + [drill_feature] * len(platforms)
+    values = [len(platforms) + n_other] + [1] * len(platforms)
+    if n_other:
+        labels.append(f"Other ({n_other} more)")
+        parents.append(drill_feature)
+        values.append(n_other)
+
+    return sunburst_figure(labels, parents, values, SUNBURST_LAYOUT)
+
+
+def cached_drilldown_figure(snap, selected_keywords, selected_languages, drill_feature,
+                            language_mode="main", feature_match="any"):
+    key = filter_key(snap.version, selected_keywords, selected_languages, language_mode, feature_match,
+                     "drill", drill_feature)
+    return figure_cache.get_or_build(
+        key, lambda: build_drilldown_figure(snap, selected_keywords, selected_languages, drill_feature,
+                                            language_mode, feature_match)
+    )
+
+
+def hierarchy_tree(snap, selected_keywords, selected_languages, language_mode="main", feature_match="any"):
+    """Group -> feature -> platform tree for one filter state (same filters as the sunburst)."""
+    if not selected_keywords or (snap.language_options and not selected_languages):
+        return {"ids": [], "labels": [], "parents": [], "values": []}
+    languages = selected_languages if selected_languages and snap.platform_main_language else None
+    return snap.hierarchy.tree(selected_keywords, languages, language_mode, feature_match)
+
+
+def cached_hierarchy_tree(snap, selected_keywords, selected_languages, language_mode="main",
+                          feature_match="any"):
+    # One cached tree per filter state serves the sunburst, treemap and icicle
+    key = filter_key(snap.version, selected_keywords, selected_languages, language_mode, feature_match, "tree")
+    return figure_cache.get_or_build(
+        key, lambda: hierarchy_tree(snap, selected_keywords, selected_languages, language_mode, feature_match)
+    )
+
+
+def warm_figure_cache(snap):
+    """Pre-build the default figure and hierarchy (everything selected)."""
+    if settings["sunburst_drilldown"]:
+        cached_drilldown_figure(snap, snap.all_keywords, snap.language_options, None)
+    else:
+        cached_sunburst_figure(snap, snap.all_keywords, snap.language_options)
+    cached_hierarchy_tree(snap, snap.all_keywords, snap.language_options)
+
+
+def on_data_reload(snap):
+    figure_cache.clear()
+    warm_figure_cache(snap)
+
+
+def update_sunburst(selected_keywords, selected_languages, data_version=None, drill_feature=None,
+                    language_mode="main", feature_match="any"):
+    snap = data_store.snapshot
+    if settings["sunburst_drilldown"]:
+        return cached_drilldown_figure(snap, selected_keywords, selected_languages, drill_feature,
+                                       language_mode, feature_match)
+    return cached_sunburst_figure(snap, selected_keywords, selected_languages, language_mode, feature_match)
+
+
+def patch_sunburst(selected_keywords, selected_languages, data_version, language_mode, feature_match, shown):
+    """
+    Server-side sunburst with incremental updates. `shown` describes the
+    figure the client has (data version, features in figure order,
+    languages, language mode, feature match). If the new filter state
+    changes only a few nodes, just those are sent as a dash.Patch;
+    otherwise the whole (cached) figure.
+    """
+    snap = data_store.snapshot
+    selected_keywords = selected_keywords or []
+
+    figure = None
+    if shown and shown["version"] == snap.version:
+        old_blocks = sunburst_blocks(snap, shown["keywords"], shown["languages"],
+                                     shown.get("mode", "main"), shown.get("match", "any"))
+        # Features already shown keep their order (and node positions), new ones go last
+        selected = set(selected_keywords)
+        kept = [k for k, _ in old_blocks if k in selected]
+        kept_set = set(kept)
+        keywords = kept + [k for k in selected_keywords if k not in kept_set]
+        new_blocks = sunburst_blocks(snap, keywords, selected_languages, language_mode, feature_match)
+        if old_blocks and new_blocks:
+            n_nodes = sum(len(platforms) + 1 for _, platforms in new_blocks)
+            figure = sunburst_patch(old_blocks, new_blocks, PATCH_MAX_FRACTION * n_nodes)
+
+    if figure is None:
+        figure = cached_sunburst_figure(snap, selected_keywords, selected_languages, language_mode, feature_match)
+        # The cached figure may list the features in another order than selected_keywords
+        trace = figure["data"][0] if figure["data"] else {"labels": [], "parents": []}
+        shown_features = [label for label, parent in zip(trace["labels"], trace["parents"]) if parent == ""]
+        shown_set = set(shown_features)
+        keywords = shown_features + [k for k in selected_keywords if k not in shown_set]
+
+    shown = {"version": snap.version, "keywords": keywords, "languages": selected_languages,
+             "mode": language_mode, "match": feature_match}
+    return figure, shown
+
+
+def select_drill_feature(clickData, drill_feature):
+    """
+    Drill-down mode: a click on a feature opens it, a click on the opened
+    feature (the centre) goes back to the ring. Platform clicks only open
+    the card (callback 2).
+    """
+    if not clickData or "label" not in clickData["points"][0]:
+        raise dash.exceptions.PreventUpdate
+
+    label = clickData["points"][0]["label"]
+    if label == drill_feature:
+        return None
+    if label in data_store.snapshot.index.feature_ids:
+        return label
+    raise dash.exceptions.PreventUpdate
+
+
+def register_sunburst_callbacks(app):
+    """The sunburst callback depends on the configured mode."""
+    if settings["sunburst_drilldown"]:
+        app.callback(
+            Output("sunburst-graph", "figure"),
+            [Input("keyword-filter", "value"),
+             Input("language-filter", "value"),
+             Input("data-version-store", "data"),
+             Input("drill-feature-store", "data"),
+             Input("language-mode", "value"),
+             Input("feature-match", "value")]
+        )(instrument("update_sunburst")(update_sunburst))
+
+        app.callback(
+            Output("drill-feature-store", "data"),
+            Input("sunburst-graph", "clickData"),
+            State("drill-feature-store", "data"),
+            prevent_initial_call=True
+        )(instrument("select_drill_feature")(select_drill_feature))
+    elif settings["clientside_filtering"]:
+        # Zero server work per checkbox click: the figure is built in the browser
+        app.clientside_callback(
+            ClientsideFunction(namespace="volunteer", function_name="sunburst"),
+            Output("sunburst-graph", "figure"),
+            [Input("keyword-filter", "value"),
+             Input("language-filter", "value"),
+             Input("language-mode", "value"),
+             Input("feature-match", "value"),
+             Input("sunburst-index-store", "data")]
         )
+    else:
+        app.callback(
+            [Output("sunburst-graph", "figure"),
+             Output("sunburst-shown-store", "data")],
+            [Input("keyword-filter", "value"),
+             Input("language-filter", "value"),
+             Input("data-version-store", "data"),
+             Input("language-mode", "value"),
+             Input("feature-match", "value")],
+            State("sunburst-shown-store", "data")
+        )(instrument("update_sunburst")(patch_sunburst))
+
+
+#               CALLBACK 1b – GROUP -> FEATURE -> PLATFORM HIERARCHY
+
+
+def register_tab_filters(app, tab, store_id, function_name):
+    """
+    Copy the filter state into `store_id` in the browser, only while `tab`
+    is shown: the server callbacks of a hidden tab are not called for
+    checkbox clicks, and showing the tab (or new data) brings them up to date.
+    """
+    app.clientside_callback(
+        ClientsideFunction(namespace="volunteer", function_name=function_name),
+        Output(store_id, "data"),
+        [Input("view-tabs", "value"),
+         Input("keyword-filter", "value"),
+         Input("language-filter", "value"),
+         Input("language-mode", "value"),
+         Input("feature-match", "value"),
+         Input("data-version-store", "data")]
     )
 
-    fig.update_layout(
-        margin=dict(t=40, l=0, r=0, b=0),
-        width=800,
-        height=800,
-        title="Volunteer Platforms by Feature and Language"
+
+def shown_filters(filters):
+    """(keywords, languages, language mode, feature match) of a tab filter store."""
+    if not filters:
+        raise dash.exceptions.PreventUpdate
+    return filters["keywords"], filters["languages"], filters["language_mode"], filters["feature_match"]
+
+
+@callback(
+    Output("hierarchy-graph", "figure"),
+    [Input("hierarchy-filter-store", "data"),
+     Input("hierarchy-chart", "value")],
+    prevent_initial_call=True
+)
+@instrument("update_hierarchy")
+def update_hierarchy(filters, chart):
+    """Sunburst, treemap or icicle of the grouped features; only built while its tab is open."""
+    tree = cached_hierarchy_tree(data_store.snapshot, *shown_filters(filters))
+    return hierarchy_figure(tree, chart)
+
+
+#               CALLBACK 1c – PLATFORM / FEATURE NETWORK
+
+
+def network_elements(snap, selected_keywords, selected_languages, language_mode="main", feature_match="any",
+                     network_mode="bipartite", min_weight=1):
+    """Cytoscape elements for one filter state (same filters as the sunburst)."""
+    index = snap.index
+    if not selected_keywords or (snap.language_options and not selected_languages):
+        return []
+    mask = index.feature_mask(selected_keywords, feature_match)
+    if selected_languages and snap.platform_main_language:
+        mask &= index.language_mask(selected_languages, language_mode)
+    features = [index.feature_ids[k] for k in selected_keywords if k in index.feature_ids]
+    return snap.network.elements(mask.nonzero()[0], features, network_mode, min_weight)
+
+
+def cached_network_elements(snap, selected_keywords, selected_languages, language_mode, feature_match,
+                            network_mode, min_weight):
+    key = filter_key(snap.version, selected_keywords, selected_languages, language_mode, feature_match,
+                     "network", network_mode, min_weight)
+    return figure_cache.get_or_build(
+        key, lambda: network_elements(snap, selected_keywords, selected_languages, language_mode,
+                                      feature_match, network_mode, min_weight)
     )
 
-    return fig
+
+def update_network(filters, network_mode, min_weight):
+    """Network of the selection; only built while its tab is open."""
+    if network_mode != "platforms":
+        min_weight = 1      # one cache entry whatever the (disabled) slider says
+    return cached_network_elements(data_store.snapshot, *shown_filters(filters),
+                                   network_mode, min_weight or 1)
+
+
+def network_slider_disabled(network_mode):
+    """The minimum edge weight only applies to the platform network."""
+    return network_mode != "platforms"
+
+
+def register_network_callbacks(app):
+    """Only with dash_cytoscape installed (otherwise there is no network tab)."""
+    register_tab_filters(app, "network", "network-filter-store", "networkFilters")
+    app.callback(
+        Output("network-graph", "elements"),
+        [Input("network-filter-store", "data"),
+         Input("network-mode", "value"),
+         Input("network-min-weight", "value")],
+        prevent_initial_call=True
+    )(instrument("update_network")(update_network))
+    app.callback(
+        Output("network-min-weight", "disabled"),
+        Input("network-mode", "value"),
+    )(network_slider_disabled)
 
 
 #   CALLBACK 2 – SINGLE PLATFORM CARD + CURRENT PLATFORM STORE
 
 
-@app.callback(
+@callback(
     [Output("platform-card", "children"),
      Output("current-platform-store", "data")],
-    Input("sunburst-graph", "clickData")
+    [Input("sunburst-graph", "clickData"),
+     Input("hierarchy-graph", "clickData")]
 )
-def show_platform_card(clickData):
+@instrument("show_platform_card")
+def show_platform_card(clickData, hierarchy_clickData=None):
     """
-    When user clicks on a platform in the sunburst, show its card
-    and remember it as 'current platform' for Set A / Set B buttons.
+    When user clicks on a platform in the sunburst (or the hierarchy
+    chart), show its card and remember it as 'current platform' for the
+    comparison buttons.
     """
+    if hierarchy_clickData is not None and dash.ctx.triggered_id == "hierarchy-graph":
+        clickData = hierarchy_clickData
     if not clickData or "label" not in clickData["points"][0]:
         return "", None
 
     label = clickData["points"][0]["label"]
 
+    snap = data_store.snapshot
+
     # If user clicked on a feature segment (keyword), not a platform:
-    if label not in platform_to_keywords:
+    if label not in snap.platform_to_keywords:
         return "", None
 
-    card = build_platform_card(label)
+    card = build_platform_card(label, snap=snap)
     return card, label
 
 
-#   CALLBACK 3 – SET A / B / CLEAR COMPARISON
+#   CALLBACK 3 – ADD / COMPARE / CLEAR COMPARISON
 
 
-@app.callback(
-    [Output("platform-a-store", "data"),
-     Output("platform-b-store", "data")],
-    [Input("set-a-button", "n_clicks"),
-     Input("set-b-button", "n_clicks"),
+@callback(
+    Output("comparison-store", "data"),
+    [Input("add-compare-button", "n_clicks"),
+     Input("show-compare-button", "n_clicks"),
      Input("clear-compare-button", "n_clicks")],
     [State("current-platform-store", "data"),
-     State("platform-a-store", "data"),
-     State("platform-b-store", "data")],
+     State("comparison-store", "data")],
     prevent_initial_call=True
 )
-def manage_comparison(n_clicks_a, n_clicks_b, n_clicks_clear,
-                      current_platform, platform_a, platform_b):
+@instrument("manage_comparison")
+def manage_comparison(n_clicks_add, n_clicks_show, n_clicks_clear,
+                      current_platform, comparison):
     """
-    - 'Set as A' -> current platform becomes A
-    - 'Set as B' -> current platform becomes B
-    - 'Clear comparison' -> both becomes None
+    - 'Add to comparison' -> current platform joins the selection
+    - 'Compare' -> open the comparison view (needs 2+ platforms)
+    - 'Clear comparison' -> empty selection, back to browsing
     """
     ctx = dash.callback_context
     if not ctx.triggered:
         raise dash.exceptions.PreventUpdate
 
     trigger_id = ctx.triggered[0]["prop_id"].split(".")[0]
+    comparison = comparison or EMPTY_COMPARISON
+    platforms = comparison["platforms"]
 
     # Clear comparison: back to browsing
     if trigger_id == "clear-compare-button":
-        return None, None
+        return EMPTY_COMPARISON
 
-    # Need a selected platform to set A or B
-    if not current_platform:
-        raise dash.exceptions.PreventUpdate
+    if trigger_id == "add-compare-button":
+        # Need a selected platform to add
+        if not current_platform or current_platform in platforms:
+            raise dash.exceptions.PreventUpdate
+        return {"platforms": platforms + [current_platform], "show": False}
 
-    if trigger_id == "set-a-button":
-        return current_platform, platform_b
-    elif trigger_id == "set-b-button":
-        return platform_a, current_platform
+    if trigger_id == "show-compare-button":
+        if len(platforms) < 2:
+            raise dash.exceptions.PreventUpdate
+        return {"platforms": platforms, "show": True}
 
     raise dash.exceptions.PreventUpdate
 
 
 #   CALLBACK 4 – TOGGLE BROWSE vs COMPARISON + FILL COMPARISON
 
-@app.callback(
+@callback(
     [Output("browse-section", "style"),
      Output("comparison-section", "style"),
-     Output("comparison-content", "children")],
-    [Input("platform-a-store", "data"),
-     Input("platform-b-store", "data")]
+     Output("comparison-content", "children"),
+     Output("comparison-selection", "children")],
+    Input("comparison-store", "data")
 )
-def toggle_view_and_build_comparison(platform_a, platform_b):
+@instrument("toggle_view_and_build_comparison")
+def toggle_view_and_build_comparison(comparison):
     """
-    If both A and B are set -> hide browse-section, show comparison-section
-    and render the two cards + DIF list.
+    If the comparison was opened -> hide browse-section, show
+    comparison-section and render all cards + feature matrix + DIF lists.
     Otherwise show browse-section and hide comparison-section.
     """
+    comparison = comparison or EMPTY_COMPARISON
+    platforms = comparison["platforms"]
+
+    selection = ""
+    if platforms:
+        selection = html.P(f"Selected for comparison ({len(platforms)}): {', '.join(platforms)}")
+
     # Are we in comparison mode?
-    in_compare = bool(platform_a) and bool(platform_b)
+    in_compare = comparison["show"] and len(platforms) >= 2
 
     if not in_compare:
         # Browsing mode
         return (
             BROWSE_STYLE.copy(),
             COMPARE_HIDDEN_STYLE.copy(),
-            ""
+            "",
+            selection
         )
 
-    # Comparison mode: build A/B cards and differences
-    card_a = build_platform_card(platform_a, "A")
-    card_b = build_platform_card(platform_b, "B")
-
-    only_a, only_b = compute_feature_diff(platform_a, platform_b)
-
-    diff_block = html.Div(
-        [
-            html.H3("DIF – Feature differences"),
-            html.Div(
-                style={"display": "flex", "width": "100%"},
-                children=[
-                    html.Div(
-                        style={"width": "50%", "paddingRight": "20px"},
-                        children=[
-                            html.H4(f"Only in {platform_a} (A)"),
-                            html.Ul([html.Li(f) for f in only_a]) if only_a else html.P("—")
-                        ]
-                    ),
-                    html.Div(
-                        style={"width": "50%", "paddingLeft": "20px"},
-                        children=[
-                            html.H4(f"Only in {platform_b} (B)"),
-                            html.Ul([html.Li(f) for f in only_b]) if only_b else html.P("—")
-                        ]
-                    )
-                ]
-            )
-        ],
-        style={"marginTop": "30px", "width": "100%"}
-    )
-
-    comparison_layout = html.Div(
-        style={"width": "100%"},
-        children=[
-            html.H2("Platform Comparison"),
-            html.Div(
-                style={"display": "flex", "gap": "20px", "marginTop": "20px"},
-                children=[
-                    html.Div(style={"width": "50%"}, children=[card_a]),
-                    html.Div(style={"width": "50%"}, children=[card_b]),
-                ]
-            ),
-            diff_block
-        ]
-    )
+    # Comparison mode: one snapshot for all cards and set operations
+    comparison_layout = build_comparison(platforms, snap=data_store.snapshot)
 
     return (
         BROWSE_STYLE.copy() | {"display": "none"},
         COMPARE_VISIBLE_STYLE.copy(),
-        comparison_layout
+        comparison_layout,
+        selection
     )
 
+
+#   CALLBACK 5 – REQUIREMENTS RANKING
+
+
+@callback(
+    [Output("rank-results", "children"),
+     Output("rank-required", "options"),
+     Output("rank-nice", "options")],
+    [Input("rank-required", "value"),
+     Input("rank-nice", "value"),
+     Input("rank-k", "value"),
+     Input("data-version-store", "data")],
+    prevent_initial_call=True
+)
+@instrument("update_ranking")
+def update_ranking(required, nice_to_have, k, data_version):
+    """Rank platforms by coverage of the chosen features; new options after a reload."""
+    snap = data_store.snapshot
+    options = dash.no_update, dash.no_update
+    if dash.ctx.triggered_id == "data-version-store":
+        options = snap.all_keywords, snap.all_keywords
+
+    if not required and not nice_to_have:
+        results = ""
+    elif not k or not 1 <= k <= MAX_K:
+        results = dash.no_update     # while the number is being typed
+    else:
+        results = build_ranking(required, nice_to_have, int(k), snap=snap)
+    return (results, *options)
+
+
+#   APP FACTORY
+
+
+def open_data_store(config):
+    """DataStore for the configured source (the pandas loaders are only imported here)."""
+    if config["shared_index_dir"]:
+        from sharedindex import shared_data_store
+        return shared_data_store(config["shared_index_dir"], poll_interval=config["data_poll_seconds"])
+    if config["streaming_ingest"]:
+        from streamingest import stream_data_store
+        return stream_data_store(config["excel_path"], poll_interval=config["data_poll_seconds"])
+
+    from datastore import DataStore
+    return DataStore(config["excel_path"], poll_interval=config["data_poll_seconds"])
+
+
+def open_link_checker(config, store):
+    """(LinkCache, LinkChecker or None) for the link_check setting."""
+    from linkcheck import LinkCache, LinkChecker, cache_path_for
+
+    cache = LinkCache(config["link_cache"] or cache_path_for(config["excel_path"]))
+    if config["link_check"] != "background":
+        return cache, None
+    checker = LinkChecker(cache, lambda: list(store.snapshot.platform_links.values()))
+    store.add_listener(lambda snap: checker.check_now())
+    return cache, checker
+
+
+def create_app(config=None):
+    """
+    Load the data, warm the figure cache and build the Dash app.
+
+    `config` overrides keys of DEFAULT_CONFIG. There is one app per process:
+    the callbacks of this module serve the app created last.
+    """
+    global data_store, link_cache, link_checker
+    if data_store is not None:
+        data_store.stop_watching()
+    if link_checker is not None:
+        link_checker.stop()
+
+    settings.clear()
+    settings.update(DEFAULT_CONFIG, **(config or {}))
+    figure_cache.clear()
+    client_index.cache_clear()
+    build_layout.cache_clear()
+
+    # Loads the workbook (through the binary cache) or attaches to the
+    # shared index, and rebuilds everything when the data changes
+    data_store = open_data_store(settings)
+    data_store.add_listener(on_data_reload)
+    warm_figure_cache(data_store.snapshot)
+    link_cache, link_checker = open_link_checker(settings, data_store) if settings["link_check"] else (None, None)
+    if settings["watch"]:
+        data_store.start_watching()
+        if link_checker is not None:
+            link_checker.start()
+
+    app = dash.Dash(__name__)
+    app.layout = serve_layout
+    for args, kwargs, func in CALLBACKS:
+        app.callback(*args, **kwargs)(func)
+    register_sunburst_callbacks(app)
+    register_facet_callbacks(app)
+    register_tab_filters(app, "groups", "hierarchy-filter-store", "groupsFilters")
+    if cyto is not None:
+        register_network_callbacks(app)
+
+    # JSON API (ranking) for other tools, Prometheus metrics
+    register_api(app.server, data_store)
+    register_metrics_route(app.server)
+    return app
+
+
 #   MAIN
 
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--warm-cache", action="store_true",
+                        help="only (re)build the workbook cache and exit")
+    args = parser.parse_args()
+
+    if args.warm_cache:
+        from dataloader import warm_cache
+        warm_cache(DEFAULT_CONFIG["excel_path"])
+    else:
+        create_app().run(debug=True)
@@ -0,0 +1,384 @@
+"""
+Lightweight metrics with a Prometheus text endpoint.
+
+- Callbacks wrapped with @instrument("name") record wall time, call
+  counts (ok / prevented / error) and the size of the serialized response.
+  Serializing costs about as much as Dash's own serialization, so the size
+  is only measured on every SIZE_SAMPLE_EVERY-th call.
+- Data loading stages are timed with `with timed("stage"): ...`.
+- register_metrics_route(server) adds GET /metrics to the Flask server.
+
+Everything is a few counters under a lock, cheap enough to leave on.
+
+Deployment: the counters live in the process. A single process (python
+main.py, or one gunicorn worker) needs nothing else. With several
+gunicorn workers a scrape reaches one worker at random, so set
+METRICS_DIR to a directory the workers share (and nothing else writes
+to) and run with gunicorn.conf.py: every worker writes its counters to
+METRICS_DIR/<pid>.json every FLUSH_SECONDS, at exit and when it answers
+a scrape, and /metrics returns the sum over all the files. When a
+worker exits, gunicorn.conf.py folds its file into archive.json, so the
+totals keep counting up; the directory is emptied when gunicorn starts.
+Gauges are per process and get a `pid` label instead of being summed.
+"""
+import atexit
+import bisect
+import contextlib
+import functools
+import glob
+import json
+import os
+import threading
+import time
+
+from dash.exceptions import PreventUpdate
+from plotly.io.json import to_json_plotly
+
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000)
+LOAD_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+SIZE_SAMPLE_EVERY = 10
+
+MULTIPROCESS_DIR = os.environ.get("METRICS_DIR")
+FLUSH_SECONDS = 5
+ARCHIVE = "archive"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def reset(self):
+        with self._lock:
+            self._values = {}
+
+    def dump(self):
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    @staticmethod
+    def merge(dumps):
+        """{labels: value} summed over dump() results (of several processes)."""
+        values = {}
+        for dump in dumps:
+            for key, value in dump:
+                key = tuple(key)
+                values[key] = values.get(key, 0) + value
+        return values
+
+    def render(self, values=None):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        if values is None:
+            with self._lock:
+                values = dict(self._values)
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}   # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            series[i] += 1
+            series[-1] += value
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+
+    def dump(self):
+        with self._lock:
+            return [[list(key), list(series)] for key, series in self._series.items()]
+
+    @staticmethod
+    def merge(dumps):
+        """{labels: series} summed over dump() results (of several processes)."""
+        merged = {}
+        for dump in dumps:
+            for key, series in dump:
+                key = tuple(key)
+                if key in merged:
+                    merged[key] = [a + b for a, b in zip(merged[key], series)]
+                else:
+                    merged[key] = list(series)
+        return merged
+
+    def render(self, snapshot=None):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        if snapshot is None:
+            with self._lock:
+                snapshot = {k: list(v) for k, v in self._series.items()}
+        for key, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                le = bound if bound == "+Inf" else _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Value(s) read from a function at scrape time: func() -> number or {label value: number}."""
+
+    def __init__(self, name, help_text, func, labelname=None):
+        self.name = name
+        self.help = help_text
+        self.func = func
+        self.labelname = labelname
+
+    def reset(self):
+        pass
+
+    def dump(self):
+        return self.func()
+
+    @staticmethod
+    def merge(dumps_by_pid):
+        """{pid: value}: gauges of different processes are not added up."""
+        return dict(dumps_by_pid)
+
+    def render(self, by_pid=None):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        if by_pid is None:
+            by_pid = {None: self.func()}
+        for pid, value in sorted(by_pid.items(), key=lambda item: str(item[0])):
+            extra = [] if pid is None else [("pid", pid)]
+            if self.labelname is None:
+                lines.append(f"{self.name}{_labels((), (), extra)} {_number(value)}")
+            else:
+                for label, v in sorted(value.items()):
+                    lines.append(f"{self.name}{_labels((self.labelname,), (label,), extra)} {_number(v)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def reset(self):
+        """Forget the counts (a forked worker starts from zero, not from its parent's)."""
+        for metric in self._metrics:
+            metric.reset()
+
+    def dump(self):
+        """{metric name: JSON-able state} of this process."""
+        return {metric.name: metric.dump() for metric in self._metrics}
+
+    def render(self, dumps=None):
+        """Prometheus text of this process, or of {pid: dump()} of several processes."""
+        lines = []
+        for metric in self._metrics:
+            if dumps is None:
+                lines.extend(metric.render())
+            elif isinstance(metric, Gauge):
+                lines.extend(metric.render(metric.merge(
+                    (pid, dump[metric.name]) for pid, dump in dumps.items()
+                    if pid != ARCHIVE and metric.name in dump)))
+            else:
+                lines.extend(metric.render(metric.merge(
+                    dump[metric.name] for dump in dumps.values() if metric.name in dump)))
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+CALLBACK_SECONDS = registry.add(Histogram(
+    "dash_callback_duration_seconds", "Wall time of Dash callbacks.", ["callback"]))
+CALLBACK_RESPONSE_BYTES = registry.add(Histogram(
+    "dash_callback_response_bytes", "Serialized size of callback responses (sampled).",
+    ["callback"], buckets=SIZE_BUCKETS))
+CALLBACK_CALLS = registry.add(Counter(
+    "dash_callback_calls_total", "Dash callback calls by outcome.", ["callback", "outcome"]))
+DATA_LOAD_SECONDS = registry.add(Histogram(
+    "data_load_duration_seconds", "Time spent loading and indexing the data, per stage.",
+    ["stage"], buckets=LOAD_BUCKETS))
+
+
+def response_size(result):
+    """Bytes of the JSON Dash sends for this callback result."""
+    return len(to_json_plotly(result))
+
+
+def instrument(name, size_sample_every=SIZE_SAMPLE_EVERY):
+    """Decorator recording time, outcome and (sampled) response size of a callback."""
+    def decorator(func):
+        calls = [0]
+        calls_lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                result = func(*args, **kwargs)
+                outcome = "ok"
+            except PreventUpdate:
+                outcome = "prevented"
+                raise
+            finally:
+                CALLBACK_SECONDS.observe(time.perf_counter() - start, callback=name)
+                CALLBACK_CALLS.inc(callback=name, outcome=outcome)
+
+            with calls_lock:
+                calls[0] += 1
+                sample = calls[0] % size_sample_every == 1 or size_sample_every == 1
+            if sample:
+                try:
+                    size = response_size(result)
+                except Exception:
+                    size = None  # the callback succeeded; only the measurement failed
+                if size is not None:
+                    CALLBACK_RESPONSE_BYTES.observe(size, callback=name)
+            return result
+        return wrapper
+    return decorator
+
+
+@contextlib.contextmanager
+def timed(stage):
+    """Record the duration of a data-loading stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        DATA_LOAD_SECONDS.observe(time.perf_counter() - start, stage=stage)
+
+
+#   SEVERAL PROCESSES (METRICS_DIR)
+
+def _write_json(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None     # gone (worker just folded into the archive) or never written
+
+
+def write_process_metrics(directory=None):
+    """Write this process's counters to <directory>/<pid>.json."""
+    directory = directory or MULTIPROCESS_DIR
+    _write_json(os.path.join(directory, f"{os.getpid()}.json"), registry.dump())
+
+
+def read_all_metrics(directory=None):
+    """{pid or ARCHIVE: dump} of every process that wrote to the directory."""
+    directory = directory or MULTIPROCESS_DIR
+    dumps = {}
+    for path in glob.glob(os.path.join(directory, "*.json")):
+        dump = _read_json(path)
+        if dump is not None:
+            dumps[os.path.basename(path)[:-len(".json")]] = dump
+    return dumps
+
+
+def mark_process_dead(pid, directory=None):
+    """Fold the counters of an exited process into the archive and delete its file.
+
+    Called from one process only (the gunicorn master, child_exit); gauges
+    of the dead process are dropped.
+    """
+    directory = directory or MULTIPROCESS_DIR
+    path = os.path.join(directory, f"{pid}.json")
+    dump = _read_json(path)
+    if dump is not None:
+        archive_path = os.path.join(directory, f"{ARCHIVE}.json")
+        archive = _read_json(archive_path) or {}
+        for metric in registry._metrics:
+            if isinstance(metric, Gauge) or metric.name not in dump:
+                continue
+            merged = metric.merge([archive.get(metric.name, []), dump[metric.name]])
+            archive[metric.name] = [[list(key), value] for key, value in merged.items()]
+        _write_json(archive_path, archive)
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(path)
+
+
+def clear_metrics_dir(directory=None):
+    """Remove the files of an earlier run (gunicorn on_starting)."""
+    directory = directory or MULTIPROCESS_DIR
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, "*.json")) + glob.glob(os.path.join(directory, "*.tmp")):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+
+
+def start_flushing(interval=FLUSH_SECONDS):
+    """Write this process's counters every `interval` seconds and at exit (METRICS_DIR only)."""
+    if MULTIPROCESS_DIR is None:
+        return
+
+    def loop():
+        while True:
+            time.sleep(interval)
+            write_process_metrics()
+
+    atexit.register(write_process_metrics)
+    threading.Thread(target=loop, name="metrics-flush", daemon=True).start()
+
+
+def register_metrics_route(server, path="/metrics"):
+    """Expose the registry in Prometheus text format on the Flask server.
+
+    With METRICS_DIR set, the sum over all the worker processes.
+    """
+    def metrics_view():
+        if MULTIPROCESS_DIR is None:
+            text = registry.render()
+        else:
+            write_process_metrics()
+            text = registry.render(read_all_metrics())
+        return text, 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
+    server.add_url_rule(path, "metrics", metrics_view)
@@ -0,0 +1,157 @@
+"""
+Platform <-> feature network and platform - platform network (Cytoscape).
+
+Node positions are computed once per data version, without a force
+simulation: the features sit on a circle, ordered by group, and every
+platform at the mean position of its features, pulled towards the
+centre. Platforms with similar features end up close together, and no
+node moves when the filters change. The browser only draws the preset
+positions.
+
+Level of detail, so large catalogs stay responsive:
+
+- platform - platform edges come from the similar-platform index (top-k
+  neighbours per platform), weighted by the number of shared features
+- platform - platform edges lighter than `min_weight` are left out (in
+  the bipartite network every membership edge weighs 1, so it does not
+  apply there)
+- above `max_platform_nodes` platforms, the platforms are clustered on a
+  grid over the layout: one node per grid cell, sized by its number of
+  platforms, with the edges of its platforms merged (weights summed)
+"""
+import math
+
+import numpy as np
+
+
+NETWORK_MODES = ("bipartite", "platforms")
+MAX_PLATFORM_NODES = 300
+FEATURE_RADIUS = 1000.0
+PLATFORM_PULL = 0.75        # platforms at this fraction of their features' mean position
+JITTER = 20.0               # keeps platforms with the same features apart
+PAIR_BLOCK = 4096           # platform pairs per block when counting shared features
+
+NETWORK_STYLESHEET = [
+    {"selector": "node", "style": {"label": "data(label)", "font-size": "10px",
+                                   "width": "data(size)", "height": "data(size)"}},
+    {"selector": ".feature", "style": {"background-color": "#ff7f0e", "font-size": "14px"}},
+    {"selector": ".platform", "style": {"background-color": "#1f77b4"}},
+    {"selector": ".cluster", "style": {"background-color": "#6baed6"}},
+    {"selector": "edge", "style": {"width": "data(width)", "line-color": "#ccc", "opacity": 0.6}},
+]
+
+
+class NetworkLayout:
+    """Preset positions and weighted platform pairs for one data version."""
+
+    def __init__(self, index, similarity):
+        self.index = index
+        n_features = len(index.features)
+
+        # Features on a circle, grouped
+        order = sorted(range(n_features), key=lambda f: (index.feature_groups[f], index.features[f]))
+        angle = np.empty(n_features)
+        angle[order] = 2 * np.pi * np.arange(n_features) / max(n_features, 1)
+        self.feature_xy = FEATURE_RADIUS * np.column_stack([np.cos(angle), np.sin(angle)])
+
+        # Platforms at the mean position of their features
+        matrix = np.asarray(index.matrix)
+        totals = np.maximum(index.feature_totals, 1)[:, None]
+        jitter = np.random.default_rng(0).normal(scale=JITTER, size=(len(index.platforms), 2))
+        self.platform_xy = PLATFORM_PULL * (matrix.astype(np.float32) @ self.feature_xy) / totals + jitter
+
+        # Similar-platform pairs, each once, with their number of shared features
+        n, k = similarity.neighbor_ids.shape
+        a = np.repeat(np.arange(n, dtype=np.int32), k)
+        b = np.asarray(similarity.neighbor_ids).ravel()
+        keep = b >= 0
+        pairs = np.unique(np.sort(np.column_stack([a[keep], b[keep]]), axis=1), axis=0)
+        shared = np.empty(len(pairs), dtype=np.int32)
+        for start in range(0, len(pairs), PAIR_BLOCK):
+            block = pairs[start:start + PAIR_BLOCK]
+            shared[start:start + PAIR_BLOCK] = (matrix[block[:, 0]] & matrix[block[:, 1]]).sum(axis=1)
+        self.pairs = pairs
+        self.shared = shared
+
+    def _platform_nodes(self, platform_ids, max_platform_nodes):
+        """(node of each platform, node elements): one per platform or one per grid cell."""
+        xy = self.platform_xy[platform_ids]
+        names = self.index.platforms[platform_ids]
+        if len(platform_ids) <= max_platform_nodes:
+            nodes = [
+                {"data": {"id": f"p:{name}", "label": name, "size": 12},
+                 "position": {"x": float(x), "y": float(y)}, "classes": "platform"}
+                for name, (x, y) in zip(names, xy)
+            ]
+            return np.arange(len(platform_ids)), nodes
+
+        side = max(int(math.sqrt(max_platform_nodes)), 1)
+        low, high = xy.min(axis=0), xy.max(axis=0)
+        cell_xy = np.minimum(((xy - low) / np.maximum(high - low, 1e-9) * side).astype(np.int64), side - 1)
+        cells, node_of = np.unique(cell_xy[:, 0] * side + cell_xy[:, 1], return_inverse=True)
+        counts = np.bincount(node_of, minlength=len(cells))
+        first = np.unique(node_of, return_index=True)[1]
+        centres = np.column_stack([np.bincount(node_of, weights=xy[:, i]) for i in range(2)]) / counts[:, None]
+
+        nodes = []
+        for c, (count, (x, y)) in enumerate(zip(counts, centres)):
+            if count == 1:
+                name = names[first[c]]
+                data = {"id": f"p:{name}", "label": name, "size": 12}
+                classes = "platform"
+            else:
+                data = {"id": f"c:{cells[c]}", "label": f"{count} platforms",
+                        "size": float(12 + 4 * math.sqrt(count))}
+                classes = "cluster"
+            nodes.append({"data": data, "position": {"x": float(x), "y": float(y)}, "classes": classes})
+        return node_of, nodes
+
+    def elements(self, platform_ids, feature_ids, mode="bipartite", min_weight=1,
+                 max_platform_nodes=MAX_PLATFORM_NODES):
+        """
+        Cytoscape elements for the platforms (row numbers) and features
+        (column numbers) of one filter state, in the given NETWORK_MODES.
+        `min_weight` only applies to the "platforms" mode.
+        """
+        platform_ids = np.asarray(platform_ids, dtype=np.intp)
+        node_of, nodes = self._platform_nodes(platform_ids, max_platform_nodes)
+        node_ids = [n["data"]["id"] for n in nodes]
+
+        if mode == "platforms":
+            # Similar pairs inside the selection, merged per node pair
+            position = np.full(len(self.index.platforms), -1, dtype=np.intp)
+            position[platform_ids] = np.arange(len(platform_ids))
+            inside = (position[self.pairs] >= 0).all(axis=1)
+            src = node_of[position[self.pairs[inside, 0]]]
+            dst = node_of[position[self.pairs[inside, 1]]]
+            weights = self.shared[inside]
+            distinct = src != dst
+            sources, targets = np.minimum(src, dst)[distinct], np.maximum(src, dst)[distinct]
+            target_ids = node_ids
+            weights = weights[distinct]
+        else:
+            min_weight = 1
+            # Platform -> feature memberships, merged per (node, feature)
+            feature_ids = np.asarray(feature_ids, dtype=np.intp)
+            rows, cols = np.nonzero(np.asarray(self.index.matrix)[platform_ids][:, feature_ids])
+            sources, targets, weights = node_of[rows], cols, np.ones(len(rows), dtype=np.int64)
+            target_ids = [f"f:{f}" for f in self.index.features[feature_ids]]
+            nodes = nodes + [
+                {"data": {"id": target_ids[i], "label": self.index.features[f], "size": 24},
+                 "position": {"x": float(x), "y": float(y)}, "classes": "feature"}
+                for i, (f, (x, y)) in enumerate(zip(feature_ids, self.feature_xy[feature_ids]))
+            ]
+
+        # Sum the weights of merged edges, then drop the light ones
+        n_targets = max(len(target_ids), 1)
+        pair_keys = sources.astype(np.int64) * n_targets + targets
+        keys, inverse = np.unique(pair_keys, return_inverse=True)
+        summed = np.bincount(inverse, weights=weights, minlength=len(keys)).astype(np.int64)
+        keep = summed >= min_weight
+        scale = max(int(summed.max()), 1) if len(summed) else 1
+        edges = [
+            {"data": {"source": node_ids[key // n_targets], "target": target_ids[key % n_targets],
+                      "weight": int(w), "width": round(1 + 5 * int(w) / scale, 2)}}
+            for key, w in zip(keys[keep], summed[keep])
+        ]
+        return nodes + edges
@@ -0,0 +1,98 @@
+"""
+"Given the features I need, which platforms cover them best?"
+
+A request is a weighted set of required and nice-to-have features. The
+coverage of every platform is one matrix-vector product over the
+requested feature columns of the BitsetIndex:
+
+    coverage[p] = sum(weight[f] for requested f that p has) / sum(weight)
+
+Platforms that have every required feature rank before those that do not,
+then by coverage, ties by name. The top k are picked with
+similarity.top_k (argpartition, no full sort of all platforms).
+"""
+import math
+
+import numpy as np
+
+from similarity import top_k
+
+
+REQUIRED_WEIGHT = 2.0
+NICE_TO_HAVE_WEIGHT = 1.0
+DEFAULT_K = 10
+MAX_K = 100
+
+
+def feature_weights(features, default_weight):
+    """
+    [feature, ...] -> {feature: default_weight}; {feature: weight} is
+    checked and copied. Raises ValueError for anything else.
+    """
+    if features is None:
+        return {}
+    if isinstance(features, str):
+        raise ValueError("features must be a list or an object, not a string")
+    if not isinstance(features, dict):
+        features = {f: default_weight for f in features}
+
+    weights = {}
+    for feature, weight in features.items():
+        if not isinstance(feature, str):
+            raise ValueError(f"feature names must be strings, got {feature!r}")
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)) \
+                or not math.isfinite(weight) or weight <= 0:
+            raise ValueError(f"weight of {feature!r} must be a positive number")
+        weights[feature] = float(weight)
+    return weights
+
+
+def check_k(k):
+    if isinstance(k, bool) or not isinstance(k, int) or not 1 <= k <= MAX_K:
+        raise ValueError(f"k must be an integer between 1 and {MAX_K}")
+    return k
+
+
+def rank_platforms(index, required=(), nice_to_have=(), k=DEFAULT_K):
+    """
+    Top k platforms for the requested features. `required` and
+    `nice_to_have` are feature lists (default weights) or {feature: weight}.
+    Features unknown to the index are ignored and reported back.
+
+    Returns {"results": [{"platform", "score", "required_met", "matched",
+    "missing"}, ...] best first, "unknown_features": [...]}.
+    """
+    required = feature_weights(required, REQUIRED_WEIGHT)
+    nice_to_have = feature_weights(nice_to_have, NICE_TO_HAVE_WEIGHT)
+    k = check_k(k)
+
+    # A feature listed as both counts as required
+    requested = dict(required)
+    requested.update((f, w) for f, w in nice_to_have.items() if f not in required)
+    known = [f for f in requested if f in index.feature_ids]
+    unknown = [f for f in requested if f not in index.feature_ids]
+    if not known:
+        return {"results": [], "unknown_features": unknown}
+
+    # Column 0: weight, column 1: 1 for required features
+    vectors = np.array([[requested[f], f in required] for f in known], dtype=np.float32)
+    columns = index.matrix[:, [index.feature_ids[f] for f in known]]
+    hits = columns @ vectors
+
+    coverage = hits[:, 0] / vectors[:, 0].sum()
+    required_met = hits[:, 1] >= vectors[:, 1].sum()
+    rank_key = np.where(coverage > 0, coverage + required_met, 0.0)
+    ids, _ = top_k(rank_key, np.arange(len(index.platforms)), k)
+
+    known = np.asarray(known, dtype=object)
+    results = [
+        {
+            "platform": index.platforms[p],
+            "score": round(float(coverage[p]), 4),
+            "required_met": bool(required_met[p]),
+            "matched": known[columns[p]].tolist(),
+            "missing": known[~columns[p]].tolist(),
+        }
+        for p in ids
+    ]
+    return {"results": results, "unknown_features": unknown}
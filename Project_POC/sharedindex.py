@@ -0,0 +1,178 @@
+"""
+Read-only index shared between worker processes through memory-mapped files.
+
+One loader process parses the workbook, builds the compact index once and
+publishes every array of it as .npy files plus a small meta.json (names,
+URLs): the bitset matrices with everything derived from them (packed
+words, count cubes, main languages, totals), the catalog's CSR and code
+arrays and the similar-platform arrays. Workers attach with
+np.load(mmap_mode="r") and compute nothing, so the operating system maps
+the same pages into every worker instead of each worker parsing the
+workbook, holding its own pandas frames or its own derived arrays.
+
+    python sharedindex.py volunteer_data.xlsx /dev/shm/volunteer_index --watch
+
+and start the app workers with SHARED_INDEX_DIR=/dev/shm/volunteer_index.
+Each version gets its own folder; the CURRENT file names the active one,
+so workers pick up a republished index like a reloaded workbook.
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+from bitindex import BitsetIndex
+from catalog import Catalog
+from datastore import DataSnapshot, DataStore, load_snapshot
+from metrics import timed
+from similarity import SimilarityIndex
+
+
+CURRENT = "CURRENT"
+KEEP_VERSIONS = 2   # old versions kept for workers that have not switched yet
+FORMAT = 2          # meta.json "format": which arrays a version folder holds
+CATALOG_PREFIX = "catalog."
+
+
+def _arrays(snapshot):
+    arrays = dict(snapshot.index.arrays())
+    arrays.update((CATALOG_PREFIX + name, array) for name, array in snapshot.catalog.arrays().items())
+    arrays["neighbor_ids"] = snapshot.similarity.neighbor_ids
+    arrays["neighbor_scores"] = snapshot.similarity.neighbor_scores
+    return arrays
+
+
+def _published(version_dir):
+    """True if version_dir holds a complete index in this FORMAT."""
+    try:
+        with open(os.path.join(version_dir, "meta.json"), encoding="utf-8") as f:
+            return json.load(f).get("format") == FORMAT
+    except (OSError, ValueError):
+        return False
+
+
+def _write_current(directory, version):
+    tmp = os.path.join(directory, f"{CURRENT}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp, os.path.join(directory, CURRENT))
+
+
+def _remove_old_versions(directory, current):
+    versions = [
+        d for d in os.listdir(directory)
+        if d != current and os.path.isfile(os.path.join(directory, d, "meta.json"))
+    ]
+    versions.sort(key=lambda d: os.path.getmtime(os.path.join(directory, d)), reverse=True)
+    for d in versions[KEEP_VERSIONS - 1:]:
+        # Workers still mapping these files keep their pages until they switch
+        shutil.rmtree(os.path.join(directory, d), ignore_errors=True)
+
+
+def publish(snapshot, directory):
+    """Write the snapshot's index to directory/<version>/ and make it current."""
+    os.makedirs(directory, exist_ok=True)
+    version_dir = os.path.join(directory, snapshot.version)
+
+    if not _published(version_dir):
+        tmp = f"{version_dir}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for name, array in _arrays(snapshot).items():
+            np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(array))
+
+        index, catalog = snapshot.index, snapshot.catalog
+        meta = {
+            "format": FORMAT,
+            "version": snapshot.version,
+            "arrays": list(_arrays(snapshot)),
+            "platforms": index.platforms.tolist(),
+            "features": index.features.tolist(),
+            "languages": index.languages,
+            "feature_groups": index.feature_groups,
+            "urls": catalog.urls.tolist(),
+            "unindexed_platforms": catalog.unindexed_platforms,
+            "feature_table": catalog.feature_table,
+        }
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        shutil.rmtree(version_dir, ignore_errors=True)
+        os.replace(tmp, version_dir)
+
+    _write_current(directory, snapshot.version)
+    _remove_old_versions(directory, snapshot.version)
+
+
+def current_version(directory):
+    """Version named in CURRENT (this is also the DataStore fingerprint)."""
+    with open(os.path.join(directory, CURRENT), encoding="utf-8") as f:
+        return f.read().strip()
+
+
+@timed("attach_shared_index")
+def attach_snapshot(directory):
+    """
+    DataSnapshot backed by the published arrays (zero-copy, read-only).
+    There are no pandas frames in this mode: df_pf_full is None.
+    """
+    version = current_version(directory)
+    version_dir = os.path.join(directory, version)
+    with open(os.path.join(version_dir, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+
+    if meta.get("format") != FORMAT:
+        raise ValueError(f"{version_dir}: published in another format, publish it again")
+
+    arrays = {
+        name: np.load(os.path.join(version_dir, f"{name}.npy"), mmap_mode="r")
+        for name in meta["arrays"]
+    }
+    index = BitsetIndex.from_arrays(meta["platforms"], meta["features"], meta["languages"],
+                                    meta["feature_groups"], arrays)
+    catalog_arrays = {name[len(CATALOG_PREFIX):]: array for name, array in arrays.items()
+                      if name.startswith(CATALOG_PREFIX)}
+    catalog = Catalog.from_arrays(index, catalog_arrays, meta["urls"], meta["unindexed_platforms"],
+                                  meta["feature_table"])
+    similarity = SimilarityIndex(index, arrays["neighbor_ids"], arrays["neighbor_scores"])
+    return DataSnapshot(version, None, index, similarity, catalog)
+
+
+def shared_data_store(directory, poll_interval=5.0):
+    """DataStore for workers: attaches to whatever the loader published last."""
+    return DataStore(directory, poll_interval=poll_interval,
+                     loader=attach_snapshot, fingerprint=current_version)
+
+
+#   MAIN
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Publish the workbook index for app workers.")
+    parser.add_argument("excel_path")
+    parser.add_argument("directory", help="e.g. a folder on /dev/shm")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and republish whenever the workbook changes")
+    parser.add_argument("--poll", type=float, default=5.0)
+    parser.add_argument("--stream", action="store_true",
+                        help="stream PlatformFeatures in chunks (very large workbooks, or a CSV folder)")
+    args = parser.parse_args()
+
+    load, open_store = load_snapshot, DataStore
+    if args.stream:
+        from streamingest import stream_data_store as open_store, stream_snapshot as load
+
+    if not args.watch:
+        snapshot = load(args.excel_path)
+        publish(snapshot, args.directory)
+        print(f"Published version {snapshot.version} to {args.directory}")
+    else:
+        store = open_store(args.excel_path, poll_interval=args.poll)
+        publish(store.snapshot, args.directory)
+        store.add_listener(lambda snap: publish(snap, args.directory))
+        print(f"Published version {store.snapshot.version}; watching {args.excel_path}")
+        store.start_watching()
+        while True:
+            time.sleep(3600)
@@ -0,0 +1,214 @@
+"""
+"Most similar platforms": top-k neighbors per platform by feature overlap.
+
+Computed once per data version from the BitsetIndex matrix, so looking up
+the neighbors of a platform is a dict access.
+
+- Up to EXACT_MAX_PLATFORMS platforms the exact all-pairs similarity is
+  computed with matrix products, in row blocks to bound memory.
+- Above that, MinHash signatures + LSH banding find candidate pairs and
+  only those are scored exactly.
+"""
+import numpy as np
+
+
+TOP_K = 5
+EXACT_MAX_PLATFORMS = 5000
+BLOCK_ROWS = 1024
+
+# MinHash / LSH settings: NUM_PERM = BANDS * ROWS_PER_BAND
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = 4
+
+
+def pair_scores(inter, size_rows, size_cols, metric):
+    """Jaccard or cosine similarity from intersection sizes and set sizes."""
+    if metric == "cosine":
+        denom = np.sqrt(np.multiply.outer(size_rows, size_cols))
+    else:
+        denom = np.add.outer(size_rows, size_cols) - inter
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denom > 0, inter / denom, 0.0)
+
+
+def top_k(scores, ids, k):
+    """Indices into ids of the k best scores (> 0), best first, ties by id."""
+    keep = scores > 0
+    ids, scores = ids[keep], scores[keep]
+    if len(ids) > k:
+        part = np.argpartition(-scores, k - 1)[:k]
+        # argpartition does not keep ties stable: re-include every tie of the k-th score
+        kth = scores[part].min()
+        part = np.flatnonzero(scores >= kth)
+        ids, scores = ids[part], scores[part]
+    order = np.lexsort((ids, -scores))[:k]
+    return ids[order], scores[order]
+
+
+class SimilarityIndex:
+    """
+    neighbor_ids[p] / neighbor_scores[p]: the top-k neighbors of platform
+    p (row numbers of the BitsetIndex), best first, padded with -1 / 0.
+    """
+
+    def __init__(self, index, neighbor_ids, neighbor_scores, metric="jaccard"):
+        self.platforms = index.platforms
+        self.platform_ids = index.platform_ids
+        self.neighbor_ids = neighbor_ids
+        self.neighbor_scores = neighbor_scores
+        self.metric = metric
+
+    @classmethod
+    def build(cls, index, k=TOP_K, metric="jaccard", exact_max=EXACT_MAX_PLATFORMS, seed=0):
+        builder = _Builder(k, metric)
+        matrix = index.matrix.astype(np.float32)
+        sizes = matrix.sum(axis=1)
+        if len(index.platforms) <= exact_max:
+            neighbors = builder.exact(matrix, sizes)
+        else:
+            neighbors = builder.lsh(index.matrix, matrix, sizes, seed)
+
+        n = len(index.platforms)
+        neighbor_ids = np.full((n, k), -1, dtype=np.int32)
+        neighbor_scores = np.zeros((n, k), dtype=np.float32)
+        for p, (ids, scores) in enumerate(neighbors):
+            neighbor_ids[p, :len(ids)] = ids
+            neighbor_scores[p, :len(ids)] = scores
+        return cls(index, neighbor_ids, neighbor_scores, metric)
+
+    def updated(self, index, rows, row_map=None):
+        """
+        Neighbors for `index`, a changed version of this index's data in
+        which only the platforms `rows` (new row numbers) have different
+        features or are new. row_map[old row] is the new row of every old
+        platform (-1: removed); None when no platform moved.
+
+        Platforms that changed, or had a changed or removed neighbor, are
+        rescored against all platforms. For every other platform only the
+        changed ones are new candidates: they are merged into its list.
+        Without LSH the result equals a full build.
+        """
+        n, k = len(index.platforms), self.neighbor_ids.shape[1]
+        rows = np.unique(np.asarray(rows, dtype=np.intp))
+        rescore = np.zeros(n, dtype=bool)
+        rescore[rows] = True
+        if row_map is None:
+            neighbor_ids, neighbor_scores = self.neighbor_ids.copy(), self.neighbor_scores.copy()
+        else:
+            row_map = np.asarray(row_map, dtype=np.intp)
+            kept = row_map >= 0
+            old_ids = self.neighbor_ids[kept]
+            moved = np.where(old_ids >= 0, row_map[np.maximum(old_ids, 0)], -1)
+            neighbor_ids = np.full((n, k), -1, dtype=np.int32)
+            neighbor_scores = np.zeros((n, k), dtype=np.float32)
+            neighbor_ids[row_map[kept]] = moved
+            neighbor_scores[row_map[kept]] = self.neighbor_scores[kept]
+            rescore[row_map[kept][((old_ids >= 0) & (moved < 0)).any(axis=1)]] = True
+        rescore |= np.isin(neighbor_ids, rows).any(axis=1)
+
+        matrix = np.asarray(index.matrix).astype(np.float32)
+        sizes = matrix.sum(axis=1)
+        # Row blocks bounded like a full build's
+        block_rows = max(BLOCK_ROWS * EXACT_MAX_PLATFORMS // max(n, 1), 1)
+
+        # Changed platforms as candidates of everyone else
+        candidate_scores = np.zeros((len(rows), n), dtype=np.float32)
+        for start in range(0, len(rows), block_rows):
+            block = rows[start:start + block_rows]
+            candidate_scores[start:start + block_rows] = pair_scores(
+                matrix[block] @ matrix.T, sizes[block], sizes, self.metric)
+        merge = ~rescore & ((candidate_scores > 0) & (candidate_scores >= neighbor_scores[:, k - 1])).any(axis=0)
+        merge_rows = np.flatnonzero(merge)
+        if len(merge_rows):
+            ids = np.concatenate([neighbor_ids[merge_rows],
+                                  np.broadcast_to(rows.astype(np.int32), (len(merge_rows), len(rows)))], axis=1)
+            scores = np.concatenate([neighbor_scores[merge_rows], candidate_scores[:, merge_rows].T], axis=1)
+            # Same order as top_k: best score first, ties by id, nothing <= 0
+            order = np.lexsort((ids, -scores), axis=1)[:, :k]
+            ids = np.take_along_axis(ids, order, axis=1)
+            scores = np.take_along_axis(scores, order, axis=1)
+            neighbor_ids[merge_rows] = np.where(scores > 0, ids, -1)
+            neighbor_scores[merge_rows] = np.where(scores > 0, scores, 0)
+
+        all_ids = np.arange(n)
+        rescore_rows = np.flatnonzero(rescore)
+        for start in range(0, len(rescore_rows), block_rows):
+            block = rescore_rows[start:start + block_rows]
+            scores = pair_scores(matrix[block] @ matrix.T, sizes[block], sizes, self.metric)
+            for p, row in zip(block, scores):
+                row[p] = 0.0  # not its own neighbor
+                ids, best = top_k(row, all_ids, k)
+                neighbor_ids[p] = -1
+                neighbor_scores[p] = 0
+                neighbor_ids[p, :len(ids)] = ids
+                neighbor_scores[p, :len(ids)] = best
+        return SimilarityIndex(index, neighbor_ids, neighbor_scores, self.metric)
+
+    def neighbors(self, platform):
+        """[(platform, similarity), ...] best first; [] for unknown platforms."""
+        pid = self.platform_ids.get(platform)
+        if pid is None:
+            return []
+        return [
+            (self.platforms[q], round(float(score), 4))
+            for q, score in zip(self.neighbor_ids[pid], self.neighbor_scores[pid]) if q >= 0
+        ]
+
+
+class _Builder:
+    def __init__(self, k, metric):
+        self.k = k
+        self.metric = metric
+
+    # EXACT
+
+    def exact(self, matrix, sizes):
+        n = matrix.shape[0]
+        all_ids = np.arange(n)
+        result = []
+        for start in range(0, n, BLOCK_ROWS):
+            block = matrix[start:start + BLOCK_ROWS]
+            scores = pair_scores(block @ matrix.T, sizes[start:start + BLOCK_ROWS], sizes, self.metric)
+            for i, row in enumerate(scores):
+                row[start + i] = 0.0  # not its own neighbor
+                result.append(top_k(row, all_ids, self.k))
+        return result
+
+    # MINHASH + LSH
+
+    def lsh(self, bool_matrix, matrix, sizes, seed):
+        n, n_features = bool_matrix.shape
+        rng = np.random.default_rng(seed)
+        perms = np.stack([rng.permutation(n_features) for _ in range(NUM_PERM)]).astype(np.int32)
+
+        # signature[p, h] = smallest permuted feature id that p has
+        signatures = np.empty((n, NUM_PERM), dtype=np.int32)
+        for start in range(0, n, BLOCK_ROWS):
+            block = bool_matrix[start:start + BLOCK_ROWS]
+            for h in range(NUM_PERM):
+                signatures[start:start + BLOCK_ROWS, h] = np.where(block, perms[h], n_features).min(axis=1)
+
+        # Platforms sharing any band of the signature become candidates
+        candidates = [set() for _ in range(n)]
+        has_features = sizes > 0
+        for b in range(BANDS):
+            band = signatures[:, b * ROWS_PER_BAND:(b + 1) * ROWS_PER_BAND]
+            buckets = {}
+            for p in np.flatnonzero(has_features):
+                buckets.setdefault(band[p].tobytes(), []).append(p)
+            for members in buckets.values():
+                if len(members) > 1:
+                    for p in members:
+                        candidates[p].update(members)
+
+        result = []
+        for p in range(n):
+            ids = np.fromiter(candidates[p] - {p}, dtype=np.intp)
+            if not len(ids):
+                result.append((ids, np.array([], dtype=np.float32)))
+                continue
+            inter = matrix[ids] @ matrix[p]
+            scores = pair_scores(inter[None, :], sizes[p:p + 1], sizes[ids], self.metric)[0]
+            result.append(top_k(scores, ids, self.k))
+        return result
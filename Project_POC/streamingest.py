@@ -0,0 +1,195 @@
+"""
+Bounded-memory loading of very large workbooks and CSV exports.
+
+The Platforms and Features sheets are small: they are read into lookup
+tables (id -> row of the final index). The PlatformFeatures rows are
+streamed in chunks - from the workbook in openpyxl read-only mode, or from
+PlatformFeatures.csv - and each chunk only sets bits in the membership
+matrices. Neither the pandas sheets nor the joined platform-feature table
+are ever built, so memory stays at the size of the final index plus one
+chunk. The result is the same BitsetIndex as BitsetIndex.from_frame.
+
+A CSV source is a folder with Platforms.csv, Features.csv and
+PlatformFeatures.csv (same columns as the sheets). Use it with the app:
+
+    STREAMING_INGEST=1 VOLUNTEER_DATA=registry_export/ python main.py
+"""
+import csv
+import hashlib
+import os
+from array import array
+
+import numpy as np
+
+from bitindex import LANGUAGE_GROUP, OTHER_GROUP, BitsetIndex, language_name
+from catalog import Catalog
+from dataloader import SHEET_COLUMNS, content_hash, file_fingerprint, workbook_version
+from datastore import DataSnapshot, DataStore
+from metrics import timed
+from similarity import SimilarityIndex
+
+
+CHUNK_ROWS = 50_000     # PlatformFeatures rows per chunk
+
+
+# READING ROWS
+
+
+def _excel_rows(excel_path, sheet, columns):
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        rows = workbook[sheet].iter_rows(values_only=True)
+        header = next(rows, ())
+        positions = [header.index(c) for c in columns]
+        for row in rows:
+            yield tuple(row[i] if i < len(row) else None for i in positions)
+    finally:
+        workbook.close()
+
+
+def _csv_rows(directory, sheet, columns):
+    with open(os.path.join(directory, f"{sheet}.csv"), newline="", encoding="utf-8") as f:
+        for record in csv.DictReader(f):
+            yield tuple(record.get(c) or None for c in columns)
+
+
+def iter_rows(source, sheet):
+    """Stream the SHEET_COLUMNS of one sheet as tuples (None for empty cells)."""
+    if os.path.isdir(source):
+        return _csv_rows(source, sheet, SHEET_COLUMNS[sheet])
+    return _excel_rows(source, sheet, SHEET_COLUMNS[sheet])
+
+
+# LOOKUP TABLES
+
+
+class Lookups:
+    """
+    Platform and feature tables: names sorted as in the final index, and
+    id -> row / column. Languages get their own columns.
+    """
+
+    def __init__(self, platform_rows, feature_rows):
+        self.platform_links = {}
+        platform_name = {}
+        for platform_id, name, url in platform_rows:
+            if platform_id is not None and name is not None:
+                platform_name[platform_id] = name
+                self.platform_links[name] = url
+
+        feature_name, group_of = {}, {}
+        self.feature_table = {}
+        for feature_id, group, name in feature_rows:
+            if feature_id is not None and name is not None:
+                feature_name[feature_id] = (name, group)
+                self.feature_table.setdefault(name, group)
+                if group is not None and group != LANGUAGE_GROUP:
+                    group_of.setdefault(name, group)
+
+        self.platforms = sorted(set(platform_name.values()))
+        self.features = sorted({n for n, g in feature_name.values() if g != LANGUAGE_GROUP})
+        self.languages = sorted({language_name(n) for n, g in feature_name.values() if g == LANGUAGE_GROUP})
+        self.feature_groups = [group_of.get(f, OTHER_GROUP) for f in self.features]
+
+        rows = {p: i for i, p in enumerate(self.platforms)}
+        columns = {f: i for i, f in enumerate(self.features)}
+        language_columns = {lang: i for i, lang in enumerate(self.languages)}
+        self.platform_row = {pid: rows[name] for pid, name in platform_name.items()}
+        # feature id -> column; languages as -1 - column
+        self.feature_column = {
+            fid: language_columns[language_name(name)] * -1 - 1 if group == LANGUAGE_GROUP else columns[name]
+            for fid, (name, group) in feature_name.items()
+        }
+
+
+def coded_chunks(rows, lookups, size=CHUNK_ROWS):
+    """
+    (platform rows, feature columns) int64 arrays for up to `size`
+    PlatformFeatures rows at a time: -1 for unknown platforms and
+    len(lookups.features) for unknown features.
+    """
+    unknown = len(lookups.features)
+    platform_codes, feature_codes = array("q"), array("q")
+    for platform_id, feature_id in rows:
+        platform_codes.append(lookups.platform_row.get(platform_id, -1))
+        feature_codes.append(lookups.feature_column.get(feature_id, unknown))
+        if len(platform_codes) == size:
+            yield np.frombuffer(platform_codes, dtype=np.int64), np.frombuffer(feature_codes, dtype=np.int64)
+            platform_codes, feature_codes = array("q"), array("q")
+    if platform_codes:
+        yield np.frombuffer(platform_codes, dtype=np.int64), np.frombuffer(feature_codes, dtype=np.int64)
+
+
+def _used(matrix, rows, columns):
+    # Copy only when something is actually dropped
+    return matrix if rows.all() and columns.all() else matrix[np.ix_(rows, columns)]
+
+
+def build_index(source, chunk_rows=CHUNK_ROWS):
+    """
+    (BitsetIndex, platform links, feature table) from a workbook or CSV
+    folder, streaming PlatformFeatures.
+    """
+    lookups = Lookups(iter_rows(source, "Platforms"), iter_rows(source, "Features"))
+    matrix = np.zeros((len(lookups.platforms), len(lookups.features)), dtype=bool)
+    lang_matrix = np.zeros((len(lookups.platforms), len(lookups.languages)), dtype=bool)
+
+    for p, f in coded_chunks(iter_rows(source, "PlatformFeatures"), lookups, chunk_rows):
+        # Rows with unknown platforms or features are skipped (like the dropna in from_frame)
+        known = (p >= 0) & (f < len(lookups.features))
+        domain = known & (f >= 0)
+        language = known & (f < 0)
+        matrix[p[domain], f[domain]] = True
+        lang_matrix[p[language], -1 - f[language]] = True
+
+    # Keep what PlatformFeatures uses, as from_frame does
+    platforms = matrix.any(axis=1) | lang_matrix.any(axis=1)
+    features = matrix.any(axis=0)
+    languages = lang_matrix.any(axis=0)
+    index = BitsetIndex(
+        np.asarray(lookups.platforms, dtype=object)[platforms],
+        np.asarray(lookups.features, dtype=object)[features],
+        _used(matrix, platforms, features),
+        np.asarray(lookups.languages, dtype=object)[languages],
+        _used(lang_matrix, platforms, languages),
+        np.asarray(lookups.feature_groups, dtype=object)[features],
+    )
+    return index, lookups.platform_links, lookups.feature_table
+
+
+# SNAPSHOTS
+
+
+def source_fingerprint(source):
+    """file_fingerprint of the workbook, or of every CSV file of a folder."""
+    if os.path.isdir(source):
+        return {sheet: file_fingerprint(os.path.join(source, f"{sheet}.csv")) for sheet in SHEET_COLUMNS}
+    return file_fingerprint(source)
+
+
+def source_version(source):
+    if os.path.isdir(source):
+        h = hashlib.sha256()
+        for sheet in SHEET_COLUMNS:
+            h.update(content_hash(os.path.join(source, f"{sheet}.csv")).encode())
+        return h.hexdigest()[:12]
+    return workbook_version(source)
+
+
+def stream_snapshot(source):
+    """DataSnapshot without pandas frames (df_pf_full is None)."""
+    with timed("stream_index"):
+        index, platform_links, feature_table = build_index(source)
+    with timed("catalog"):
+        catalog = Catalog(index, platform_links, feature_table)
+    with timed("similarity_index"):
+        similarity = SimilarityIndex.build(index)
+    return DataSnapshot(source_version(source), None, index, similarity, catalog)
+
+
+def stream_data_store(source, poll_interval=5.0):
+    """DataStore that loads (and reloads) the source with stream_snapshot."""
+    return DataStore(source, poll_interval=poll_interval,
+                     loader=stream_snapshot, fingerprint=source_fingerprint)
@@ -0,0 +1,32 @@
+"""
+WSGI entry point for preforking servers (preload, then fork):
+
+    gunicorn --workers 4 --config gunicorn.conf.py wsgi:server
+
+The master process imports this module once: it loads the data (from the
+workbook cache or SHARED_INDEX_DIR), warms the figure cache and builds
+the first page. The workers are forked from it and share those pages
+copy-on-write, so a new worker answers its first request right away.
+Each worker starts its own data watcher after the fork (start_worker),
+because threads do not survive fork. For the website status on the
+cards, prefer LINK_CHECK=cache with linkcheck.py run from cron over
+LINK_CHECK=background, which checks the links in every worker.
+Set METRICS_DIR so that /metrics adds up all the workers (metrics.py).
+"""
+import main
+import metrics
+
+
+app = main.create_app({"watch": False})
+server = app.server
+
+# Dash sets itself up on the first request; do that (and build the
+# layout) here rather than in every worker
+server.test_client().get("/_dash-layout")
+
+
+def start_worker():
+    main.data_store.start_watching()
+    metrics.start_flushing()
+    if main.link_checker is not None:
+        main.link_checker.start()